@@ -0,0 +1,25 @@
+# Generated by Django 5.1.3 on 2026-10-17 22:10
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("address", "0009_address_state"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="address",
+            name="address_gin_idx",
+        ),
+        migrations.AddIndex(
+            model_name="address",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["postcode", "state", "address"],
+                name="address_partition_gin_idx",
+                opclasses=["varchar_ops", "varchar_ops", "gin_trgm_ops"],
+            ),
+        ),
+    ]
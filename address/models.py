@@ -24,7 +24,10 @@ class Address(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=["postcode"]),
+            # fuzzy search (`%`) over the whole table, or within a postcode / state
             GinIndex(
-                name="address_gin_idx", fields=["address"], opclasses=["gin_trgm_ops"]
+                name="address_partition_gin_idx",
+                fields=["postcode", "state", "address"],
+                opclasses=["varchar_ops", "varchar_ops", "gin_trgm_ops"],
             ),
         ]
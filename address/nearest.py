@@ -0,0 +1,109 @@
+import numpy as np
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+from .models import Address
+
+"""
+Nearest addresses to a coordinate (reverse geocoding), from a per-process grid index of the address coordinates.
+"""
+
+EARTH_RADIUS = 6_371_000  # metres
+
+
+def haversine(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Returns the distances (in metres) between (`lat`, `lon`) and every (`lats`, `lons`), in degrees.
+    """
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = (
+        np.sin((lats - lat) / 2) ** 2
+        + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+
+class NearestIndex:
+    """
+    The address coordinates bucketed in a grid of `cell`-degree cells, sorted by cell (row-major),
+    so that the points of consecutive cells of a grid row are a single slice.
+    A query scans the squares of cells of growing radius around the coordinate, until no point outside the square can be nearer
+    than the k-th nearest point found.
+    """
+
+    def __init__(
+        self, ids: np.ndarray, lats: np.ndarray, lons: np.ndarray, cell: float = 0.01
+    ):
+        self.cell = cell
+        self.min_lat = lats.min() if len(ids) else 0.0
+        self.min_lon = lons.min() if len(ids) else 0.0
+        rows, cols = self.cell_of(lats, lons)
+        self.n_rows = int(rows.max()) + 1 if len(ids) else 0
+        self.n_cols = int(cols.max()) + 1 if len(ids) else 0
+
+        cells = rows * self.n_cols + cols
+        order = np.argsort(cells, kind="stable")
+        self.cells = cells[order]
+        self.ids = ids[order]
+        self.lats = lats[order]
+        self.lons = lons[order]
+        # a degree of longitude is shortest at the highest latitude
+        max_lat = np.abs(lats).max() if len(ids) else 0.0
+        self.min_cell_metres = (
+            np.radians(cell) * EARTH_RADIUS * np.cos(np.radians(max_lat))
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_db(cls) -> "NearestIndex":
+        rows = Address.objects.values_list(
+            "id", Cast("lat", FloatField()), Cast("lon", FloatField())
+        )
+        rows = np.array(list(rows), dtype=np.float64).reshape(-1, 3)
+        return cls(rows[:, 0].astype(np.int64), rows[:, 1], rows[:, 2])
+
+    def cell_of(self, lats, lons) -> tuple:
+        rows = np.floor((np.asarray(lats) - self.min_lat) / self.cell).astype(np.int64)
+        cols = np.floor((np.asarray(lons) - self.min_lon) / self.cell).astype(np.int64)
+        return rows, cols
+
+    def points_within(self, row: int, col: int, radius: int) -> np.ndarray:
+        """
+        Returns the positions of the points in the square of cells within `radius` of (`row`, `col`).
+        """
+        first_col, last_col = max(col - radius, 0), min(col + radius, self.n_cols - 1)
+        if first_col > last_col:
+            return np.array([], dtype=np.int64)
+        slices = []
+        for r in range(max(row - radius, 0), min(row + radius, self.n_rows - 1) + 1):
+            start, end = np.searchsorted(
+                self.cells, [r * self.n_cols + first_col, r * self.n_cols + last_col + 1]
+            )
+            slices.append(np.arange(start, end))
+        return np.concatenate(slices) if slices else np.array([], dtype=np.int64)
+
+    def nearest(self, lat: float, lon: float, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the ids of the `k` addresses nearest to (`lat`, `lon`), nearest first, and their distances in metres.
+        """
+        k = min(k, len(self))
+        if k == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+        row, col = (int(c) for c in self.cell_of(lat, lon))
+        # the query may be outside the grid: start from the ring reaching its nearest cell
+        radius = max(-row, row - self.n_rows + 1, -col, col - self.n_cols + 1, 0)
+        max_radius = max(self.n_rows, self.n_cols) + radius
+        while True:
+            points = self.points_within(row, col, radius)
+            if len(points) >= k:
+                distances = haversine(lat, lon, self.lats[points], self.lons[points])
+                nearest = np.argpartition(distances, k - 1)[:k]
+                # any point outside the square is at least `radius` cells away
+                bound = radius * self.min_cell_metres
+                if distances[nearest].max() <= bound or radius >= max_radius:
+                    nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+                    return self.ids[points[nearest]], distances[nearest]
+            radius += 1
@@ -0,0 +1,136 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection, transaction
+from django.db.models import Case, Q, Value, When
+
+from data_gov_my.utils.etags import build_version
+from data_gov_my.utils.trigram_index import TrigramIndex
+
+from .models import Address
+from .serializers import AddressSerializer
+
+"""
+Address search. Fuzzy searches use the `%` operator of `pg_trgm` (with `pg_trgm.similarity_threshold`), which is served by
+the trigram GIN index of the addresses, instead of computing the similarity of every address.
+The index also covers the postcode and state, so that a search within a postcode or state only scans that partition.
+Postcodes are matched case insensitively, as an exact match (served by the indexes) unless the postcode has letters.
+
+Optionally, searches within a postcode are served from an in-process trigram index of the addresses of that postcode,
+built on first use and kept for the most recently searched postcodes (see `ADDRESS_SEARCH_PARTITIONS`).
+"""
+
+SCOPE = "ADDRESS"  # build version, bumped whenever the addresses are rebuilt
+SIMILARITY_THRESHOLD = 0.2
+FIELDS = AddressSerializer.Meta.fields
+
+
+def postcode_filter(postcode: str) -> Q:
+    """
+    Case insensitive match of `postcode`. Postcodes without letters (as Malaysian postcodes are) are matched exactly, which the
+    indexes on the postcode can serve, unlike `iexact`.
+    """
+    if postcode.upper() == postcode.lower():
+        return Q(postcode=postcode)
+    return Q(postcode__iexact=postcode)
+
+
+class PartitionIndex:
+    """
+    The addresses of a partition (e.g. a postcode), with a trigram index of their `address`.
+    """
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.index = TrigramIndex([row["address"] for row in rows])
+
+    @classmethod
+    def from_db(cls, postcode: str) -> "PartitionIndex":
+        rows = Address.objects.filter(postcode_filter(postcode))
+        rows = rows.order_by("id").values(*FIELDS)
+        return cls(list(rows))
+
+    def search(self, address: str, n: int) -> list[dict]:
+        rows, similarity = self.index.search(address, n)
+        return [
+            self.rows[row]
+            for row, s in zip(rows.tolist(), similarity.tolist())
+            if s >= SIMILARITY_THRESHOLD
+        ]
+
+
+class PartitionCache:
+    """
+    Per-process LRU of the `max_partitions` most recently searched postcode partitions, for the current build of the addresses.
+    """
+
+    def __init__(self, max_partitions: int):
+        self.max_partitions = max_partitions
+        self._lock = threading.Lock()
+        self._partitions = OrderedDict()  # {(build version, postcode): PartitionIndex}
+
+    def get(self, postcode: str) -> PartitionIndex:
+        key = (build_version(SCOPE), postcode.upper())  # matched case insensitively
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is not None:
+                self._partitions.move_to_end(key)
+                return partition
+
+        partition = PartitionIndex.from_db(postcode)
+        with self._lock:
+            self._partitions[key] = partition
+            while len(self._partitions) > self.max_partitions:
+                self._partitions.popitem(last=False)
+        return partition
+
+    def clear(self):
+        with self._lock:
+            self._partitions.clear()
+
+
+partition_cache = PartitionCache(settings.ADDRESS_SEARCH_PARTITIONS)
+
+
+def fuzzy_search(
+    address: str, n: int, postcode: str = None, state: str = None
+) -> list[dict]:
+    """
+    Returns the (at most `n`) addresses most similar to `address`, within `postcode` and `state` if given.
+    """
+    if postcode and not state and partition_cache.max_partitions > 0:
+        return partition_cache.get(postcode).search(address, n)
+
+    queryset = Address.objects.filter(address__trigram_similar=address)
+    if postcode:
+        queryset = queryset.filter(postcode_filter(postcode))
+    if state:
+        queryset = queryset.filter(state=state)
+    queryset = (
+        queryset.annotate(similarity=TrigramSimilarity("address", address))
+        .order_by("-similarity")
+        .values(*FIELDS)[:n]
+    )
+
+    # the threshold of `%` is a setting, only changed for this transaction
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SET LOCAL pg_trgm.similarity_threshold = %s", [SIMILARITY_THRESHOLD]
+        )
+        return list(queryset)
+
+
+def unit_search(unit: str = None, n: int = 10, postcode: str = None) -> list[dict]:
+    """
+    Returns the addresses within `postcode` containing `unit`, those starting with `unit` first.
+    """
+    queryset = Address.objects.all()
+    if postcode is not None:
+        queryset = queryset.filter(postcode_filter(postcode))
+    if unit is not None:
+        queryset = queryset.filter(address__icontains=unit).order_by(
+            Case(When(address__istartswith=unit, then=Value(0)), default=Value(1))
+        )
+    return list(queryset.values(*FIELDS)[:n])
@@ -1,29 +1,27 @@
-import csv
-import json
-import os
-
-import requests
 from celery import shared_task
-from .models import Address
 
+from data_gov_my.utils.copy_loader import copy_parquet
+from data_gov_my.utils.etags import bump_build_version
+from data_gov_my.utils.parquet_cache import count_parquet_rows
+
+from .models import Address
+from .search import SCOPE
 
-@shared_task(name="Rebuild address")
-def rebuild_address(file_content):
-    # Create a CSV reader
-    csv_reader = csv.reader(file_content.splitlines())
+ADDRESS_PARQUET = "https://storage.data.gov.my/dashboards/alamat_sample.parquet"
 
-    # Assuming the first row of the CSV file contains column headers
-    headers = next(csv_reader)
 
-    # Create a list to store Address instances
-    address_instances = []
+@shared_task(bind=True, name="Rebuild address")
+def rebuild_address(self, source: str = ADDRESS_PARQUET):
+    """
+    Rebuilds the address table from the parquet at `source`, streamed by row groups into a shadow table swapped in once loaded.
+    While running, the task is in the PROGRESS state, with the rows copied so far and the total rows of the parquet.
+    """
+    total = count_parquet_rows(source)
 
-    # Iterate through the remaining rows and create/update Address instances
-    for row in csv_reader:
-        address_data = dict(zip(headers, row))
-        # Create an Address instance without saving it to the database
-        address_instance = Address(**address_data)
-        address_instances.append(address_instance)
+    def progress(rows: int):
+        if self.request.id:  # not when called directly, e.g. by populate_address
+            self.update_state(state="PROGRESS", meta={"rows": rows, "total": total})
 
-    # Use bulk_create to efficiently create/update all instances in one query
-    Address.objects.bulk_create(address_instances, batch_size=20000)
+    count = copy_parquet(Address, source, replace=True, progress=progress)
+    bump_build_version(SCOPE)
+    return {"rows": count, "total": total}
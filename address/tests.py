@@ -1,3 +1,202 @@
-from django.test import TestCase
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
 # Create your tests here.
+from address import search
+from address.models import Address
+from address.nearest import NearestIndex, haversine
+from address.tasks import rebuild_address
+from data_gov_my.utils.index_registry import index_registry
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestAddressSearch(TestCase):
+    def setUp(self):
+        for address, postcode, state in [
+            ("1 Jalan Ampang, Kuala Lumpur", "50450", "W.P. Kuala Lumpur"),
+            ("12 Jalan Ampang, Kuala Lumpur", "50450", "W.P. Kuala Lumpur"),
+            ("3 Jalan Ampang Hilir, Kuala Lumpur", "55000", "W.P. Kuala Lumpur"),
+            ("Lot 5 Jalan Sultan, Petaling Jaya", "46200", "Selangor"),
+        ]:
+            Address.objects.create(
+                address=address,
+                state=state,
+                district="",
+                subdistrict="",
+                locality="",
+                parlimen="",
+                dun="",
+                lat=3.1,
+                lon=101.7,
+                postcode=postcode,
+            )
+        search.partition_cache.clear()
+
+    def test_fuzzy_search_by_partition(self):
+        results = search.fuzzy_search("jalan ampang", 10)
+        self.assertEqual(
+            {r["postcode"] for r in results}, {"50450", "55000"}
+        )  # above the similarity threshold
+        self.assertEqual(
+            [r["address"] for r in search.fuzzy_search("12 jalan ampang", 1)],
+            ["12 Jalan Ampang, Kuala Lumpur"],
+        )
+        self.assertEqual(
+            len(search.fuzzy_search("jalan ampang", 10, postcode="50450")), 2
+        )
+        self.assertEqual(search.fuzzy_search("jalan ampang", 10, state="Selangor"), [])
+
+    def test_in_memory_partition_matches_postgres(self):
+        expected = search.fuzzy_search("1 jalan ampang", 10, postcode="50450")
+        search.partition_cache.max_partitions = 1
+        try:
+            with self.assertNumQueries(1):  # loading the partition
+                self.assertEqual(
+                    search.fuzzy_search("1 jalan ampang", 10, postcode="50450"),
+                    expected,
+                )
+            with self.assertNumQueries(0):
+                search.fuzzy_search("ampang", 10, postcode="50450")
+        finally:
+            search.partition_cache.max_partitions = 0
+
+    def test_unit_search(self):
+        results = search.unit_search("lot 5", 10, postcode="46200")
+        self.assertEqual(
+            [r["address"] for r in results], ["Lot 5 Jalan Sultan, Petaling Jaya"]
+        )
+        results = search.unit_search("2", 10, postcode="50450")  # not a prefix
+        self.assertEqual(
+            [r["address"] for r in results], ["12 Jalan Ampang, Kuala Lumpur"]
+        )
+        self.assertEqual(len(search.unit_search(postcode="50450")), 2)
+
+    def test_postcode_case_insensitive(self):
+        Address.objects.filter(postcode="46200").update(postcode="ab46200")
+        for postcode in ["AB46200", "ab46200"]:
+            self.assertEqual(len(search.unit_search(postcode=postcode)), 1)
+            self.assertEqual(
+                len(search.fuzzy_search("lot 5 jalan sultan", 10, postcode=postcode)),
+                1,
+            )
+
+        search.partition_cache.max_partitions = 1
+        try:
+            self.assertEqual(
+                len(search.fuzzy_search("lot 5 jalan sultan", 10, postcode="AB46200")),
+                1,
+            )
+            with self.assertNumQueries(0):  # the same partition
+                search.fuzzy_search("lot 5", 10, postcode="ab46200")
+        finally:
+            search.partition_cache.max_partitions = 0
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestAddressRebuild(TestCase):
+    def test_rebuild_streams_parquet_into_table(self):
+        Address.objects.create(
+            address="stale",
+            state="",
+            district="",
+            subdistrict="",
+            locality="",
+            parlimen="",
+            dun="",
+            lat=0,
+            lon=0,
+            postcode="00000",
+        )
+        df = pd.DataFrame(
+            {
+                "address": [f"{i} Jalan Ampang" for i in range(5)],
+                "state": "W.P. Kuala Lumpur",
+                "district": "Kuala Lumpur",
+                "subdistrict": "",
+                "locality": "",
+                "parlimen": "Bukit Bintang",
+                "dun": "",
+                "lat": [3.1 + i / 100 for i in range(5)],
+                "lon": 101.7,
+                "postcode": "50450",
+            }
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "address.parquet")
+            df.to_parquet(source, row_group_size=2)
+            self.assertEqual(rebuild_address(source), {"rows": 5, "total": 5})
+
+        self.assertEqual(Address.objects.count(), 5)
+        self.assertFalse(Address.objects.filter(address="stale").exists())
+
+    def test_status_of_unknown_task(self):
+        url = reverse("address-upload-status", kwargs={"task_id": "unknown"})
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["status"], "PENDING")
+
+
+class TestNearestIndex(TestCase):
+    def test_nearest_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        lats = rng.uniform(1, 7, 5000)
+        lons = rng.uniform(100, 119, 5000)
+        index = NearestIndex(np.arange(5000) + 1, lats, lons, cell=0.05)
+
+        queries = [(3.14, 101.69, 10), (5.4, 116.0, 1), (0.1, 99.0, 5), (3, 110, 5000)]
+        for lat, lon, k in queries:
+            ids, distances = index.nearest(lat, lon, k)
+            expected = np.argsort(haversine(lat, lon, lats, lons), kind="stable")[:k]
+            self.assertEqual(ids.tolist(), (expected + 1).tolist())
+            self.assertTrue(np.all(np.diff(distances) >= 0))
+
+    def test_empty_index(self):
+        index = NearestIndex(np.array([], dtype=np.int64), np.array([]), np.array([]))
+        self.assertEqual(index.nearest(3.14, 101.69, 10)[0].tolist(), [])
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestAddressNearestView(TestCase):
+    def setUp(self):
+        for address, lat, lon, parlimen in [
+            ("Menara KL", 3.1528, 101.7038, "Bukit Bintang"),
+            ("KLCC", 3.1579, 101.7123, "Bukit Bintang"),
+            ("Putrajaya", 2.9264, 101.6964, "Putrajaya"),
+        ]:
+            Address.objects.create(
+                address=address,
+                state="",
+                district="",
+                subdistrict="",
+                locality="",
+                parlimen=parlimen,
+                dun="",
+                lat=lat,
+                lon=lon,
+                postcode="",
+            )
+        index_registry.clear()
+
+    def test_nearest(self):
+        url = reverse("address-nearest")
+        res = self.client.get(url, {"lat": 3.1500, "lon": 101.7000, "k": 2})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([a["address"] for a in res.json()], ["Menara KL", "KLCC"])
+        self.assertEqual(res.json()[0]["parlimen"], "Bukit Bintang")
+        self.assertLess(res.json()[0]["distance"], 1000)
+
+        self.assertEqual(self.client.get(url, {"lat": 3.15}).status_code, 400)
+        self.assertEqual(
+            self.client.get(url, {"lat": 3.15, "lon": 101.7, "k": 0}).status_code, 400
+        )
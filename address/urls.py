@@ -1,5 +1,10 @@
 from django.urls import path
-from address.views import AddressSearchView, AddressUploadView
+from address.views import (
+    AddressNearestView,
+    AddressSearchView,
+    AddressUploadStatusView,
+    AddressUploadView,
+)
 
 urlpatterns = [
     path("", AddressUploadView.as_view(), name="address-upload"),
@@ -8,4 +13,14 @@ urlpatterns = [
         AddressSearchView.as_view(),
         name="address-search",
     ),
+    path(
+        "nearest/",
+        AddressNearestView.as_view(),
+        name="address-nearest",
+    ),
+    path(
+        "status/<str:task_id>/",
+        AddressUploadStatusView.as_view(),
+        name="address-upload-status",
+    ),
 ]
@@ -1,20 +1,15 @@
 # views.py
-import csv
-from io import BytesIO, StringIO, TextIOWrapper
-import numpy as np
-import pandas as pd
-from rest_framework.parsers import FileUploadParser
+from celery.result import AsyncResult
+from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from address.tasks import rebuild_address
+from data_gov_my.utils.index_registry import index_registry
+from . import search
 from .models import Address
-from rest_framework.generics import ListAPIView
-from rest_framework.response import Response
-
-from .models import Address
+from .nearest import NearestIndex
 from .serializers import AddressSerializer
-from django.contrib.postgres.search import TrigramSimilarity, TrigramWordSimilarity
 
 
 class AddressSearchByAddView(ListAPIView):
@@ -26,10 +21,8 @@ class AddressSearchView(ListAPIView):
 
     def get_queryset(self):
         """
-        Exact case insensitive match postcode, partial match unit, fuzzy search address.
+        Exact case insensitive match postcode, exact match state, partial match unit, fuzzy search address.
         """
-        queryset = Address.objects.all()
-
         # result size
         n = 10
         size: str = self.request.query_params.get("size", "")
@@ -37,40 +30,69 @@ class AddressSearchView(ListAPIView):
             size = int(size)
             n = size
 
-        # full text search (fuzzy)
+        postcode = self.request.query_params.get("postcode")
         address = self.request.query_params.get("address")
         if address:
-            queryset = (
-                queryset.annotate(similarity=TrigramSimilarity("address", address))
-                .filter(similarity__gt=0.2)
-                .order_by("-similarity")
-            )
+            # full text search (fuzzy), within the postcode / state if given
+            state = self.request.query_params.get("state")
+            return search.fuzzy_search(address, n, postcode=postcode, state=state)
 
-        else:
-            # postcode (exact) and unit (contains)
-            postcode = self.request.query_params.get("postcode")
-            if postcode is not None:
-                queryset = queryset.filter(postcode__iexact=postcode)
+        # postcode (exact) and unit (contains)
+        unit = self.request.query_params.get("unit")
+        return search.unit_search(unit, n, postcode=postcode)
 
-            unit = self.request.query_params.get("unit")
-            if unit is not None:
-                temp = queryset.filter(address__istartswith=unit)
-                if not queryset.exists():
-                    temp = queryset.filter(address__icontains=unit)
-                queryset = temp
-        return queryset[:n]
 
+class AddressNearestView(APIView):
+    MAX_K = 100
 
-class AddressUploadView(APIView):
-    PARQUET_LINK = "https://storage.data.gov.my/dashboards/alamat_sample.parquet"
+    def get(self, request, *args, **kwargs):
+        """
+        The k nearest addresses to a coordinate, nearest first, with their distance in metres.
+        """
+        try:
+            lat = float(request.query_params["lat"])
+            lon = float(request.query_params["lon"])
+            k = int(request.query_params.get("k", 10))
+        except (KeyError, ValueError):
+            return Response(
+                {"message": "Please provide numeric lat, lon (and k) query params."},
+                status=400,
+            )
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180 and 1 <= k <= self.MAX_K):
+            message = f"lat, lon must be coordinates, and 1 <= k <= {self.MAX_K}."
+            return Response({"message": message}, status=400)
+
+        # rebuilt once the addresses are rebuilt
+        index: NearestIndex = index_registry.get(
+            "ADDRESS_NEAREST", search.SCOPE, NearestIndex.from_db
+        )
+        ids, distances = index.nearest(lat, lon, k)
+        addresses = Address.objects.in_bulk(ids.tolist())
+        res = [
+            dict(AddressSerializer(addresses[id]).data, distance=distance)
+            for id, distance in zip(ids.tolist(), distances.tolist())
+            if id in addresses
+        ]
+        return Response(res, status=200)
 
+
+class AddressUploadView(APIView):
     def post(self, request, *args, **kwargs):
-        df = pd.read_parquet(self.PARQUET_LINK)
-        df.replace({np.nan: None}, inplace=True)
-        address_data = df.to_dict(orient="records")
-        address_instances = [Address(**data) for data in address_data]
-        Address.objects.all().delete()
-        Address.objects.bulk_create(address_instances, batch_size=10000)
+        # rebuilt by a celery task, see `AddressUploadStatusView` for its progress
+        task = rebuild_address.delay()
         return Response(
-            {"message": f"Created {Address.objects.count()} addresses."}, status=200
+            {"message": "Rebuilding addresses.", "task_id": task.id}, status=202
         )
+
+
+class AddressUploadStatusView(APIView):
+    def get(self, request, task_id: str, *args, **kwargs):
+        result = AsyncResult(task_id)
+        res = {"task_id": task_id, "status": result.status}
+        if result.status == "PROGRESS":
+            res["progress"] = result.info
+        elif result.successful():
+            res["result"] = result.result
+        elif result.failed():
+            res["message"] = str(result.result)
+        return Response(res, status=200)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, HttpUrl
 
 
@@ -74,3 +74,4 @@ class DataCatalogueValidateModel(BaseModel):
     translations_en: dict = {}
     translations_ms: dict = {}
     related_datasets: list[RelatedDataset] = []
+    storage: Literal["rows", "parquet"] = "rows"
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("data_catalogue", "0016_alter_datacataloguemeta_data_source"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datacataloguemeta",
+            name="storage",
+            field=models.CharField(
+                choices=[
+                    ("rows", "One DataCatalogue row per record"),
+                    ("parquet", "Single DataCatalogueParquet blob"),
+                ],
+                default="rows",
+                max_length=10,
+            ),
+        ),
+        migrations.CreateModel(
+            name="DataCatalogueParquet",
+            fields=[
+                (
+                    "catalogue_meta",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="data_catalogue.datacataloguemeta",
+                    ),
+                ),
+                ("data", models.BinaryField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("data_catalogue", "0017_datacataloguemeta_storage_datacatalogueparquet"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DataCatalogueSlice",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=40)),
+                ("data", models.BinaryField()),
+                (
+                    "catalogue_meta",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="data_catalogue.datacataloguemeta",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("catalogue_meta", "key"),
+                        name="unique_datacatalogueslice",
+                    )
+                ],
+            },
+        ),
+    ]
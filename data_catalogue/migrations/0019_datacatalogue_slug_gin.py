@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-17 20:00
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import BtreeGinExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("data_catalogue", "0018_datacatalogueslice"),
+    ]
+
+    operations = [
+        BtreeGinExtension(),
+        migrations.AddIndex(
+            model_name="datacatalogue",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["catalogue_meta", "slug"],
+                name="data_catalogue_slug_gin",
+                opclasses=["varchar_ops", "jsonb_path_ops"],
+            ),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from jsonfield import JSONField
 
 # Create your models here.
@@ -50,6 +51,11 @@ class SiteCategory(models.Model):
 
 
 class DataCatalogueMeta(models.Model):
+    STORAGE_CHOICES = [
+        ("rows", "One DataCatalogue row per record"),
+        ("parquet", "Single DataCatalogueParquet blob"),
+    ]
+
     id = models.CharField(max_length=255, primary_key=True)
     exclude_openapi = models.BooleanField()
     manual_trigger = models.CharField(max_length=255)
@@ -87,6 +93,9 @@ class DataCatalogueMeta(models.Model):
     translations = models.JSONField()  # translatable
     related_datasets = models.ManyToManyField(RelatedDataset)
 
+    # storage engine of the catalogue rows
+    storage = models.CharField(max_length=10, choices=STORAGE_CHOICES, default="rows")
+
 
 class DataCatalogue(models.Model):
     """
@@ -99,10 +108,48 @@ class DataCatalogue(models.Model):
     slug = models.JSONField(default=dict)  # e.g. {"country": "new-zealand"}
 
     class Meta:
-        indexes = [models.Index(fields=["id"], name="data_catalogue_idx")]
+        indexes = [
+            models.Index(fields=["id"], name="data_catalogue_idx"),
+            # retrieve filters by catalogue and `slug__contains` (requires btree_gin for the catalogue column)
+            GinIndex(
+                fields=["catalogue_meta", "slug"],
+                opclasses=["varchar_ops", "jsonb_path_ops"],
+                name="data_catalogue_slug_gin",
+            ),
+        ]
         ordering = ["index"]
 
 
+class DataCatalogueParquet(models.Model):
+    """
+    Columnar storage of a data catalogue's rows, as a single parquet blob (see `data_catalogue.utils.storage`).
+    Used instead of `DataCatalogue` rows when the catalogue's storage is "parquet".
+    """
+
+    catalogue_meta = models.OneToOneField(
+        DataCatalogueMeta, on_delete=models.CASCADE, primary_key=True
+    )
+    data = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class DataCatalogueSlice(models.Model):
+    """
+    Pre-serialized rows of a data catalogue, for one combination of dataviz filter values (see `data_catalogue.utils.slices`).
+    """
+
+    catalogue_meta = models.ForeignKey(DataCatalogueMeta, on_delete=models.CASCADE)
+    key = models.CharField(max_length=40)  # sha1 of the filter columns and their slugs
+    data = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["catalogue_meta", "key"], name="unique_datacatalogueslice"
+            )
+        ]
+
+
 class Dataviz(models.Model):
     catalogue_meta = models.ForeignKey(DataCatalogueMeta, on_delete=models.CASCADE)
     dataviz_id = models.CharField(max_length=255)
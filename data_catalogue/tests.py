@@ -1,3 +1,202 @@
-from django.test import TestCase
+import json
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+import pandas as pd
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
 
 # Create your tests here.
+from data_catalogue.models import DataCatalogue, DataCatalogueMeta, DataCatalogueSlice
+from data_catalogue.utils import ingest
+from data_catalogue.utils.slices import (
+    CatalogueSlices,
+    build_catalogue_slices,
+    catalogue_slices,
+    get_catalogue_slice,
+    slice_key,
+)
+from data_catalogue.utils.storage import read_blob_rows, to_parquet_blob
+
+
+def create_catalogue_meta(id="catalogue") -> DataCatalogueMeta:
+    return DataCatalogueMeta.objects.create(
+        id=id,
+        exclude_openapi=False,
+        manual_trigger="",
+        title="",
+        description="",
+        frequency="",
+        geography=[],
+        demography=[],
+        dataset_begin=2020,
+        dataset_end=2020,
+        data_source=[],
+        data_as_of="",
+        methodology="",
+        caveat="",
+        publication="",
+        translations={},
+    )
+
+
+class TestCatalogueParquetStorage(SimpleTestCase):
+    def test_parquet_blob_filters_slices(self):
+        df = pd.DataFrame(
+            {
+                "state": ["Kedah", "Johor", "Kedah", "Johor"],
+                "date": ["2020", "2020", "2021", "2021"],
+                "value": [1.0, None, 3.0, 4.0],
+            }
+        )
+        slug_df = pd.DataFrame({"state": ["kedah", "johor", "kedah", "johor"]})
+        blob = to_parquet_blob(df, slug_df)
+
+        self.assertEqual(
+            read_blob_rows(blob, {"state": "johor"}),
+            [
+                {"state": "Johor", "date": "2020", "value": None},
+                {"state": "Johor", "date": "2021", "value": 4.0},
+            ],
+        )
+        self.assertEqual(
+            [row["value"] for row in read_blob_rows(blob, {})], [1.0, None, 3.0, 4.0]
+        )
+
+
+class TestCatalogueSlices(SimpleTestCase):
+    def test_slices_per_filter_combination(self):
+        data = [
+            {"state": "Johor", "sex": "male", "value": 1},
+            {"state": "Kedah", "sex": "male", "value": 2},
+            {"state": "Johor", "sex": "female", "value": 3},
+            {"state": "Johor", "sex": "male", "value": 4},
+        ]
+        slug_df = pd.DataFrame(
+            {
+                "state": ["johor", "kedah", "johor", "johor"],
+                "sex": ["male", "male", "female", "male"],
+            }
+        )
+        slices = catalogue_slices(data, slug_df, [["state", "sex"], ["state"], []])
+
+        self.assertEqual(len(slices), 3 + 2 + 1)
+        key = slice_key({"state": "johor", "sex": "male"})
+        self.assertEqual(json.loads(slices[key]), [data[0], data[3]])
+        self.assertEqual(json.loads(slices[slice_key({})]), data)
+
+    @override_settings(CATALOGUE_SLICE_MAX_ROWS=3)
+    def test_slices_accumulate_over_batches(self):
+        data = [{"state": s, "value": i} for i, s in enumerate(["Johor", "Kedah"] * 3)]
+        slug_df = pd.DataFrame({"state": ["johor", "kedah"] * 3})
+
+        slices = CatalogueSlices([["state"], []])
+        for start in range(0, len(data), 4):
+            slices.add(data[start : start + 4], slug_df.iloc[start : start + 4])
+        payloads = dict(slices.payloads())
+        slices.close()
+
+        # the unfiltered slice (6 rows) is above the limit
+        self.assertEqual(payloads, catalogue_slices(data, slug_df, [["state"], []]))
+        self.assertEqual(
+            set(payloads),
+            {slice_key({"state": "johor"}), slice_key({"state": "kedah"})},
+        )
+        self.assertEqual(
+            json.loads(payloads[slice_key({"state": "kedah"})]), data[1::2]
+        )
+
+    @override_settings(CATALOGUE_SLICE_MAX_ROWS=2)
+    def test_rows_of_dropped_slices_are_not_encoded(self):
+        data = [{"state": s} for s in ["Johor", "Kedah", "Kedah", "Kedah"]]
+        slug_df = pd.DataFrame({"state": ["johor", "kedah", "kedah", "kedah"]})
+        slices = CatalogueSlices([["state"], []])
+
+        with mock.patch(
+            "data_catalogue.utils.slices.serialize", side_effect=lambda row: b"{}"
+        ) as serialize:
+            slices.add(data, slug_df)
+            self.assertEqual(serialize.call_count, 1)  # only "johor" is stored
+            slices.add(data[:1], slug_df.iloc[:1])
+            self.assertEqual(serialize.call_count, 2)
+        self.assertEqual(
+            [key for key, _ in slices.payloads()], [slice_key({"state": "johor"})]
+        )
+        slices.close()
+
+
+class TestCatalogueSliceStorage(TestCase):
+    def test_slices_written_in_batches(self):
+        catalogue_meta = create_catalogue_meta()
+        slices = {slice_key({"state": s}): b"[{}]" for s in ["johor", "kedah", "perak"]}
+
+        manager = DataCatalogueSlice.objects
+        with mock.patch.object(
+            manager, "bulk_create", wraps=manager.bulk_create
+        ) as bulk_create:
+            build_catalogue_slices(catalogue_meta, iter(slices.items()), batch_bytes=8)
+        self.assertEqual([len(c.args[0]) for c in bulk_create.call_args_list], [2, 1])
+        self.assertEqual(get_catalogue_slice(catalogue_meta, {"state": "perak"}), b"[{}]")
+
+
+class TestCatalogueIngest(TestCase):
+    def test_batches_slugify_once(self):
+        calls = []
+        df = pd.DataFrame(
+            {
+                "state": ["Johor", "Kedah", "Johor", "Kedah", "Johor"],
+                "value": [1.0, None, 3.0, 4.0, 5.0],
+            },
+            index=pd.Index([10, 11, 12, 13, 14], name="idx"),
+        )
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(
+            ingest, "slugify", lambda v: calls.append(v) or v.lower()
+        ):
+            path = f"{tmp}/catalogue.parquet"
+            df.to_parquet(path)
+            batches = list(ingest.iter_catalogue_batches(path, ["state"], batch_size=2))
+
+        self.assertEqual([len(rows) for rows, _ in batches], [2, 2, 1])
+        self.assertEqual(
+            batches[0][0],
+            [{"state": "Johor", "value": 1.0}, {"state": "Kedah", "value": None}],
+        )
+        self.assertEqual(
+            [s for _, slug_df in batches for s in slug_df["state"]],
+            ["johor", "kedah", "johor", "kedah", "johor"],
+        )
+        self.assertEqual(calls, ["Johor", "Kedah"])
+
+    def test_copy_encodes_timestamps_and_decimals(self):
+        catalogue_meta = create_catalogue_meta()
+        df = pd.DataFrame(
+            {
+                "recorded_at": pd.to_datetime(["2020-01-01 08:00", "2020-01-02"]),
+                "amount": [Decimal("1.50"), Decimal("2")],
+                "state": ["Johor", "Kedah"],
+            }
+        )
+        rows, slug_df = ingest.prepare_catalogue_frame(df, ["state"], {})
+        ingest.copy_catalogue_rows(catalogue_meta, 0, rows.to_dict("records"), slug_df)
+
+        stored = DataCatalogue.objects.filter(catalogue_meta=catalogue_meta)
+        self.assertEqual(
+            [r.data for r in stored],
+            [
+                {"recorded_at": "2020-01-01T08:00:00", "amount": "1.50", "state": "Johor"},
+                {"recorded_at": "2020-01-02T00:00:00", "amount": "2", "state": "Kedah"},
+            ],
+        )
+        self.assertEqual([r.slug for r in stored], [{"state": "johor"}, {"state": "kedah"}])
+
+
+class TestDataCatalogueSlugQuery(TestCase):
+    def test_slug_filter_uses_gin_index(self):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = DataCatalogue.objects.filter(
+                catalogue_meta_id="catalogue", slug__contains={"state": "johor"}
+            ).explain()
+        self.assertIn("data_catalogue_slug_gin", plan)
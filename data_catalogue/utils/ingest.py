@@ -0,0 +1,89 @@
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+from django.db import connection
+from slugify import slugify
+
+from data_catalogue.models import DataCatalogue
+from data_gov_my.utils.chart_payloads import serialize
+from data_gov_my.utils.parquet_cache import iter_parquet
+
+"""
+Streaming ingestion of data catalogue rows: the parquet is read one batch of rows at a time,
+and every batch is written to the `DataCatalogue` table with Postgres `COPY`, so memory is bounded by the batch size.
+"""
+
+BATCH_SIZE = 50_000
+
+
+def slugify_values(values: pd.Series, slugs: dict) -> np.ndarray:
+    """
+    Slugifies `values`, calling `slugify()` once per distinct value. `slugs` ({value: slug}) is shared across batches.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    for value in uniques:
+        if value not in slugs:
+            slugs[value] = slugify(value)
+    return np.array([slugs[value] for value in uniques], dtype=object)[codes]
+
+
+def prepare_catalogue_frame(
+    df: pd.DataFrame, slug_fields: list[str], slugs: dict
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Returns the catalogue rows of `df` (as stored, with nulls as None) and their slugified filter columns.
+    `slugs` is the {column: {value: slug}} map shared across batches.
+    """
+    if "date" in df.columns:
+        df["date"] = df["date"].astype(str)
+    df = df.replace({np.nan: None})
+    slug_df = pd.DataFrame(
+        {
+            col: slugify_values(df[col], slugs.setdefault(col, {}))
+            for col in slug_fields
+        },
+        index=df.index,
+    )
+    return df, slug_df
+
+
+def iter_catalogue_batches(
+    source: str, slug_fields: list[str], batch_size=BATCH_SIZE
+):
+    """
+    Yields (rows, slug_df) for each batch of at most `batch_size` rows of the parquet at `source`, in file order.
+    """
+    slugs = {}
+    for batch in iter_parquet(source, batch_size):
+        df, slug_df = prepare_catalogue_frame(batch, slug_fields, slugs)
+        yield df.to_dict(orient="records"), slug_df
+
+
+def copy_catalogue_rows(
+    catalogue_meta, start: int, rows: list[dict], slug_df: pd.DataFrame
+):
+    """
+    Writes a batch of catalogue rows (indexed from `start`) with a single `COPY`.
+    Rows are JSON encoded as the catalogue slices are, e.g. timestamps and decimals as strings.
+    """
+    slug_rows = slug_df.to_dict(orient="records") if len(slug_df.columns) else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for i, row in enumerate(rows):
+        slug = slug_rows[i] if slug_rows else {}
+        data, slug = serialize(row).decode(), serialize(slug).decode()
+        writer.writerow([start + i, catalogue_meta.pk, data, slug])
+    buffer.seek(0)
+
+    opts = DataCatalogue._meta
+    columns = ", ".join(
+        connection.ops.quote_name(opts.get_field(f).column)
+        for f in ["index", "catalogue_meta", "data", "slug"]
+    )
+    table = connection.ops.quote_name(opts.db_table)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Iterable, Iterator
+
+import pandas as pd
+from django.conf import settings
+
+from data_catalogue.models import DataCatalogueSlice
+from data_gov_my.utils.chart_payloads import serialize
+
+WRITE_BATCH_BYTES = 64 * 1024 * 1024  # of slice payloads held in memory while writing them
+
+
+def slice_key(filters: dict[str, str]) -> str:
+    """
+    Returns the key of the catalogue slice selected by `filters` ({filter column: slug}, in filter column order).
+    """
+    return hashlib.sha1(json.dumps(list(filters.items())).encode()).hexdigest()
+
+
+class CatalogueSlices:
+    """
+    Accumulates the pre-serialized rows of every combination of slugs, for each distinct set of dataviz filter columns,
+    over consecutive batches of catalogue rows. Slices above `CATALOGUE_SLICE_MAX_ROWS` rows are left out,
+    and are read from the catalogue's storage engine instead.
+
+    The rows of each batch are spooled to a temporary file, so that only the offsets of the parts of each slice
+    are held in memory until the slices are written.
+    """
+
+    def __init__(self, filter_column_sets: list):
+        self.filter_column_sets = filter_column_sets
+        self._spool = tempfile.TemporaryFile()
+        self._parts = {}  # {slice key: [(offset, length)]}, None once above the limit
+        self._counts = {}  # {slice key: rows}
+
+    def add(self, data: list[dict], slug_df: pd.DataFrame):
+        encoded = {}  # {row: encoded row}, only for the rows of slices still stored
+
+        def encode(i: int) -> bytes:
+            if i not in encoded:
+                encoded[i] = serialize(data[i])
+            return encoded[i]
+
+        self._spool.seek(0, os.SEEK_END)
+        for filter_columns in self.filter_column_sets:
+            if filter_columns:
+                groups = slug_df.groupby(filter_columns, sort=False, dropna=False).indices
+            elif self._parts.get(slice_key({}), []) is None:
+                continue  # the whole catalogue is above the limit
+            else:
+                groups = {(): range(len(data))}
+
+            for slugs, rows in groups.items():
+                slugs = slugs if isinstance(slugs, tuple) else (slugs,)
+                key = slice_key(dict(zip(filter_columns, map(str, slugs))))
+                parts = self._parts.setdefault(key, [])
+                if parts is None:
+                    continue
+                count = self._counts.get(key, 0) + len(rows)
+                if count > settings.CATALOGUE_SLICE_MAX_ROWS:
+                    self._parts[key] = None
+                    continue
+                part = b", ".join(encode(i) for i in rows)
+                parts.append((self._spool.tell(), len(part)))
+                self._spool.write(part)
+                self._counts[key] = count
+
+    def payloads(self) -> Iterator[tuple[str, bytes]]:
+        """
+        Yields the (slice key, payload) of every stored slice, read back from the spool one slice at a time.
+        """
+        for key, parts in self._parts.items():
+            if parts is None:
+                continue
+            chunks = []
+            for offset, length in parts:
+                self._spool.seek(offset)
+                chunks.append(self._spool.read(length))
+            # same encoding as `serialize()` of the whole list of rows
+            yield key, b"[" + b", ".join(chunks) + b"]"
+
+    def close(self):
+        self._spool.close()
+
+
+def catalogue_slices(
+    data: list[dict], slug_df: pd.DataFrame, filter_column_sets: list
+) -> dict[str, bytes]:
+    """
+    Returns the pre-serialized slices of a whole catalogue by slice key, see `CatalogueSlices`.
+    """
+    slices = CatalogueSlices(filter_column_sets)
+    try:
+        slices.add(data, slug_df)
+        return dict(slices.payloads())
+    finally:
+        slices.close()
+
+
+def build_catalogue_slices(
+    catalogue_meta, slices: Iterable[tuple[str, bytes]], batch_bytes=WRITE_BATCH_BYTES
+):
+    """
+    Replaces the stored slices of a catalogue with `slices` ((slice key, payload) pairs),
+    inserted in batches of at most `batch_bytes` of payloads.
+    """
+    DataCatalogueSlice.objects.filter(catalogue_meta=catalogue_meta).delete()
+    batch, size = [], 0
+    for key, payload in slices:
+        batch.append(
+            DataCatalogueSlice(catalogue_meta=catalogue_meta, key=key, data=payload)
+        )
+        size += len(payload)
+        if size >= batch_bytes:
+            DataCatalogueSlice.objects.bulk_create(batch, batch_size=500)
+            batch, size = [], 0
+    DataCatalogueSlice.objects.bulk_create(batch, batch_size=500)
+
+
+def get_catalogue_slice(catalogue_meta, filters: dict[str, str]) -> bytes | None:
+    """
+    Returns the pre-serialized rows selected by `filters`, or None if the slice was not stored.
+    """
+    data = (
+        DataCatalogueSlice.objects.filter(
+            catalogue_meta=catalogue_meta, key=slice_key(filters)
+        )
+        .values_list("data", flat=True)
+        .first()
+    )
+    return None if data is None else bytes(data)
@@ -0,0 +1,69 @@
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_catalogue.models import DataCatalogueParquet
+
+"""
+Columnar ("parquet") storage engine of data catalogue rows, see `DataCatalogueMeta.storage`.
+The whole catalogue is kept as one parquet blob, with its original row index and a slug column per filter column.
+Rows are sorted by their slugs, so that a filtered read only decodes the row groups of the selected slice.
+"""
+
+INDEX_COLUMN = "__index__"
+SLUG_PREFIX = "__slug__"
+ROW_GROUP_SIZE = 16_384
+
+
+def to_parquet_blob(df: pd.DataFrame, slug_df: pd.DataFrame) -> bytes:
+    """
+    Serializes the catalogue dataframe and its slugified filter columns into a parquet blob.
+    """
+    table = df.reset_index(drop=True)
+    table[INDEX_COLUMN] = range(len(table))
+    for col in slug_df.columns:
+        table[SLUG_PREFIX + col] = slug_df[col].astype(str).values
+    slug_cols = [SLUG_PREFIX + col for col in slug_df.columns]
+    if slug_cols:
+        table = table.sort_values(slug_cols + [INDEX_COLUMN], kind="stable")
+
+    buffer = io.BytesIO()
+    table.to_parquet(buffer, index=False, row_group_size=ROW_GROUP_SIZE)
+    return buffer.getvalue()
+
+
+def save_catalogue_parquet(catalogue_meta, df: pd.DataFrame, slug_df: pd.DataFrame):
+    DataCatalogueParquet.objects.update_or_create(
+        catalogue_meta=catalogue_meta, defaults={"data": to_parquet_blob(df, slug_df)}
+    )
+
+
+def read_catalogue_rows(catalogue_meta, filters: dict[str, str]) -> list[dict]:
+    """
+    Returns the catalogue rows (in their original order) whose slugs match `filters` ({column: slug}).
+    """
+    blob = (
+        DataCatalogueParquet.objects.filter(catalogue_meta=catalogue_meta)
+        .values_list("data", flat=True)
+        .first()
+    )
+    if blob is None:
+        return []
+    return read_blob_rows(bytes(blob), filters)
+
+
+def read_blob_rows(blob: bytes, filters: dict[str, str]) -> list[dict]:
+    table = pq.read_table(
+        pa.BufferReader(blob),
+        filters=[(SLUG_PREFIX + col, "==", slug) for col, slug in filters.items()]
+        or None,
+    )
+    table = table.sort_by(INDEX_COLUMN)
+    data_cols = [
+        col
+        for col in table.column_names
+        if col != INDEX_COLUMN and not col.startswith(SLUG_PREFIX)
+    ]
+    return table.select(data_cols).to_pylist()
@@ -9,6 +9,10 @@ from rest_framework.views import APIView
 
 from data_catalogue.models import DataCatalogueMeta, Dataviz, SiteCategory
 from data_catalogue.serializers import DataCatalogueMetaSerializer
+from data_catalogue.utils.slices import get_catalogue_slice
+from data_catalogue.utils.storage import read_catalogue_rows
+from data_gov_my.utils.chart_payloads import json_payload_response, render_json
+from data_gov_my.utils.etags import conditional_get
 
 
 # Create your views here.
@@ -121,6 +125,9 @@ class DataCatalogueListAPIView(APIView):
 
 
 class DataCatalogueRetrieveAPIView(APIView):
+    @conditional_get(
+        lambda request, *args, **kwargs: f"CATALOGUE_{kwargs.get('catalogue_id')}"
+    )
     def get(self, request, *args, **kwargs):
         # get language
         language = request.query_params.get("language", "en")
@@ -173,9 +180,19 @@ class DataCatalogueRetrieveAPIView(APIView):
             )
 
         instance = get_object_or_404(DataCatalogueMeta, id=kwargs.get("catalogue_id"))
-        data = instance.datacatalogue_set.filter(
-            **selected_or_default_filter_map
-        ).values_list("data", flat=True)
+        filters = {
+            col.removeprefix("slug__"): slug
+            for col, slug in selected_or_default_filter_map.items()
+        }
+        # pre-serialized slice if stored, else read from the catalogue's storage engine
+        data = get_catalogue_slice(instance, filters)
+        if data is None and instance.storage == "parquet":
+            data = read_catalogue_rows(instance, filters)
+        elif data is None:
+            # containment uses the (catalogue_meta, slug) GIN index
+            data = instance.datacatalogue_set.filter(slug__contains=filters).values_list(
+                "data", flat=True
+            )
         serializer = DataCatalogueMetaSerializer(instance)
         res = serializer.data
         res["dropdown"] = dropdown
@@ -185,4 +202,6 @@ class DataCatalogueRetrieveAPIView(APIView):
         if instance.link_editions:
             res["link_editions"] = instance.link_editions
 
+        if isinstance(data, bytes):
+            return json_payload_response(render_json(res))
         return Response(res)
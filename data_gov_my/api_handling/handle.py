@@ -20,8 +20,10 @@ def dashboard_additional_handling(params: QueryDict, res: dict):
                 .first()
             )
             temp = jitter_data["chart_data"]["data"]["state"]
-            res.setdefault("jitter_chart", {"data": None})
-            res["jitter_chart"]["data"] = temp
-            res["jitter_chart"]["data_as_of"] = jitter_data["chart_data"]["data_as_of"]
+            # the chart may already be a pre-serialized payload, so it is replaced as a whole
+            res["jitter_chart"] = {
+                "data": temp,
+                "data_as_of": jitter_data["chart_data"]["data_as_of"],
+            }
             return res
     return res
@@ -1,11 +1,134 @@
 import calendar
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List
+
+import numpy as np
 from data_gov_my.explorers.General import General_Explorer
 from rest_framework import exceptions
 from django.http import JsonResponse
 from django.apps import apps
 from data_gov_my.models import DashboardJson, MetaJson
+from data_gov_my.utils.index_registry import index_registry
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+def epoch_ms(date: datetime) -> int:
+    return calendar.timegm(date.timetuple()) * 1000
+
+
+def first_of(values: np.ndarray, i: int):
+    """
+    Returns `values[i]` as a python (JSON serializable) value.
+    """
+    return values[i : i + 1].tolist()[0]
+
+
+def as_counts(values: list) -> np.ndarray:
+    """
+    Returns `values` as a numeric array with nulls as 0, of integers unless any value is fractional.
+    """
+    counts = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+    if np.array_equal(counts, np.trunc(counts)):
+        return counts.astype(np.int64)
+    return counts
+
+
+class BirthdayIndex:
+    """
+    The birthday popularity charts, with the timeseries of each state as arrays of births, ranks,
+    and the calendar fields of their dates (year, month, day of year), so that any date range is aggregated with `np.bincount()`.
+    """
+
+    def __init__(self, timeseries: dict, rank_table: dict, dashboard_meta: dict):
+        self.timeseries_as_of = timeseries.get("data_as_of", None)
+        self.rank_table = rank_table
+        self.data_last_updated = dashboard_meta.get("data_last_updated", None)
+        self.data_next_update = dashboard_meta.get("data_next_update", None)
+        # served as is (nulls included) in the rank table
+        self.nationwide_births = timeseries["data"]["mys"]["births"]
+
+        self.states = {}
+        for state, data in timeseries["data"].items():
+            epochs = np.asarray(data["x"], dtype=np.int64)
+            dates = epochs.astype("datetime64[ms]")
+            years = dates.astype("datetime64[Y]")
+            self.states[state] = dict(
+                epochs=epochs,
+                births=as_counts(data["births"]),
+                totals=data["births"],
+                ranks=np.asarray(data["rank"]),
+                year=years.astype(np.int64) + 1970,
+                month=dates.astype("datetime64[M]").astype(np.int64) % 12 + 1,
+                yday=(dates.astype("datetime64[D]") - years).astype(np.int64) + 1,
+            )
+            year = self.states[state]["year"]
+            self.states[state]["leap"] = (year % 4 == 0) & (
+                (year % 100 != 0) | (year % 400 == 0)
+            )
+
+        # valid dates of the x-axis
+        self.days = self.dates_in_year(1970)
+        self.leap_days = self.dates_in_year(1972)
+        self.months = self.dates_in_month()
+
+    @staticmethod
+    def dates_in_year(year: int) -> list:
+        """
+        Given a year, return a list of dates (epoch milliseconds) within that year.
+        A non-leap year returns 365 dates; leap year returns 366 dates in a single list.
+        """
+        start = epoch_ms(datetime(year, 1, 1))
+        days = 366 if calendar.isleap(year) else 365
+        return (start + DAY_MS * np.arange(days, dtype=np.int64)).tolist()
+
+    @staticmethod
+    def dates_in_month() -> list:
+        """
+        Return a list of dates (epoch milliseconds) for every
+        first day of every month within a year starting from epoch millisecond 0.
+        """
+        start = epoch_ms(datetime(1971, 1, 1))  # 1971 is an arbitrary year
+        return [epoch_ms(datetime(1971, month, 1)) - start for month in range(1, 13)]
+
+    @classmethod
+    def from_db(cls) -> "BirthdayIndex":
+        return cls(
+            timeseries=DashboardJson.objects.get(
+                dashboard_name="birthday_popularity", chart_name="timeseries"
+            ).chart_data,
+            rank_table=DashboardJson.objects.get(
+                dashboard_name="birthday_popularity", chart_name="rank_table"
+            ).chart_data,
+            dashboard_meta=MetaJson.objects.get(
+                dashboard_name="birthday_popularity"
+            ).dashboard_meta,
+        )
+
+    def aggregate(self, state: str, start: int, end: int, groupByDay: bool) -> tuple:
+        """
+        Returns the x-axis and the births of `state` summed by day of year (or month) across the years from `start` to `end`.
+        With any leap year in the range, days of non-leap years from 1 March onwards are shifted to the leap year calendar.
+        """
+        arrays = self.states[state]
+        hasLeap = calendar.leapdays(start, end + 1) > 0
+        epochs = arrays["epochs"]
+        in_range = (epochs >= epoch_ms(datetime(start, 1, 1))) & (
+            epochs <= epoch_ms(datetime(end, 12, 31))
+        )
+
+        if groupByDay:
+            yday = arrays["yday"]
+            pos = yday + (hasLeap & ~arrays["leap"] & (yday > 59))  # 59 = 1 March
+            x, size = (self.leap_days if hasLeap else self.days), 365 + hasLeap
+        else:
+            pos, x, size = arrays["month"], self.months, 12
+
+        births = arrays["births"]
+        count = np.bincount(
+            pos[in_range] - 1, weights=births[in_range], minlength=size
+        )
+        return x, count.astype(births.dtype).tolist()
 
 
 class BIRTHDAY_POPULARITY(General_Explorer):
@@ -18,33 +141,16 @@ class BIRTHDAY_POPULARITY(General_Explorer):
     def __init__(self):
         General_Explorer.__init__(self)
 
+    @classmethod
+    def build_scope(cls) -> str:
+        # served from the birthday_popularity dashboard
+        return "DASHBOARD_birthday_popularity"
+
     def dates_in_year(self, year: int):
-        """
-        Given a year, return a list of dates (epoch milliseconds) within that year.
-        A non-leap year returns 365 dates; leap year returns 366 dates in a single list.
-        """
-        start = datetime(year, 1, 1)
-        end = datetime(year, 12, 31)
-        epoch = datetime.utcfromtimestamp(0)
-        dates = []
-        while start <= end:
-            epoch_ms = int((start - epoch).total_seconds() * 1000)
-            dates.append(epoch_ms)
-            start += timedelta(days=1)
-        return dates
+        return BirthdayIndex.dates_in_year(year)
 
     def dates_in_month(self):
-        """
-        Return a list of dates (epoch milliseconds) for every
-        first day of every month within a year starting from epoch millisecond 0.
-        """
-        start = datetime(1971, 1, 1)  # 1971 is an arbitrary year
-        dates = []
-        for month in range(1, 13):
-            first_day_in_month = datetime(1971, month, 1)
-            epoch_ms = int((first_day_in_month - start).total_seconds() * 1000)
-            dates.append(epoch_ms)
-        return dates
+        return BirthdayIndex.dates_in_month()
 
     def handle_api(self, request_params):
         """
@@ -55,31 +161,24 @@ class BIRTHDAY_POPULARITY(General_Explorer):
 
         state = request_params["state"][0]
 
-        # handle the data
-        timeseries = DashboardJson.objects.get(
-            dashboard_name="birthday_popularity", chart_name="timeseries"
-        ).chart_data
-        rank_table = DashboardJson.objects.get(
-            dashboard_name="birthday_popularity", chart_name="rank_table"
-        ).chart_data
-
-        epochs = timeseries["data"][state]["x"]
-        nationwide_births = timeseries["data"]["mys"]["births"]
-        births = timeseries["data"][state]["births"]
-        ranks = timeseries["data"][state]["rank"]
+        # handle the data, rebuilt once the dashboard is rebuilt
+        index: BirthdayIndex = index_registry.get(
+            "BIRTHDAY_POPULARITY",
+            self.build_scope(),
+            BirthdayIndex.from_db,
+        )
+        arrays = index.states[state]
 
         # handle the query parameters (provide default if not given)
         start = (
             int(request_params["start"][0])
             if "start" in request_params
-            else (datetime.utcfromtimestamp(0) + timedelta(milliseconds=epochs[0])).year
+            else int(arrays["year"][0])
         )
         end = (
             int(request_params["end"][0])
             if "end" in request_params
-            else (
-                datetime.utcfromtimestamp(0) + timedelta(milliseconds=epochs[-1])
-            ).year
+            else int(arrays["year"][-1])
         )
         groupByDay = (
             self.str2bool(request_params["groupByDay"][0])
@@ -92,56 +191,29 @@ class BIRTHDAY_POPULARITY(General_Explorer):
             else None
         )
 
-        hasLeap = any(calendar.isleap(y) for y in range(start, end + 1))
-        start, end = datetime(year=start, month=1, day=1), datetime(
-            year=end, month=12, day=31
-        )
-        count = [0] * (365 + hasLeap) if groupByDay else [0] * 12
-
         # aggregate births by day or month across years within start and end date range
+        valid_dates, count = index.aggregate(state, start, end, groupByDay)
+
         res = {}
         rank_table_res = {}
-        for i, e in enumerate(epochs):
-            date = datetime.utcfromtimestamp(0) + timedelta(milliseconds=e)
-            if date == birthday:
-                rank_table_res["rank"] = ranks[i]
-                rank_table_res["state_total"] = births[i]
-                rank_table_res["nationwide_total"] = nationwide_births[i]
-            if start <= date <= end:
-                pos = (
-                    date.timetuple().tm_yday
-                    + (
-                        hasLeap
-                        and not calendar.isleap(date.year)
-                        and date.timetuple().tm_yday > 59
-                    )
-                    if groupByDay
-                    else date.month
-                )  # 59 = 1 March
-                count[pos - 1] += births[i]
-
-        if groupByDay:
-            valid_dates = (
-                self.dates_in_year(1972) if hasLeap else self.dates_in_year(1970)
-            )
-        else:
-            valid_dates = self.dates_in_month()
-
-        dashboard_meta = MetaJson.objects.get(
-            dashboard_name="birthday_popularity"
-        ).dashboard_meta
-        data_last_updated = dashboard_meta.get("data_last_updated", None)
-        data_next_update = dashboard_meta.get("data_next_update", None)
+        if birthday is not None:
+            matches = np.flatnonzero(arrays["epochs"] == epoch_ms(birthday))
+            if len(matches):
+                i = matches[-1]
+                rank_table_res["rank"] = first_of(arrays["ranks"], i)
+                rank_table_res["state_total"] = arrays["totals"][i]
+                rank_table_res["nationwide_total"] = index.nationwide_births[i]
 
         timeseries = {
-            "data_as_of": timeseries.get("data_as_of", None),
+            "data_as_of": index.timeseries_as_of,
             "x": valid_dates,
             "y": count,
         }
-        res["data_last_updated"] = data_last_updated
-        res["data_next_update"] = data_next_update
+        res["data_last_updated"] = index.data_last_updated
+        res["data_next_update"] = index.data_next_update
         res["timeseries"] = timeseries
         if birthday is not None:
+            rank_table = index.rank_table
             rank_table_res["data_as_of"] = rank_table.get("data_as_of", None)
             rank_table_res["popularity"] = rank_table["data"][state][str(birthday.year)]
             res["rank_table"] = rank_table_res
@@ -1,9 +1,12 @@
+import hashlib
+import json
 from datetime import date, datetime
-from itertools import groupby
 
-import pandas as pd
+import numpy as np
 from django.apps import apps
+from django.contrib.postgres.aggregates import ArrayAgg
 from django.contrib.postgres.search import TrigramSimilarity
+from django.db import transaction
 from django.db.models import CharField, Q, Value
 from django.db.models.functions import Concat
 from django.http import JsonResponse
@@ -15,6 +18,42 @@ from data_gov_my.models import (
     CarPopularityTimeseriesMaker,
     CarPopularityTimeseriesModel,
 )
+from data_gov_my.utils.copy_loader import copy_parquet
+from data_gov_my.utils.etags import build_version
+from data_gov_my.utils.index_registry import index_registry
+from data_gov_my.utils.local_cache import local_cache
+from data_gov_my.utils.trigram_index import TrigramIndex
+
+
+class CarVocabulary:
+    """
+    The distinct makers and models of the `Car` table, with a trigram index of the makers and of the "maker model" names.
+    """
+
+    def __init__(self, cars: list[tuple[str, str]]):
+        self.makers = sorted({maker for maker, _ in cars})
+        self.cars = cars
+        self.maker_index = TrigramIndex(self.makers)
+        self.model_index = TrigramIndex([f"{maker} {model}" for maker, model in cars])
+
+    @classmethod
+    def from_db(cls) -> "CarVocabulary":
+        cars = Car.objects.values_list("maker", "model").distinct()
+        return cls(list(cars.order_by("maker", "model")))
+
+    def search_makers(self, query: str, limit: int) -> list[dict]:
+        rows, similarity = self.maker_index.search(query, limit)
+        return [
+            dict(maker=self.makers[row], similarity=s)
+            for row, s in zip(rows.tolist(), similarity.tolist())
+        ]
+
+    def search_models(self, query: str, limit: int) -> list[dict]:
+        rows, similarity = self.model_index.search(query, limit)
+        return [
+            dict(maker=self.cars[row][0], model=self.cars[row][1], similarity=s)
+            for row, s in zip(rows.tolist(), similarity.tolist())
+        ]
 
 
 class CarPopularityExplorer(General_Explorer):
@@ -31,34 +70,27 @@ class CarPopularityExplorer(General_Explorer):
         """
         Populate CarPopularityTimeseriesMaker and CarPopularityTimeseriesModel tables
         """
-        # Read parquet file
-        df = pd.read_parquet(source)
         model = apps.get_model("data_gov_my", table)
 
-        # Bulk insert into the table
-        if rebuild:
-            model.objects.all().delete()
-
-        res = model.objects.bulk_create(
-            [model(**row) for row in df.to_dict(orient="records")],
-            batch_size=self.batch_size,
-        )
-
-        # Update car table for fuzzy search
-        if table == "CarPopularityTimeseriesModel":
-            Car.objects.all().delete()
-            df = df[["maker", "model"]].drop_duplicates()
-            Car.objects.bulk_create(
-                [
-                    Car(
-                        maker=row["maker"],
-                        model=row["model"],
-                        maker_model=f"{row['maker']} {row['model']}",
-                    )
-                    for _, row in df.iterrows()
-                ],
-                batch_size=self.batch_size,
-            )
+        with transaction.atomic():
+            # Stream the parquet file into the table
+            copy_parquet(model, source, replace=rebuild, batch_size=self.batch_size)
+
+            # Update car table for fuzzy search
+            if table == "CarPopularityTimeseriesModel":
+                Car.objects.all().delete()
+                cars = model.objects.values_list("maker", "model").distinct()
+                Car.objects.bulk_create(
+                    [
+                        Car(
+                            maker=maker,
+                            model=car_model,
+                            maker_model=f"{maker} {car_model}",
+                        )
+                        for maker, car_model in cars.order_by("maker", "model")
+                    ],
+                    batch_size=self.batch_size,
+                )
 
     def handle_api(self, request_params: dict):
         """
@@ -117,19 +149,40 @@ class CarPopularityExplorer(General_Explorer):
 
         return response.Response(res)
 
+    def get_vocabulary(self) -> CarVocabulary:
+        """
+        Returns the car vocabulary of this worker, rebuilt once the explorer is rebuilt.
+        """
+        return index_registry.get(
+            "CAR_POPULARITY_VOCABULARY",
+            f"EXPLORER_{self.explorer_name}",
+            CarVocabulary.from_db,
+        )
+
     # 1527, 1555, 1551
     def get_cars_by_fuzzy_search(
         self, query: str = None, isMaker=True, limit: int = 10
     ):
-        search_type = "maker" if isMaker else "model"
+        vocabulary = self.get_vocabulary()
+        if not vocabulary.cars:
+            return response.Response(self.query_fuzzy_search(query, isMaker, limit))
+
         if isMaker:
+            results = vocabulary.search_makers(query, limit)
+        else:
+            results = vocabulary.search_models(query, limit)
+        return response.Response(results)
 
+    def query_fuzzy_search(self, query: str, isMaker=True, limit: int = 10):
+        """
+        Fuzzy search in Postgres, only used while the `Car` table is empty (e.g. the model timeseries is not loaded yet).
+        """
+        if isMaker:
             queryset = (
-                CarPopularityTimeseriesMaker.objects.all()
-                .annotate(similarity=TrigramSimilarity(search_type, query))
+                CarPopularityTimeseriesMaker.objects.values("maker")
                 .distinct()
-                .order_by("-similarity")[:limit]
-                .values("maker", "similarity")
+                .annotate(similarity=TrigramSimilarity("maker", query))
+                .order_by("-similarity", "maker")[:limit]
             )
         else:
             queryset = (
@@ -137,59 +190,65 @@ class CarPopularityExplorer(General_Explorer):
                 .order_by("-similarity")[:limit]
                 .values("maker", "model", "similarity")
             )
-
-        return response.Response(queryset)
+        return list(queryset)
 
     def get_timeseries(self, maker_ids: list[str], model_ids: list[str] = None):
+        """
+        Returns the timeseries of the queried cars, cached per explorer build and set of cars.
+        """
+        if maker_ids and model_ids:
+            cars = sorted(set(zip(maker_ids, model_ids)))
+        else:
+            cars = sorted(set(maker_ids))
+        digest = hashlib.sha1(json.dumps(cars).encode()).hexdigest()
+        version = build_version(f"EXPLORER_{self.explorer_name}")
+        cache_key = f"CAR_POPULARITY_TIMESERIES_{version}_{digest}"
+
+        timeseries = local_cache.get(cache_key)
+        if timeseries is None:
+            timeseries = self.query_timeseries(maker_ids, model_ids)
+            local_cache.set(cache_key, timeseries)
+        return timeseries
 
-        timeseries = dict(
-            x=[],
+    def query_timeseries(self, maker_ids: list[str], model_ids: list[str] = None):
+        """
+        Pivots the timeseries of each car into date-ordered arrays in SQL, with one row per car.
+        """
+        columns = dict(
+            dates=ArrayAgg("date", ordering="date"),
+            cars=ArrayAgg("cars", ordering="date"),
+            cars_cumul=ArrayAgg("cars_cumul", ordering="date"),
         )
         if maker_ids and model_ids:
-            queryset = CarPopularityTimeseriesModel.objects.all()
             filter = Q()
             for maker_id, model_id in zip(maker_ids, model_ids):
                 filter |= Q(maker=maker_id, model=model_id)
-            queryset = queryset.filter(filter)
-            x_completed = False
-            for car, group in groupby(queryset, lambda x: (x.maker, x.model)):
-                maker, model = car
-                # assure ordering (else returned not ordered)
-                objects = sorted(list(group), key=lambda x: x.date)
-
-                # we only want to populate x array once taking from the first car (rest are same)
-                if not x_completed:
-                    for object in objects:
-                        timeseries["x"].append(self.unix_time_millis(object.date))
-
-                # compile queried car timeseries data
-                timeseries[f"{maker} {model}"] = dict(
-                    maker=maker, model=model, cars=[], cars_cumul=[]
-                )
-                for object in objects:
-                    timeseries[f"{maker} {model}"]["cars"].append(object.cars)
-                    timeseries[f"{maker} {model}"]["cars_cumul"].append(
-                        object.cars_cumul
-                    )
-
-                x_completed = True
+            rows = (
+                CarPopularityTimeseriesModel.objects.filter(filter)
+                .values("maker", "model")
+                .annotate(**columns)
+                .order_by("maker", "model")
+            )
         else:  # only makers
-            queryset = CarPopularityTimeseriesMaker.objects.filter(maker__in=maker_ids)
-            x_completed = False
-            for car, group in groupby(queryset, lambda x: (x.maker)):
-                # assure ordering (else returned not ordered)
-                objects = sorted(list(group), key=lambda x: x.date)
-
-                # we only want to populate x array once taking from the first car (rest are same)
-                if not x_completed:
-                    for object in objects:
-                        timeseries["x"].append(self.unix_time_millis(object.date))
-
-                # compile queried car timeseries data
-                timeseries[car] = dict(maker=car, cars=[], cars_cumul=[])
-                for object in objects:
-                    timeseries[object.maker]["cars"].append(object.cars)
-                    timeseries[object.maker]["cars_cumul"].append(object.cars_cumul)
-
-                x_completed = True
+            rows = (
+                CarPopularityTimeseriesMaker.objects.filter(maker__in=maker_ids)
+                .values("maker")
+                .annotate(**columns)
+                .order_by("maker")
+            )
+
+        timeseries = dict(
+            x=[],
+        )
+        for row in rows:
+            # we only want to populate x array once taking from the first car (rest are same)
+            if not timeseries["x"]:
+                dates = np.array(row.pop("dates"), dtype="datetime64[ms]")
+                timeseries["x"] = dates.astype(np.int64).tolist()
+            else:
+                row.pop("dates")
+
+            # compile queried car timeseries data
+            name = f"{row['maker']} {row['model']}" if "model" in row else row["maker"]
+            timeseries[name] = row
         return timeseries
@@ -1,15 +1,15 @@
 from datetime import date, datetime
 from itertools import groupby
-from django.shortcuts import get_object_or_404
 
 import numpy as np
-import pandas as pd
 from django.apps import apps
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from rest_framework import response
 
 from data_gov_my.models import ExplorersMetaJson, ExplorersUpdate, MetaJson
+from data_gov_my.utils.copy_loader import copy_parquet
 from data_gov_my.utils.general_chart_helpers import STATE_ABBR
+from data_gov_my.utils.index_registry import index_registry
 
 
 class General_Explorer:
@@ -32,6 +32,15 @@ class General_Explorer:
     def __init__(self):
         pass
 
+    """
+    Returns the build version scope of the explorer's responses (see `conditional_get`),
+    bumped whenever the data it serves is rebuilt.
+    """
+
+    @classmethod
+    def build_scope(cls) -> str:
+        return f"EXPLORER_{cls.explorer_name}"
+
     """
     Handles the API requests,
     and returns the data accordingly.
@@ -56,29 +65,34 @@ class General_Explorer:
                 model_choice.objects.all().delete()
 
     """
-    Performs an update to the database.
+    Applies the explorer's column handling
+    to a batch of rows read from a parquet.
     """
 
-    def update(self, table_name="", unique_keys=[]):
-        df = pd.read_parquet(self.data_populate[table_name])
-        df = df.replace({np.nan: None})
-        df = df.drop(columns=self.columns_exclude)
+    def prepare_frame(self, df, rename_columns={}, exclude=[]):
+        df = df.drop(columns=exclude)
 
         if "state" in df.columns:
-            df["state"].replace(STATE_ABBR, inplace=True)
+            df["state"] = df["state"].replace(STATE_ABBR)
+
+        if rename_columns:
+            df = df.rename(columns=rename_columns)
+        return df
 
-        if self.columns_rename:
-            df.rename(columns=self.columns_rename, inplace=True)
+    """
+    Performs an update to the database,
+    upserting rows on the unique keys.
+    """
 
+    def update(self, table_name="", unique_keys=[]):
         model_choice = apps.get_model("data_gov_my", table_name)
-        update_fields = list(set(df.columns.to_list()) - set(unique_keys))
-        queryset = [model_choice(**x) for x in df.to_dict("records")]
-
-        model_choice.objects.bulk_create(
-            queryset,
-            update_conflicts=True,
-            unique_fields=unique_keys,
-            update_fields=update_fields,
+        copy_parquet(
+            model_choice,
+            self.data_populate[table_name],
+            transform=lambda df: self.prepare_frame(
+                df, self.columns_rename, self.columns_exclude
+            ),
+            unique_keys=unique_keys,
         )
 
     """
@@ -110,8 +124,8 @@ class General_Explorer:
 
     """
     Allows bulk insert into models,
-    for large datasets. Inserts by
-    batches.
+    for large datasets. Streams the
+    file into the table with COPY.
     """
 
     def bulk_insert(
@@ -123,26 +137,14 @@ class General_Explorer:
         rename_columns={},
         exclude=[],
     ):
-        df = pd.read_parquet(file)
-        df = df.replace({np.nan: None})
-        df = df.drop(columns=exclude)
-
-        if "state" in df.columns:
-            df["state"].replace(STATE_ABBR, inplace=True)
-
-        if rename_columns:
-            df.rename(columns=rename_columns, inplace=True)
-
-        groups = df.groupby(np.arange(len(df)) // batch_size)
-
         model_choice = apps.get_model("data_gov_my", model_name)
-
-        if rebuild:
-            model_choice.objects.all().delete()
-
-        for k, v in groups:
-            model_rows = [model_choice(**i) for i in v.to_dict("records")]
-            model_choice.objects.bulk_create(model_rows)
+        copy_parquet(
+            model_choice,
+            file,
+            transform=lambda df: self.prepare_frame(df, rename_columns, exclude),
+            replace=rebuild,
+            batch_size=batch_size,
+        )
 
     def get_last_update_and_next_update(self, model_name=""):
         obj = ExplorersMetaJson.objects.get(dashboard_name=self.explorer_name)
@@ -218,6 +220,14 @@ class GeneralTransportExplorer(General_Explorer):
         return response.Response(res)
 
     def get_dropdown(self):
+        # cached until the explorer is rebuilt
+        return index_registry.get(
+            f"{self.explorer_name}_DROPDOWN",
+            f"EXPLORER_{self.explorer_name}",
+            self.build_dropdown,
+        )
+
+    def build_dropdown(self):
         queryset = (
             self.TIMESERIES_CALLOUT_MODEL.objects.order_by("service", "origin")
             .values("service", "origin", "destination")
@@ -230,29 +240,43 @@ class GeneralTransportExplorer(General_Explorer):
                 d[service][origin] = [data["destination"] for data in inner_group]
         return d
 
+    def get_data_as_of(self, model):
+        """
+        Returns the `last_update` of the model's table, from a map of the explorer's tables cached until it is rebuilt.
+        """
+        data_as_of = index_registry.get(
+            f"{self.explorer_name}_DATA_AS_OF",
+            f"EXPLORER_{self.explorer_name}",
+            lambda: dict(
+                ExplorersUpdate.objects.filter(
+                    explorer=self.explorer_name
+                ).values_list("file_name", "last_update")
+            ),
+        )
+        if model.__name__ not in data_as_of:
+            raise Http404(f"No data for {model.__name__}")
+        return data_as_of[model.__name__]
+
     def get_timeseries(self, service, origin, destination):
+        # one column array per field, ordered by the (route, frequency, date) index
+        rows = (
+            self.TIMESERIES_MODEL.objects.filter(
+                service=service, origin=origin, destination=destination
+            )
+            .order_by("frequency", "date")
+            .values_list("frequency", "date", "passengers")
+        )
+
         timeseries = {}
-        queryset = self.TIMESERIES_MODEL.objects.filter(
-            service=service, origin=origin, destination=destination
-        ).order_by("frequency")
-
-        for frequency, group in groupby(queryset, lambda x: x.frequency):
-            timeseries[frequency] = dict()
-            objects = sorted(
-                list(group), key=lambda x: x.date
-            )  # assure ordering (else returned not ordered)
-            timeseries[frequency]["x"] = []
-            timeseries[frequency]["passengers"] = []
-            for object in objects:
-                timeseries[frequency]["x"].append(self.unix_time_millis(object.date))
-                timeseries[frequency]["passengers"].append(object.passengers)
+        for frequency, group in groupby(rows, lambda row: row[0]):
+            _, dates, passengers = zip(*group)
+            timeseries[frequency] = dict(
+                x=np.array(dates, dtype="datetime64[ms]").astype(np.int64).tolist(),
+                passengers=list(passengers),
+            )
 
         res = dict(
-            data_as_of=get_object_or_404(
-                ExplorersUpdate,
-                explorer=self.explorer_name,
-                file_name=self.TIMESERIES_MODEL.__name__,
-            ).last_update,
+            data_as_of=self.get_data_as_of(self.TIMESERIES_MODEL),
             data=timeseries,
         )
         return res
@@ -262,18 +286,12 @@ class GeneralTransportExplorer(General_Explorer):
             self.TIMESERIES_CALLOUT_MODEL.objects.filter(
                 service=service, origin=origin, destination=destination
             )
-            .values("frequency", "passengers")
+            .values_list("frequency", "passengers")
             .order_by("frequency")
         )
-        callout_data = {}
-        for object in callout.iterator():
-            callout_data[object.get("frequency")] = object.get("passengers")
+        callout_data = dict(callout)
 
         return dict(
-            data_as_of=get_object_or_404(
-                ExplorersUpdate,
-                explorer=self.explorer_name,
-                file_name=self.TIMESERIES_CALLOUT_MODEL.__name__,
-            ).last_update,
+            data_as_of=self.get_data_as_of(self.TIMESERIES_CALLOUT_MODEL),
             data=callout_data,
         )
@@ -1,11 +1,131 @@
 import os
+from bisect import bisect_left
+from itertools import groupby
 
+import numpy as np
 import pandas as pd
 from django.apps import apps
-from django.core.cache import cache
 from django.http import JsonResponse
 
 from data_gov_my.explorers.General import General_Explorer
+from data_gov_my.utils.index_registry import index_registry
+from data_gov_my.utils.local_cache import local_cache
+
+
+def load_forbidden_search() -> frozenset:
+    forbidden = local_cache.get("NAME_POPULARITY_FORBIDDEN_SEARCH")
+    if not forbidden:
+        df = pd.read_parquet(os.getenv("FORBIDDEN_SEARCH_PARQUET_URL"))
+        forbidden = df.iloc[:, 0].tolist()
+        local_cache.set("NAME_POPULARITY_FORBIDDEN_SEARCH", forbidden)
+    return frozenset(forbidden)
+
+
+class NameIndex:
+    """
+    In-memory index of a name popularity table: the counts per decade as a matrix, the totals, and the row of each name.
+    Null totals are zeroed for ranking, and `has_total` marks the names whose total is set.
+
+    Names which are neither private nor `hidden` are also kept sorted, for prefix suggestions.
+    The most common names of every prefix of up to `SHORT_PREFIX` characters are precomputed.
+    """
+
+    SHORT_PREFIX = 3
+    MAX_SUGGESTIONS = 20
+
+    def __init__(
+        self,
+        names: list,
+        counts: np.ndarray,
+        totals: np.ndarray,
+        decades: list,
+        hidden: frozenset = frozenset(),
+        has_total: np.ndarray | None = None,
+    ):
+        self.names = names
+        self.rows = {name: i for i, name in enumerate(names)}
+        self.counts = counts  # (names, decades)
+        self.totals = totals
+        self.has_total = (
+            np.ones(len(names), dtype=bool) if has_total is None else has_total
+        )
+        self.decades = decades  # e.g. ["1920", ..., "2010"]
+
+        private = ((counts > 0).sum(axis=1) <= 1) | (counts.sum(axis=1) < 10)
+        order = sorted(
+            (i for i, n in enumerate(names) if not private[i] and n not in hidden),
+            key=names.__getitem__,
+        )
+        self.prefix_names = [names[i] for i in order]
+        self.prefix_rows = np.array(order, dtype=np.int64)
+        self.top = {}  # {short prefix: rows of its most common names}
+        for length in range(1, self.SHORT_PREFIX + 1):
+            start = 0
+            for prefix, group in groupby(self.prefix_names, key=lambda n: n[:length]):
+                end = start + sum(1 for _ in group)
+                if len(prefix) == length:  # not a shorter name
+                    self.top[prefix] = self.top_rows(start, end, self.MAX_SUGGESTIONS)
+                start = end
+
+    @classmethod
+    def from_model(cls, model, hidden: frozenset = frozenset()) -> "NameIndex":
+        fields = [
+            f.name for f in model._meta.concrete_fields if f.name.startswith("d_")
+        ]
+        rows = list(model.objects.values_list("name", "total", *fields))
+        # null counts are read as nan, then zeroed
+        counts = np.array([row[2:] for row in rows], dtype=float)
+        counts = counts.reshape(len(rows), len(fields))
+        return cls(
+            names=[row[0] for row in rows],
+            counts=np.nan_to_num(counts).astype(np.int64),
+            totals=np.array([row[1] or 0 for row in rows], dtype=np.int64),
+            decades=[f.removeprefix("d_") for f in fields],
+            hidden=hidden,
+            has_total=np.array([row[1] is not None for row in rows], dtype=bool),
+        )
+
+    def top_rows(self, start: int, end: int, n: int) -> list[int]:
+        """
+        Returns the rows of the `n` most common names between two positions of the sorted names.
+        """
+        rows = self.prefix_rows[start:end]
+        if len(rows) > n:
+            rows = rows[np.argpartition(-self.totals[rows], n - 1)[:n]]
+        return sorted(rows.tolist(), key=lambda r: (-self.totals[r], self.names[r]))
+
+    def suggest(self, prefix: str, n: int) -> list[int]:
+        """
+        Returns the rows of the (at most `MAX_SUGGESTIONS`) most common names starting with `prefix`.
+        """
+        n = min(n, self.MAX_SUGGESTIONS)
+        if len(prefix) <= self.SHORT_PREFIX:
+            return self.top.get(prefix, [])[:n]
+        start = bisect_left(self.prefix_names, prefix)
+        end = bisect_left(self.prefix_names, prefix + "\U0010ffff", lo=start)
+        return self.top_rows(start, end, n)
+
+    def total(self, row: int) -> int | None:
+        """
+        Returns the total of the name as stored, i.e. None if null.
+        """
+        return int(self.totals[row]) if self.has_total[row] else None
+
+    def is_private(self, row: int) -> bool:
+        """
+        Names found in a single decade, or less than 10 times, are not shown.
+        """
+        counts = self.counts[row]
+        return (counts > 0).sum() <= 1 or counts.sum() < 10
+
+    def peak_decade(self, row: int) -> str | None:
+        """
+        Returns the (latest) decade with the most occurrences of the name, unless private.
+        """
+        if self.is_private(row):
+            return None
+        counts = self.counts[row]
+        return self.decades[len(counts) - 1 - int(np.argmax(counts[::-1]))]
 
 
 class NAME_POPULARITY(General_Explorer):
@@ -49,13 +169,26 @@ class NAME_POPULARITY(General_Explorer):
 
     def __init__(self):
         General_Explorer.__init__(self)
-        self.FORBIDDEN_SEARCH = cache.get("NAME_POPULARITY_FORBIDDEN_SEARCH")
-        url = os.getenv("FORBIDDEN_SEARCH_PARQUET_URL")
+        self.FORBIDDEN_SEARCH = index_registry.get(
+            "NAME_POPULARITY_FORBIDDEN_SEARCH",
+            f"EXPLORER_{self.explorer_name}",
+            load_forbidden_search,
+        )
 
-        if not self.FORBIDDEN_SEARCH:
-            df = pd.read_parquet(url)
-            self.FORBIDDEN_SEARCH = df.iloc[:, 0].tolist()
-            cache.set("NAME_POPULARITY_FORBIDDEN_SEARCH", self.FORBIDDEN_SEARCH)
+    """
+    Returns the in-memory index of the names
+    of the given type (first / last).
+    """
+
+    def name_index(self, type) -> NameIndex:
+        model_name = self.param_models[type]
+        return index_registry.get(
+            f"NAME_POPULARITY_{model_name}",
+            f"EXPLORER_{self.explorer_name}",
+            lambda: NameIndex.from_model(
+                apps.get_model("data_gov_my", model_name), hidden=self.FORBIDDEN_SEARCH
+            ),
+        )
 
     """
     Handles the API requests,
@@ -63,6 +196,9 @@ class NAME_POPULARITY(General_Explorer):
     """
 
     def handle_api(self, params):
+        if "prefix" in params:
+            return self.handle_prefix(params)
+
         # Validate Params Properly if exist
         if not self.is_params_exist(params):
             return JsonResponse({"status": 400, "message": "Bad Request"}, status=400)
@@ -75,13 +211,12 @@ class NAME_POPULARITY(General_Explorer):
             return JsonResponse({"status": 400, "message": "Bad Request"}, status=400)
 
         model_name = self.param_models[type]
-        model_choice = apps.get_model("data_gov_my", model_name)
 
         compare = "compare_name" in params and self.str2bool(params["compare_name"][0])
 
         s = list(set(s.split(","))) if compare else [s]
 
-        forbidden_searches = list(set(s) & set(self.FORBIDDEN_SEARCH))
+        forbidden_searches = [name for name in s if name in self.FORBIDDEN_SEARCH]
         for i, name in enumerate(forbidden_searches):
             # censor the last two characters when returning
             forbidden_searches[i] = (
@@ -98,56 +233,35 @@ class NAME_POPULARITY(General_Explorer):
                 status=400,
             )
 
-        cache_key_names = ",".join(sorted(s))
-        cache_key = f"NAME_POPULARITY_{cache_key_names}-{type}"
-
-        res = cache.get(cache_key)
-
-        if not res:
-            res = list(model_choice.objects.all().filter(name__in=s).values())
-            cache.set(cache_key, res, 60)  # Cache the names for a minute
-
-        fin = []  # Default is as a list
-
-        if len(res) > 0:
-            for i in res:
-                temp = {}
-                temp["name"] = i["name"]
-                temp["total"] = i["total"]
-                i.pop("name")
-                i.pop("total")
-                temp["count"] = list(i.values())
-
-                if compare:
-                    temp["max"] = [
-                        key.replace("d_", "")
-                        for m in [max(i.values())]
-                        for key, val in i.items()
-                        if val == m
-                    ][-1]
-
-                    if (sum(val > 0 for val in temp["count"]) <= 1) or sum(
-                        temp["count"]
-                    ) < 10:  # privacy handling
-                        temp["max"] = None
-
-                    del temp["count"]
-                    fin.append(temp)
-                    s.remove(temp["name"])
-                else:
-                    temp["decade"] = [d.replace("d_", "") for d in list(i.keys())]
-                    temp["total"] = sum(temp["count"])
-                    if (sum(val > 0 for val in temp["count"]) <= 1) or sum(
-                        temp["count"]
-                    ) < 10:  # privacy handling
-                        temp["count"] = None
-                        temp["decade"] = None
-                    fin = temp  # Convert back into Dictionary
-                    break
-
-        if len(s) > 0 and compare:
-            for name in s:
-                fin.append({"name": name, "total": 0, "max": None})
+        index = self.name_index(type)
+        rows = {name: index.rows[name] for name in s if name in index.rows}
+
+        if compare:
+            fin = [
+                {
+                    "name": name,
+                    "total": index.total(row),
+                    "max": index.peak_decade(row),
+                }
+                for name, row in rows.items()
+            ]
+            fin += [
+                {"name": name, "total": 0, "max": None}
+                for name in s
+                if name not in rows
+            ]
+        elif rows:
+            row = rows[s[0]]
+            counts = index.counts[row]
+            private = index.is_private(row)  # privacy handling
+            fin = {
+                "name": s[0],
+                "total": int(counts.sum()),
+                "count": None if private else counts.tolist(),
+                "decade": None if private else index.decades,
+            }
+        else:
+            fin = []  # Default is as a list
 
         last_update, next_update = self.get_last_update_and_next_update(
             model_name=model_name
@@ -160,3 +274,41 @@ class NAME_POPULARITY(General_Explorer):
         }
 
         return JsonResponse(res, safe=False, status=200)
+
+    """
+    Suggests the most common names starting with a prefix,
+    leaving out forbidden and private names.
+    """
+
+    def handle_prefix(self, params):
+        prefix = params["prefix"][0].lower()
+        type = params.get("type", [""])[0].lower()
+        dashboard = params.get("explorer", [""])[0]
+
+        if (
+            not prefix
+            or type not in self.param_models
+            or dashboard != self.explorer_name
+        ):
+            return JsonResponse({"status": 400, "message": "Bad Request"}, status=400)
+
+        size = params.get("size", [""])[0]
+        n = int(size) if size.isdigit() else 10
+
+        index = self.name_index(type)
+        fin = [
+            {"name": index.names[row], "total": int(index.totals[row])}
+            for row in index.suggest(prefix, n)
+        ]
+
+        last_update, next_update = self.get_last_update_and_next_update(
+            model_name=self.param_models[type]
+        )
+
+        res = {
+            "data_last_updated": last_update,
+            "data_next_update": next_update,
+            "data": fin,
+        }
+
+        return JsonResponse(res, safe=False, status=200)
@@ -0,0 +1,76 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from data_gov_my.explorers.CarPopularity import CarPopularityExplorer, CarVocabulary
+
+
+def percentiles(seconds: list) -> str:
+    p50, p99 = np.percentile(np.array(seconds) * 1000, [50, 99])
+    return f"p50 {p50:.2f}ms, p99 {p99:.2f}ms"
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the car maker/model fuzzy search under concurrent searches, in memory and in Postgres"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--searches", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--postgres",
+            action="store_true",
+            help="Also benchmark the Postgres fallback (one connection per thread)",
+        )
+
+    def handle(self, *args, **kwargs):
+        explorer = CarPopularityExplorer()
+        vocabulary = CarVocabulary.from_db()
+        if not vocabulary.cars:
+            self.stderr.write(
+                "The Car table is empty, populate the car popularity explorer first"
+            )
+            return
+
+        # keystrokes: every prefix of a sample of the "maker model" names
+        rng = np.random.default_rng(0)
+        names = vocabulary.model_index.terms
+        queries = []
+        while len(queries) < kwargs["searches"]:
+            name = names[rng.integers(len(names))]
+            queries.extend(name[:i] for i in range(1, len(name) + 1))
+        queries = [(q, bool(i % 2)) for i, q in enumerate(queries[: kwargs["searches"]])]
+
+        def in_memory(query):
+            query, isMaker = query
+            start = time.perf_counter()
+            if isMaker:
+                vocabulary.search_makers(query, 10)
+            else:
+                vocabulary.search_models(query, 10)
+            return time.perf_counter() - start
+
+        def postgres(query):
+            query, isMaker = query
+            start = time.perf_counter()
+            explorer.query_fuzzy_search(query, isMaker)
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        CarVocabulary.from_db()
+        self.stdout.write(
+            f"vocabulary of {len(vocabulary.makers)} makers and {len(vocabulary.cars)} models "
+            f"built in {time.perf_counter() - start:.2f}s"
+        )
+
+        paths = {"in memory": in_memory}
+        if kwargs["postgres"]:
+            paths["postgres"] = postgres
+        for path, search in paths.items():
+            with ThreadPoolExecutor(max_workers=kwargs["concurrency"]) as executor:
+                seconds = list(executor.map(search, queries))
+            self.stdout.write(
+                f"{path} ({len(queries)} searches, {kwargs['concurrency']} threads): "
+                f"{percentiles(seconds)}"
+            )
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from data_gov_my.utils.chart_builders import ChartBuilder, STATE_ABBR
+
+
+def build_chart_groupby(builder: ChartBuilder, file_name: str, variables: dict):
+    """
+    Reference implementation of `ChartBuilder.build_chart()`, nesting one `df.groupby()` sub-dataframe at a time.
+    """
+    variables = builder.VARIABLE_MODEL(**variables)
+    df = builder.pre_process(builder.read_source(file_name, variables), variables)
+    result = {}
+    for name, group in df.groupby(variables.keys):
+        name = [str(n) for n in name]
+        current_level = result
+        for n in name[:-1]:
+            current_level = current_level.setdefault(n, {})
+        current_level[name[-1]] = builder.group_to_data(variables, group)
+    return builder.additional_postprocessing(variables, df, result)
+
+
+class Command(BaseCommand):
+    help = "Benchmarks chart building on a synthetic state x district x indicator parquet"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **kwargs):
+        rows = kwargs["rows"]
+        rng = np.random.default_rng(0)
+        states = list(STATE_ABBR.keys())
+        df = pd.DataFrame(
+            {
+                "state": rng.choice(states, rows),
+                "district": rng.choice([f"district {i}" for i in range(40)], rows),
+                "indicator": rng.choice([f"indicator_{i}" for i in range(20)], rows),
+                "date": pd.Timestamp("2000-01-01")
+                + pd.to_timedelta(rng.integers(0, 8000, rows), unit="D"),
+                "value": rng.random(rows),
+            }
+        )
+        charts = {
+            "timeseries_chart": {
+                "keys": ["state", "district", "indicator"],
+                "value_columns": ["date", "value"],
+            },
+            "bar_chart": {
+                "keys": ["state", "district", "indicator"],
+                "x": "date",
+                "y": ["value"],
+            },
+        }
+
+        with tempfile.TemporaryDirectory() as tmp:
+            file_name = os.path.join(tmp, "benchmark.parquet")
+            df.to_parquet(file_name)
+
+            for chart_type, variables in charts.items():
+                builder = ChartBuilder.create(chart_type)
+                timings = {"groupby": [], "sorted groups": []}
+                for _ in range(kwargs["repeat"]):
+                    start = time.perf_counter()
+                    expected = build_chart_groupby(builder, file_name, variables)
+                    timings["groupby"].append(time.perf_counter() - start)
+
+                    start = time.perf_counter()
+                    result = builder.build_chart(file_name, variables)
+                    timings["sorted groups"].append(time.perf_counter() - start)
+
+                if result != expected:
+                    self.stderr.write(f"{chart_type}: results differ")
+                for path, seconds in timings.items():
+                    self.stdout.write(
+                        f"{chart_type} ({rows} rows) {path}: {min(seconds):.2f}s"
+                    )
@@ -11,6 +11,18 @@ class Command(BaseCommand):
         parser.add_argument(
             "operation", nargs="+", type=str, help="States what the operation should be"
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of meta files to build concurrently",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild every meta file, even if unchanged since the last build. "
+            "With REBUILD, clears the tables first",
+        )
 
     def handle(self, *args, **kwargs):
         category = kwargs["operation"][0]
@@ -34,11 +46,14 @@ class Command(BaseCommand):
             - Updates the db, by updating values of pre-existing records
 
         2. REBUILD
-            - Rebuilds the db, by clearing existing values, and inputting new ones
+            - Rebuilds the meta files changed since their last build, and deletes values no longer built from any meta file
+            - With --force, rebuilds the db, by clearing existing values, and inputting new ones
 
         SAMPLE COMMAND :
         - python manage.py loader DATA_CATALOG REBUILD
         - python manage.py loader DASHBOARDS UPDATE meta_1,meta_2
+        - python manage.py loader DATA_CATALOGUE REBUILD --workers 8
+        - python manage.py loader DASHBOARDS REBUILD --force
         """
         if category in [
             "DATA_CATALOGUE",
@@ -62,4 +77,10 @@ class Command(BaseCommand):
             #         "REBUILD operation is not allowed for models that contain `download` field. Please delete the objects individually to avoid data loss!"
             #     )
             builder = GeneralMetaBuilder.create(property=category)
-            builder.build_operation(manual=True, rebuild=rebuild, meta_files=files)
+            builder.build_operation(
+                manual=True,
+                rebuild=rebuild,
+                meta_files=files,
+                workers=kwargs["workers"],
+                force=kwargs["force"],
+            )
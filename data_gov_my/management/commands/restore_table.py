@@ -0,0 +1,22 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from data_gov_my.utils.table_swap import restore_table
+
+
+class Command(BaseCommand):
+    help = (
+        "Swaps back the table replaced by the last rebuild of a model (e.g. data_gov_my.KTMBTimeseries), "
+        "if it was kept with KEEP_REPLACED_TABLES"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", type=str, help="<app_label>.<ModelName>")
+
+    def handle(self, *args, **kwargs):
+        model = apps.get_model(kwargs["model"])
+        try:
+            restore_table(model)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(f"Restored the previous {model._meta.db_table} table.")
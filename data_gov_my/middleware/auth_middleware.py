@@ -2,8 +2,8 @@ import os
 import sys
 
 from django.http import JsonResponse
-from django.core.cache import cache
 from data_gov_my.models import AuthTable
+from data_gov_my.utils.local_cache import local_cache
 
 
 class AuthMiddleware:
@@ -50,14 +50,14 @@ class AuthMiddleware:
                         {"status": 401, "message": "Unauthorized"}, status=400
                     )
             else:
-                auth_key = cache.get("AUTH_KEY")
+                auth_key = local_cache.get("AUTH_KEY")
                 if not auth_key:
                     auth_key = (
                         AuthTable.objects.filter(key="AUTH_TOKEN")
                         .values("value")
                         .first()["value"]
                     )
-                    cache.set("AUTH_KEY", auth_key)
+                    local_cache.set("AUTH_KEY", auth_key)
                 if (req_auth_key != auth_key) and (req_auth_key != master_token):
                     return JsonResponse(
                         {"status": 401, "message": "Unauthorized"}, status=400
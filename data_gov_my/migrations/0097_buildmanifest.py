@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-17 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("data_gov_my", "0096_publication_description_email"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BuildManifest",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                ("digest", models.CharField(max_length=64)),
+                ("objects_built", models.JSONField(default=dict)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("data_gov_my", "0097_buildmanifest"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="ktmbtimeseries",
+            name="ktmb_timeseries_idx",
+        ),
+        migrations.AddIndex(
+            model_name="ktmbtimeseries",
+            index=models.Index(
+                fields=["service", "origin", "destination", "frequency", "date"],
+                name="ktmb_timeseries_date_idx",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="prasaranatimeseries",
+            name="prasarana_timeseries_idx",
+        ),
+        migrations.AddIndex(
+            model_name="prasaranatimeseries",
+            index=models.Index(
+                fields=["service", "origin", "destination", "frequency", "date"],
+                name="prasarana_timeseries_date_idx",
+            ),
+        ),
+    ]
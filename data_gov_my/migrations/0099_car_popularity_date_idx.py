@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-17 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("data_gov_my", "0098_transport_timeseries_date_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="carpopularitytimeseriesmaker",
+            name="car_popularity_maker_idx",
+        ),
+        migrations.AddIndex(
+            model_name="carpopularitytimeseriesmaker",
+            index=models.Index(
+                fields=["maker", "date"], name="car_popularity_maker_date_idx"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="carpopularitytimeseriesmodel",
+            name="car_popularity_model_idx",
+        ),
+        migrations.AddIndex(
+            model_name="carpopularitytimeseriesmodel",
+            index=models.Index(
+                fields=["maker", "model", "date"],
+                name="car_popularity_model_date_idx",
+            ),
+        ),
+    ]
@@ -213,6 +213,22 @@ class ExplorersUpdate(models.Model):
         return f"{self.explorer} ({self.file_name})"
 
 
+class BuildManifest(models.Model):
+    """
+    Content hash of the last successful build for a meta file (or a chart / explorer table within one),
+    used to skip unchanged inputs on subsequent builds.
+    """
+
+    key = models.CharField(max_length=255, primary_key=True)
+    digest = models.CharField(max_length=64)
+    # {model label: {"count": n, "pks": [...]}} of the model objects built, pks only for small builds
+    objects_built = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.key} ({self.digest[:8]})"
+
+
 class Publication(models.Model):
     publication_id = models.CharField(max_length=30)
     language = models.CharField(max_length=5, choices=LANGUAGE_CHOICES, default="en-GB")
@@ -396,9 +412,10 @@ class KTMBTimeseries(models.Model):
 
     class Meta:
         indexes = [
+            # timeseries are read per route, ordered by frequency and date
             models.Index(
-                fields=["service", "origin", "destination"],
-                name="ktmb_timeseries_idx",
+                fields=["service", "origin", "destination", "frequency", "date"],
+                name="ktmb_timeseries_date_idx",
             )
         ]
 
@@ -429,9 +446,10 @@ class PrasaranaTimeseries(models.Model):
 
     class Meta:
         indexes = [
+            # timeseries are read per route, ordered by frequency and date
             models.Index(
-                fields=["service", "origin", "destination"],
-                name="prasarana_timeseries_idx",
+                fields=["service", "origin", "destination", "frequency", "date"],
+                name="prasarana_timeseries_date_idx",
             )
         ]
 
@@ -466,9 +484,10 @@ class CarPopularityTimeseriesMaker(models.Model):
 
     class Meta:
         indexes = [
+            # timeseries are aggregated per car, ordered by date
             models.Index(
-                fields=["maker"],
-                name="car_popularity_maker_idx",
+                fields=["maker", "date"],
+                name="car_popularity_maker_date_idx",
             )
         ]
 
@@ -483,7 +502,7 @@ class CarPopularityTimeseriesModel(models.Model):
     class Meta:
         indexes = [
             models.Index(
-                fields=["maker", "model"],
-                name="car_popularity_model_idx",
+                fields=["maker", "model", "date"],
+                name="car_popularity_model_date_idx",
             )
         ]
@@ -115,6 +115,25 @@ CACHES = {
 
 RQ_QUEUES = {"high": {"USE_REDIS_CACHE": "default"}}
 
+# Local cache of parquet files downloaded by the meta builders
+PARQUET_CACHE_DIR = os.getenv(
+    "PARQUET_CACHE_DIR", os.path.join(BASE_DIR, "_cache", "parquet")
+)
+PARQUET_CACHE_MAX_BYTES = int(os.getenv("PARQUET_CACHE_MAX_BYTES", 2 * 1024**3))
+
+# In-process tier in front of the redis cache, for dashboard meta and chart data
+LOCAL_CACHE_MAX_BYTES = int(os.getenv("LOCAL_CACHE_MAX_BYTES", 256 * 1024**2))
+LOCAL_CACHE_TIMEOUT = int(os.getenv("LOCAL_CACHE_TIMEOUT", 300))
+
+# Catalogue slices (rows of one dataviz filter combination) above this size are not pre-serialized
+CATALOGUE_SLICE_MAX_ROWS = int(os.getenv("CATALOGUE_SLICE_MAX_ROWS", 100_000))
+
+# Keep the table replaced by a table rebuild as `<table>_old` (until the next rebuild), so that it can be restored
+KEEP_REPLACED_TABLES = os.getenv("KEEP_REPLACED_TABLES") == "True"
+
+# Postcodes whose addresses are kept in memory (per process) for fuzzy address search, 0 to always search in Postgres
+ADDRESS_SEARCH_PARTITIONS = int(os.getenv("ADDRESS_SEARCH_PARTITIONS", 0))
+
 # TODO: https://docs.djangoproject.com/en/4.2/topics/http/sessions/#using-cached-sessions
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
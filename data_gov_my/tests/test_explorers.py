@@ -0,0 +1,245 @@
+import calendar
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from django.test import TestCase, override_settings
+
+from data_gov_my.explorers.BirthdayPopularity import BirthdayIndex
+from data_gov_my.explorers.CarPopularity import CarPopularityExplorer, CarVocabulary
+from data_gov_my.explorers.KTMB import KTMB
+from data_gov_my.explorers.NamePopularity import NameIndex
+from data_gov_my.models import (
+    CarPopularityTimeseriesModel,
+    ExplorersUpdate,
+    KTMBTimeseries,
+)
+from data_gov_my.utils.trigram_index import TrigramIndex, trigrams
+
+"""
+Name popularity
+"""
+
+
+def test_name_index_privacy_and_peak_decade():
+    index = NameIndex(
+        names=["aisyah", "adam", "ali"],
+        counts=np.array([[5, 20, 20], [0, 50, 0], [1, 2, 3]]),
+        totals=np.array([45, 50, 6]),
+        decades=["1990", "2000", "2010"],
+    )
+
+    assert index.rows["adam"] == 1
+    assert index.peak_decade(index.rows["aisyah"]) == "2010"  # latest of the ties
+    assert index.is_private(index.rows["adam"])  # a single decade
+    assert index.is_private(index.rows["ali"])  # less than 10
+    assert index.peak_decade(index.rows["ali"]) is None
+
+
+def test_name_index_null_total():
+    index = NameIndex(
+        names=["adam", "ali"],
+        counts=np.array([[10, 20], [0, 0]]),
+        totals=np.array([30, 0]),
+        decades=["2000", "2010"],
+        has_total=np.array([True, False]),
+    )
+
+    assert index.total(index.rows["adam"]) == 30
+    assert index.total(index.rows["ali"]) is None  # returned as stored
+
+
+def test_name_index_prefix_suggestions():
+    names = ["al", "ali", "alia", "aliff", "alim", "amir", "rare", "banned"]
+    counts = np.array([[10, 10]] * len(names))
+    counts[names.index("rare")] = [0, 50]  # private: a single decade
+    index = NameIndex(
+        names=names,
+        counts=counts,
+        totals=np.array([5, 40, 30, 30, 10, 60, 50, 99]),
+        decades=["2000", "2010"],
+        hidden=frozenset(["banned"]),
+    )
+    suggest = lambda prefix, n=10: [index.names[r] for r in index.suggest(prefix, n)]
+
+    assert suggest("a") == ["amir", "ali", "alia", "aliff", "alim", "al"]
+    assert suggest("al") == ["ali", "alia", "aliff", "alim", "al"]
+    assert suggest("ali") == ["ali", "alia", "aliff", "alim"]  # not just "al" itself
+    assert suggest("alif") == ["aliff"]
+    assert suggest("a", 2) == ["amir", "ali"]
+    assert suggest("r") == suggest("b") == suggest("zz") == []
+
+
+"""
+Birthday popularity
+"""
+
+
+def test_birthday_index_aggregation():
+    days = [date(2019, 12, 30) + timedelta(days=i) for i in range(800)]
+    epochs = [calendar.timegm(d.timetuple()) * 1000 for d in days]
+    births = list(range(1, len(days) + 1))
+    data = {"x": epochs, "births": births, "rank": births}
+    index = BirthdayIndex({"data": {"mys": data, "jhr": data}}, {"data": {}}, {})
+
+    def reference(start, end, by_day):
+        # per day loop of the previous implementation
+        has_leap = any(calendar.isleap(y) for y in range(start, end + 1))
+        count = [0] * (365 + has_leap) if by_day else [0] * 12
+        for d, b in zip(days, births):
+            if start <= d.year <= end:
+                yday = d.timetuple().tm_yday
+                pos = (
+                    yday + (has_leap and not calendar.isleap(d.year) and yday > 59)
+                    if by_day
+                    else d.month
+                )
+                count[pos - 1] += b
+        return count
+
+    for start, end, by_day in [(2020, 2021, True), (2021, 2021, True), (2019, 2022, False)]:
+        x, count = index.aggregate("jhr", start, end, by_day)
+        assert count == reference(start, end, by_day)
+        assert len(x) == len(count)
+    assert index.aggregate("jhr", 2021, 2021, True)[0][0] == 0  # 1 January 1970
+
+
+def test_birthday_index_null_births():
+    epochs = [calendar.timegm(date(2021, 1, d).timetuple()) * 1000 for d in (1, 2, 3)]
+    data = {"x": epochs, "births": [4, None, 6], "rank": [1, None, 2]}
+    index = BirthdayIndex({"data": {"mys": data}}, {"data": {}}, {})
+
+    count = index.aggregate("mys", 2021, 2021, True)[1]
+    assert count[:3] == [4, 0, 6]  # nulls are summed as 0
+    assert all(isinstance(c, int) for c in count)
+    assert index.states["mys"]["totals"][1] is None
+    assert index.aggregate("mys", 2021, 2021, False)[1][0] == 10
+
+    data["births"] = [1.5, None, 1]
+    index = BirthdayIndex({"data": {"mys": data}}, {"data": {}}, {})
+    assert index.aggregate("mys", 2021, 2021, False)[1][0] == 2.5
+
+
+"""
+Car popularity
+"""
+
+
+def test_trigram_index_matches_pg_trgm_similarity():
+    assert trigrams("Word") == {"  w", " wo", "wor", "ord", "rd "}
+    assert trigrams("a-b") == {"  a", " a ", "  b", " b "}
+
+    index = TrigramIndex(["two words", "word", "sword", "other"])
+    rows, similarity = index.search("word", limit=3)
+    assert rows.tolist() == [1, 2, 0]
+    assert similarity.tolist() == pytest.approx([1, 3 / 8, 4 / 11])  # as pg_trgm
+
+    assert index.search("zzz")[0].tolist() == []
+    assert index.search("word", limit=1)[0].tolist() == [1]
+
+
+def test_car_vocabulary_search():
+    vocabulary = CarVocabulary(
+        [("perodua", "axia"), ("perodua", "myvi"), ("proton", "saga"), ("proton", "x50")]
+    )
+
+    assert vocabulary.makers == ["perodua", "proton"]
+    assert [r["maker"] for r in vocabulary.search_makers("proton", 10)] == [
+        "proton",
+        "perodua",  # sharing "  p"
+    ]
+    assert vocabulary.search_models("myvi", 1) == [
+        {"maker": "perodua", "model": "myvi", "similarity": pytest.approx(5 / 13)}
+    ]
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestCarPopularityTimeseries(TestCase):
+    def setUp(self):
+        for maker, model, day, cars in [
+            ("proton", "saga", date(2023, 2, 1), 20),
+            ("perodua", "myvi", date(2023, 1, 1), 5),
+            ("proton", "saga", date(2023, 1, 1), 10),
+            ("perodua", "myvi", date(2023, 2, 1), 6),
+            ("proton", "x50", date(2023, 1, 1), 99),
+        ]:
+            CarPopularityTimeseriesModel.objects.create(
+                maker=maker, model=model, date=day, cars=cars, cars_cumul=cars
+            )
+
+    def test_timeseries_pivoted_per_car(self):
+        with self.assertNumQueries(1):
+            res = CarPopularityExplorer().get_timeseries(
+                ["proton", "perodua"], ["saga", "myvi"]
+            )
+        self.assertEqual(
+            res,
+            {
+                "x": [1672531200000, 1675209600000],
+                "perodua myvi": {
+                    "maker": "perodua",
+                    "model": "myvi",
+                    "cars": [5, 6],
+                    "cars_cumul": [5, 6],
+                },
+                "proton saga": {
+                    "maker": "proton",
+                    "model": "saga",
+                    "cars": [10, 20],
+                    "cars_cumul": [10, 20],
+                },
+            },
+        )
+
+        with self.assertNumQueries(0):  # cached for the same cars, in any order
+            CarPopularityExplorer().get_timeseries(["perodua", "proton"], ["myvi", "saga"])
+
+
+"""
+Transport
+"""
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestTransportTimeseries(TestCase):
+    def setUp(self):
+        route = dict(service="komuter", origin="A", destination="B")
+        for frequency, day, passengers in [
+            ("monthly", date(2023, 2, 1), 20),
+            ("daily", date(2023, 1, 2), 2),
+            ("monthly", date(2023, 1, 1), 10),
+            ("daily", date(2023, 1, 1), 1),
+        ]:
+            KTMBTimeseries.objects.create(
+                frequency=frequency, date=day, passengers=passengers, **route
+            )
+        ExplorersUpdate.objects.create(
+            explorer="KTMB", file_name="KTMBTimeseries", last_update="2023-02-01"
+        )
+
+    def test_timeseries_columns(self):
+        with self.assertNumQueries(2):  # timeseries and data_as_of
+            res = KTMB().get_timeseries("komuter", "A", "B")
+        self.assertEqual(
+            res,
+            {
+                "data_as_of": "2023-02-01",
+                "data": {
+                    "daily": {
+                        "x": [1672531200000, 1672617600000],
+                        "passengers": [1, 2],
+                    },
+                    "monthly": {
+                        "x": [1672531200000, 1675209600000],
+                        "passengers": [10, 20],
+                    },
+                },
+            },
+        )
+
+        with self.assertNumQueries(1):  # data_as_of is cached
+            KTMB().get_timeseries("komuter", "A", "B")
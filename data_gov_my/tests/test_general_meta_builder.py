@@ -1,7 +1,12 @@
+from unittest import mock
+
 from django.test import TestCase
 
-from data_gov_my.models import Publication
+from data_gov_my.models import BuildManifest, KTMBTimeseries, MetaJson, Publication
+from data_gov_my.utils import build_manifest
+from data_gov_my.utils.build_manifest import BuildTracker
 from data_gov_my.utils.meta_builder import GeneralMetaBuilder, PublicationBuilder
+from data_gov_my.utils.table_swap import rebuild_table
 
 
 class TestEmailSubscription(TestCase):
@@ -17,3 +22,84 @@ class TestEmailSubscription(TestCase):
     def test_email_subscription(self):
         # check publication
         print(Publication.objects.count())
+
+
+def test_run_concurrently_isolates_failures():
+    builder = GeneralMetaBuilder.create("FORMS")
+    builder.workers = 4
+
+    def build(meta):
+        if meta == "broken.json":
+            raise ValueError("invalid meta")
+        return [meta.upper()]
+
+    files = ["a.json", "broken.json", "b.json", "c.json"]
+    results = builder.run_concurrently(build, files)
+
+    assert [item for item, *_ in results] == files
+    assert [result for _, result, _, _ in results] == [
+        ["A.JSON"],
+        None,
+        ["B.JSON"],
+        ["C.JSON"],
+    ]
+    assert isinstance(results[1][2], ValueError)
+    assert all(elapsed >= 0 for *_, elapsed in results)
+
+
+class TestBuildTracker(TestCase):
+    def test_skips_unchanged_inputs(self):
+        tracker = BuildTracker("FORMS")
+        digest = tracker.digest(b'{"form": 1}')
+        self.assertFalse(tracker.is_unchanged("form.json", digest))
+
+        form = MetaJson.objects.create(dashboard_name="form", dashboard_meta={})
+        tracker.record("form.json", digest, [form])
+        self.assertTrue(tracker.is_unchanged("form.json", digest))
+        self.assertFalse(tracker.is_unchanged("form.json", tracker.digest(b"{}")))
+        self.assertEqual(
+            tracker.objects_built(["form.json", "other.json"], MetaJson), ["form"]
+        )
+
+        # forced builds and unfingerprintable sources are always rebuilt
+        forced = BuildTracker("FORMS", force=True)
+        self.assertFalse(forced.is_unchanged("form.json", digest))
+        self.assertIsNone(tracker.digest(b'{"form": 1}', ["/does/not/exist.parquet"]))
+
+        # rebuilt once the objects built are gone, e.g. after a table restore
+        form.delete()
+        self.assertFalse(tracker.is_unchanged("form.json", digest))
+
+    def test_large_builds_record_counts_and_pk_ranges(self):
+        tracker = BuildTracker("PUBLICATION_UPCOMING")
+        digest = tracker.digest(b"{}")
+        objects = [
+            MetaJson.objects.create(dashboard_name=f"meta_{i}", dashboard_meta={})
+            for i in range(3)
+        ]
+
+        with mock.patch.object(build_manifest, "MAX_TRACKED_PKS", 2):
+            tracker.record("upcoming.json", digest, objects)
+        self.assertEqual(
+            BuildManifest.objects.get(key="PUBLICATION_UPCOMING:upcoming.json").objects_built,
+            {"data_gov_my.metajson": {"count": 3, "min_pk": "meta_0", "max_pk": "meta_2"}},
+        )
+        self.assertTrue(tracker.is_unchanged("upcoming.json", digest))
+        self.assertIsNone(tracker.objects_built(["upcoming.json"], MetaJson))
+
+        # unrelated objects outside the range are ignored
+        MetaJson.objects.create(dashboard_name="other", dashboard_meta={})
+        self.assertTrue(tracker.is_unchanged("upcoming.json", digest))
+        objects[1].delete()
+        self.assertFalse(tracker.is_unchanged("upcoming.json", digest))
+
+    def test_tables_record_their_oid(self):
+        tracker = BuildTracker("EXPLORERS")
+        digest = tracker.digest(b"{}")
+        tracker.record("KTMB/KTMBTimeseries", digest, tables=[KTMBTimeseries])
+        self.assertTrue(tracker.is_unchanged("KTMB/KTMBTimeseries", digest))
+
+        # a table swapped into place, e.g. by `restore_table()`
+        with rebuild_table(KTMBTimeseries):
+            pass
+        self.assertFalse(tracker.is_unchanged("KTMB/KTMBTimeseries", digest))
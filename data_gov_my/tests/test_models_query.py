@@ -1,8 +1,18 @@
+import tempfile
+
+import pandas as pd
+from django.db import connection
 from django.test import TestCase
 from faker import Faker
 
-from data_gov_my.models import Subscription
+from data_gov_my.models import (
+    KTMBTimeseriesCallout,
+    NameDashboard_FirstName,
+    Subscription,
+)
+from data_gov_my.utils.copy_loader import copy_parquet
 from data_gov_my.utils.publication_helpers import subtype_list
+from data_gov_my.utils.table_swap import rebuild_table, restore_table
 
 faker = Faker()
 
@@ -22,3 +32,92 @@ class TestModelsQuery(TestCase):
 
         for s in subtype_list:
             self.assertEqual(Subscription.objects.filter(publications__overlap=[s, 'all']).count(), 2)
+
+
+class TestCopyLoader(TestCase):
+    def test_copy_parquet_replaces_and_upserts(self):
+        NameDashboard_FirstName.objects.create(name="stale", total=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/names.parquet"
+            pd.DataFrame(
+                {"name": ["aisyah", "adam", ""], "1920s": [1.0, None, 3.0]}
+            ).to_parquet(path)
+            rename = lambda df: df.rename(columns={"1920s": "d_1920"})
+
+            copied = copy_parquet(
+                NameDashboard_FirstName, path, rename, replace=True, batch_size=2
+            )
+            self.assertEqual(copied, 3)
+            self.assertFalse(NameDashboard_FirstName.objects.filter(name="stale").exists())
+            adam = NameDashboard_FirstName.objects.get(name="adam")
+            self.assertEqual((adam.d_1920, adam.total), (None, 0))
+            self.assertEqual(NameDashboard_FirstName.objects.get(name="").d_1920, 3)
+
+            NameDashboard_FirstName.objects.filter(name="adam").update(total=5)
+            pd.DataFrame({"name": ["adam"], "1920s": [7]}).to_parquet(path)
+            copy_parquet(NameDashboard_FirstName, path, rename, unique_keys=["name"])
+            adam = NameDashboard_FirstName.objects.get(name="adam")
+            self.assertEqual((adam.d_1920, adam.total), (7, 5))
+            self.assertEqual(NameDashboard_FirstName.objects.count(), 3)
+
+
+class TestTableSwap(TestCase):
+    def test_rebuild_swaps_table_with_its_indexes(self):
+        def indexes():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT indexname FROM pg_indexes WHERE tablename = %s",
+                    [KTMBTimeseriesCallout._meta.db_table],
+                )
+                return sorted(row[0] for row in cursor.fetchall())
+
+        row = dict(service="komuter", origin="A", destination="B", frequency="daily")
+        KTMBTimeseriesCallout.objects.create(passengers=1, **row)
+        before = indexes()
+
+        with rebuild_table(KTMBTimeseriesCallout, keep_replaced=True) as shadow:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO "{shadow}" (service, origin, destination, frequency, passengers) '
+                    "VALUES ('komuter', 'A', 'B', 'daily', 2)"
+                )
+            # readers still see the live table until the swap
+            self.assertEqual(KTMBTimeseriesCallout.objects.get().passengers, 1)
+
+        self.assertEqual(KTMBTimeseriesCallout.objects.get().passengers, 2)
+        self.assertEqual(indexes(), before)
+        with connection.cursor() as cursor:  # analyzed before the swap
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [KTMBTimeseriesCallout._meta.db_table],
+            )
+            self.assertEqual(cursor.fetchone()[0], 1)
+        self.assertIn("ktmb_callout_idx", before)
+        # ids still come from the table's sequence
+        KTMBTimeseriesCallout.objects.create(passengers=3, **row)
+
+        restore_table(KTMBTimeseriesCallout)
+        self.assertEqual(KTMBTimeseriesCallout.objects.get().passengers, 1)
+        self.assertEqual(indexes(), before)
+
+    def test_replaced_table_is_dropped_unless_kept(self):
+        table = KTMBTimeseriesCallout._meta.db_table
+
+        def exists(name):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT to_regclass(%s)", [name])
+                return cursor.fetchone()[0] is not None
+
+        with rebuild_table(KTMBTimeseriesCallout):
+            pass
+        self.assertFalse(exists(f"{table}_old"))
+        with self.assertRaises(ValueError):
+            restore_table(KTMBTimeseriesCallout)
+
+        # a replaced table with other columns, e.g. from before a migration
+        with rebuild_table(KTMBTimeseriesCallout, keep_replaced=True):
+            pass
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{table}_old" ADD COLUMN extra integer')
+        with self.assertRaises(ValueError):
+            restore_table(KTMBTimeseriesCallout)
@@ -1,7 +1,26 @@
+import json
+import os
+
+import numpy as np
 import pandas as pd
 import pytest
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import RequestFactory, override_settings
 
+from data_gov_my.utils import chart_builders
 from data_gov_my.utils.chart_builders import ChartBuilder
+from data_gov_my.utils.chart_groups import SortedGroups
+from data_gov_my.utils.chart_payloads import (
+    get_chart_payload,
+    is_empty_payload,
+    render_json,
+    store_chart_payloads,
+)
+from data_gov_my.utils.etags import bump_build_version, conditional_get
+from data_gov_my.utils.index_registry import IndexRegistry
+from data_gov_my.utils.local_cache import TwoTierCache, value_size
+from data_gov_my.utils.parquet_cache import ParquetCache
 from data_gov_my.utils.variable_structures import *
 
 """
@@ -625,6 +644,33 @@ def test_choropleth_chart(sample_choropleth_data):
     assert result == expected_result
 
 
+def test_choropleth_chart_keyed_reads_required_columns(tmp_path):
+    file_name = tmp_path / "test_file.parquet"
+    df = pd.DataFrame(
+        {
+            "period": ["2020", "2020", "2021", "2021"],
+            "state": ["Johor", "Kedah", "Johor", "Kedah"],
+            "y1": [0.1, 0.2, 0.3, 0.4],
+            "y2": [1, 2, 3, 4],
+            "unused": ["a", "b", "c", "d"],
+        }
+    )
+    df.to_parquet(file_name)
+    variables = {"keys": ["period"], "x": "state", "y": ["y1"]}
+
+    assert ChoroplethChartVariables(**variables).required_columns() == {
+        "period",
+        "state",
+        "y1",
+    }
+    builder = ChartBuilder.create("choropleth_chart")
+    result = builder.build_chart(str(file_name), variables)
+    assert result == {
+        "2020": {"x": ["jhr", "kdh"], "y": {"y1": [0.1, 0.2]}},
+        "2021": {"x": ["jhr", "kdh"], "y": {"y1": [0.3, 0.4]}},
+    }
+
+
 """
 Metrics Table
 """
@@ -839,3 +885,266 @@ def test_map_lat_long_chart(sample_map_lat_long_data):
     builder = ChartBuilder.create("map_lat_lon")
     result = builder.build_chart(sample_map_lat_long_data, variables)
     assert result == expected_result
+
+
+"""
+Parquet cache
+"""
+
+
+def test_parquet_cache_revalidates_with_etag(tmp_path, monkeypatch):
+    source = tmp_path / "source.parquet"
+    pd.DataFrame({"a": [1, 2, 3]}).to_parquet(source)
+    content = source.read_bytes()
+    requests_made = []
+
+    class FakeResponse:
+        def __init__(self, status_code):
+            self.status_code = status_code
+            self.headers = {"ETag": '"v1"'}
+
+        def iter_content(self, chunk_size):
+            yield content
+
+        def raise_for_status(self):
+            pass
+
+    def fake_get(url, headers={}, **kwargs):
+        requests_made.append(headers)
+        return FakeResponse(304 if headers.get("If-None-Match") == '"v1"' else 200)
+
+    monkeypatch.setattr("data_gov_my.utils.parquet_cache.requests.get", fake_get)
+    cache = ParquetCache(str(tmp_path / "cache"), max_bytes=10**9)
+    url = "https://example.com/data.parquet"
+
+    cache.start_build()
+    path = cache.get(url)
+    assert cache.get(url) == path  # memoised within a build
+    assert cache.end_build() == {"memo_hits": 1, "disk_hits": 0, "misses": 1}
+
+    cache.start_build()
+    assert pd.read_parquet(cache.get(url))["a"].tolist() == [1, 2, 3]
+    assert cache.end_build() == {"memo_hits": 0, "disk_hits": 1, "misses": 0}
+    assert requests_made[-1] == {"If-None-Match": '"v1"'}
+
+    # evicted once the cache exceeds its size bound
+    cache.max_bytes = 0
+    cache.evict()
+    assert not os.path.exists(path)
+
+    # outside a build, the file returned is kept even if it is above the bound
+    assert os.path.exists(cache.get(url))
+    assert [f for f in os.listdir(tmp_path / "cache") if f.endswith(".tmp")] == []
+
+    # evicted by another worker process between its revalidation and its use
+    cache.max_bytes = 10**9
+    utime = os.utime
+
+    def evicted_utime(path, *args, **kwargs):
+        monkeypatch.setattr("data_gov_my.utils.parquet_cache.os.utime", utime)
+        os.remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr("data_gov_my.utils.parquet_cache.os.utime", evicted_utime)
+    cache.start_build()
+    assert pd.read_parquet(cache.get(url))["a"].tolist() == [1, 2, 3]
+    assert cache.end_build() == {"memo_hits": 0, "disk_hits": 0, "misses": 1}
+    assert requests_made[-1] == {}  # downloaded again, without revalidating
+
+
+"""
+Shared source frame
+"""
+
+
+def test_charts_on_shared_source_frame(tmp_path):
+    file_name = str(tmp_path / "shared.parquet")
+    pd.DataFrame(
+        {
+            "state": ["Johor", "Johor", "Kedah", "Kedah"],
+            "date": ["2020-01-01", "2021-01-01", "2020-01-01", "2021-01-01"],
+            "value": [1, 2, 3, None],
+        }
+    ).to_parquet(file_name)
+    shared = pd.read_parquet(file_name)
+    original = shared.copy()
+
+    charts = [
+        ("timeseries_chart", {"keys": ["state"], "value_columns": ["date", "value"]}),
+        ("bar_chart", {"keys": ["state"], "x": "date", "y": ["value"]}),
+    ]
+    for chart_type, variables in charts:
+        builder = ChartBuilder.create(chart_type)
+        assert builder.build_chart(
+            file_name, variables, df=shared
+        ) == ChartBuilder.create(chart_type).build_chart(file_name, variables)
+
+    pd.testing.assert_frame_equal(shared, original)
+
+
+"""
+Sorted groups
+"""
+
+
+def test_sorted_groups_match_groupby():
+    df = pd.DataFrame(
+        {
+            "state": ["Kedah", "Johor", "Kedah", "Johor", None, "Johor"],
+            "year": [2021, 2021, 2020, 2020, 2020, 2021],
+            "value": [1, 2, 3, 4, 5, 6],
+        }
+    )
+    groups = SortedGroups(df, ["state", "year"])
+    result = [(name, groups.column("value")[rows]) for name, rows in groups]
+    expected = [
+        ([str(n) for n in name], group["value"].tolist())
+        for name, group in df.groupby(["state", "year"])
+    ]
+    assert result == expected
+    assert len(groups) == 4
+
+
+"""
+Column projection
+"""
+
+
+def test_build_chart_reads_required_columns(tmp_path, monkeypatch):
+    file_name = str(tmp_path / "wide.parquet")
+    pd.DataFrame(
+        {
+            "indicator": ["a", "a", "b", "c"],
+            "x": [1, 2, 1, 2],
+            "y": [10, 20, 30, 40],
+            "unused": [0, 0, 0, 0],
+        }
+    ).to_parquet(file_name)
+
+    reads = []
+    read_parquet = pd.read_parquet
+
+    def tracked_read_parquet(path, **kwargs):
+        reads.append(kwargs)
+        return read_parquet(path, **kwargs)
+
+    monkeypatch.setattr(chart_builders.pd, "read_parquet", tracked_read_parquet)
+    variables = {
+        "keys": ["indicator"],
+        "x": "x",
+        "y": ["value"],
+        "rename_cols": {"y": "value"},
+        "filter": {"indicator": ["a", "b"]},
+    }
+    result = ChartBuilder.create("bar_chart").build_chart(file_name, variables)
+
+    assert result == {"a": {"x": [1, 2], "value": [10, 20]}, "b": {"x": [1], "value": [30]}}
+    assert sorted(reads[0]["columns"]) == ["indicator", "x", "y"]
+    assert reads[0]["filters"] == [("indicator", "in", ["a", "b"])]
+
+
+"""
+Chart payloads
+"""
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+def test_chart_payloads_split_at_api_params():
+    chart_meta = {"api_type": "dynamic", "api_params": ["state", "indicator"]}
+    res = {
+        "data": {"jhr": {"a": {"x": [1, 2]}, "b": {}}, "kdh": {"a": {"x": [3]}}},
+        "data_as_of": "2023-01-01",
+    }
+    store_chart_payloads("dbd", "chart", chart_meta, res)
+
+    payload = get_chart_payload("dbd", "chart", ["jhr", "a"])
+    assert json.loads(payload) == {"data_as_of": "2023-01-01", "data": {"x": [1, 2]}}
+    assert is_empty_payload(get_chart_payload("dbd", "chart", ["jhr", "b"]))
+    assert get_chart_payload("dbd", "chart", ["jhr"]) is None
+    assert json.loads(render_json({"data_last_updated": None, "chart": payload})) == {
+        "data_last_updated": None,
+        "chart": {"data_as_of": "2023-01-01", "data": {"x": [1, 2]}},
+    }
+
+    # leaves removed from the chart are no longer served
+    res["data"].pop("kdh")
+    store_chart_payloads("dbd", "chart", chart_meta, res)
+    assert get_chart_payload("dbd", "chart", ["kdh", "a"]) is None
+
+
+"""
+Local cache
+"""
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+def test_local_cache_tier():
+    local = TwoTierCache(max_bytes=2 * value_size(b"x" * 100), timeout=60)
+    local.set("a", b"x" * 100)
+    cache.set("a", b"stale")  # the local tier is served until invalidated
+    assert local.get("a") == b"x" * 100
+
+    local.invalidate(["a"])
+    assert local.get("a") == b"stale"
+    assert local.get("missing", "default") == "default"
+
+    # least recently used entries are evicted beyond max_bytes
+    local.set("b", b"y" * 100)
+    local.set("c", b"z" * 100)
+    stats = local.stats()
+    assert stats["entries"] == 2 and stats["bytes"] == 200
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+"""
+ETags
+"""
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+def test_conditional_get_etag():
+    calls = []
+
+    class View:
+        @conditional_get(lambda request, *args, **kwargs: "DASHBOARD_test")
+        def get(self, request):
+            calls.append(request)
+            return JsonResponse({"data": 1})
+
+    factory = RequestFactory()
+    response = View().get(factory.get("/dashboard/?dashboard=test"))
+    etag = response["ETag"]
+    assert response.status_code == 200 and "no-cache" in response["Cache-Control"]
+
+    request = factory.get("/dashboard/?dashboard=test", HTTP_IF_NONE_MATCH=etag)
+    assert View().get(request).status_code == 304
+    assert len(calls) == 1
+
+    bump_build_version("DASHBOARD_test")
+    response = View().get(request)
+    assert response.status_code == 200 and response["ETag"] != etag
+
+
+"""
+Index registry
+"""
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+def test_index_registry_rebuilds_on_new_build_version():
+    registry = IndexRegistry()
+    builds = []
+    build = lambda: builds.append(1) or len(builds)
+
+    assert registry.get("index", "EXPLORER_test", build) == 1
+    assert registry.get("index", "EXPLORER_test", build) == 1
+    bump_build_version("EXPLORER_test")
+    assert registry.get("index", "EXPLORER_test", build) == 2
@@ -3,16 +3,21 @@ import os
 from datetime import date
 
 from django.core import mail
-from django.test import override_settings
+from django.http import QueryDict
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from jose import jwt
 from rest_framework.test import APITestCase
 
-from data_gov_my.models import AuthTable, PublicationType, PublicationSubtype, Subscription, Publication
-from data_gov_my.utils.meta_builder import GeneralMetaBuilder
+from data_gov_my.models import AuthTable, PublicationType, PublicationSubtype, Subscription, Publication, \
+    DashboardJson, MetaJson
+from data_gov_my.utils.chart_payloads import get_chart_payload, store_chart_payloads
+from data_gov_my.utils.meta_builder import DashboardBuilder, GeneralMetaBuilder
+from data_gov_my.utils.metajson_structures import DashboardValidateModel
 from data_gov_my.utils.publication_helpers import type_list, subtype_list, \
     populate_publication_types, populate_publication_subtypes, send_email_to_subscribers, craft_title, craft_template_en
+from data_gov_my.views import handle_request
 
 
 class TestEmailSubscription(APITestCase):
@@ -261,3 +266,133 @@ class TestEmailSubscribeSubmission(APITestCase):
         r = self.client.get(url, headers={'Authorization': token})
         for p in subs.publications:
             self.assertIn(p, r.json()['data'])
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestDashboardChartFetch(TestCase):
+    def setUp(self):
+        self.charts = {
+            f"chart_{i}": {"api_type": "static", "api_params": []} for i in range(30)
+        }
+        MetaJson.objects.create(
+            dashboard_name="test_dashboard",
+            dashboard_meta={"required_params": [], "charts": self.charts},
+        )
+        for k in self.charts:
+            DashboardJson.objects.create(
+                dashboard_name="test_dashboard",
+                chart_name=k,
+                api_type="static",
+                chart_data={"data": {"x": [1, 2]}, "data_as_of": "2023-01-01"},
+            )
+
+    def test_charts_fetched_in_one_query(self):
+        params = QueryDict("dashboard=test_dashboard")
+        with self.assertNumQueries(2):  # meta and every chart
+            res = handle_request(params)
+        self.assertTrue(set(self.charts) <= set(res))
+
+        with self.assertNumQueries(0):  # backfilled into the cache
+            self.assertEqual(handle_request(params), res)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestChartPayloads(TestCase):
+    def setUp(self):
+        self.chart_meta = {
+            "chart_type": "bar_chart",
+            "api_type": "dynamic",
+            "api_params": ["state"],
+            "variables": {},
+        }
+        MetaJson.objects.create(
+            dashboard_name="test_dashboard",
+            dashboard_meta={"charts": {"chart": self.chart_meta}},
+        )
+        self.chart_data = {"data_as_of": None, "data": {"mys": {"x": [1, 2]}}}
+        DashboardJson.objects.create(
+            dashboard_name="test_dashboard",
+            chart_name="chart",
+            api_type="dynamic",
+            chart_data=self.chart_data,
+        )
+        store_chart_payloads(
+            "test_dashboard", "chart", self.chart_meta, self.chart_data
+        )
+
+    def test_chart_always_returns_data_as_of(self):
+        res = self.client.get(
+            reverse("CHART"),
+            {"dashboard": "test_dashboard", "chart_name": "chart", "state": "mys"},
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("data_as_of", res.json())
+        self.assertIsNone(res.json()["data_as_of"])
+        self.assertEqual(res.json()["data"], {"x": [1, 2]})
+
+    def test_payloads_deleted_with_chart(self):
+        self.assertIsNotNone(get_chart_payload("test_dashboard", "chart", ["mys"]))
+        DashboardBuilder().delete_charts(
+            DashboardJson.objects.filter(dashboard_name="test_dashboard")
+        )
+        self.assertFalse(DashboardJson.objects.exists())
+        self.assertIsNone(get_chart_payload("test_dashboard", "chart", ["mys"]))
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestExplorerETag(TestCase):
+    def setUp(self):
+        MetaJson.objects.create(
+            dashboard_name="birthday_popularity",
+            dashboard_meta={"data_last_updated": "2023-01-01 00:00"},
+        )
+        for chart_name, chart_data in [
+            (
+                "timeseries",
+                {
+                    "data_as_of": "2023-01-01",
+                    "data": {
+                        "mys": {"x": [1672531200000], "births": [5], "rank": [1]}
+                    },
+                },
+            ),
+            ("rank_table", {"data": {}}),
+        ]:
+            DashboardJson.objects.create(
+                dashboard_name="birthday_popularity",
+                chart_name=chart_name,
+                api_type="static",
+                chart_data=chart_data,
+            )
+
+    def test_etag_changes_when_dashboard_is_rebuilt(self):
+        url = reverse("EXPLORER")
+        params = {"explorer": "BIRTHDAY_POPULARITY", "state": "mys"}
+        res = self.client.get(url, params)
+        etag = res["ETag"]
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        DashboardBuilder().update_or_create_meta(
+            "birthday_popularity.json",
+            DashboardValidateModel(
+                dashboard_name="birthday_popularity",
+                data_last_updated="2023-02-01 00:00",
+                route="/dashboard/birthday-popularity",
+                sites=["datagovmy"],
+                manual_trigger="",
+                charts={},
+            ),
+        )
+        res = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(res.json()["data_last_updated"], "2023-02-01 00:00")
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import requests
+from django.apps import apps
+from django.db.models import Max, Min
+
+from data_gov_my.models import BuildManifest
+from data_gov_my.utils.table_swap import table_oid
+
+logger = logging.getLogger("django")
+
+# builds of more objects (e.g. whole tables rebuilt from a parquet) only record their count and pk range
+MAX_TRACKED_PKS = 100
+
+
+def source_fingerprint(source: str) -> str | None:
+    """
+    Returns a cheap fingerprint of a data source without downloading it.
+    Remote files use the ETag (or Last-Modified + Content-Length) from a HEAD request, local files use size + mtime.
+    Returns None if the source cannot be fingerprinted, in which case it should always be rebuilt.
+    """
+    if not source:
+        return None
+
+    if os.path.isfile(source):
+        stat = os.stat(source)
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+    try:
+        res = requests.head(source, allow_redirects=True, timeout=30)
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Unable to fingerprint {source}: {e}")
+        return None
+
+    if res.status_code != 200:
+        return None
+
+    etag = res.headers.get("ETag")
+    if etag:
+        return etag
+    last_modified = res.headers.get("Last-Modified")
+    if last_modified:
+        return f"{last_modified}-{res.headers.get('Content-Length')}"
+    return None
+
+
+class BuildTracker:
+    """
+    Tracks the content hash of every built input (meta files, charts, explorer tables) for a single build operation.
+    Source fingerprints are memoised for the duration of the build, since many charts share the same parquet.
+    If `force` is True, every input is treated as changed.
+    """
+
+    def __init__(self, category: str, force: bool = False):
+        self.category = category
+        self.force = force
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+
+    def key(self, name: str) -> str:
+        return f"{self.category}:{name}"
+
+    def fingerprint(self, source: str) -> str | None:
+        with self._lock:
+            if source in self._fingerprints:
+                return self._fingerprints[source]
+        fingerprint = source_fingerprint(source)
+        with self._lock:
+            self._fingerprints[source] = fingerprint
+        return fingerprint
+
+    def digest(
+        self, content: bytes | str | dict, sources: list[str] = []
+    ) -> str | None:
+        """
+        Returns the sha256 hex digest of the content and the fingerprints of its sources.
+        Returns None if any source could not be fingerprinted.
+        """
+        if isinstance(content, dict):
+            content = json.dumps(content, sort_keys=True, default=str)
+        if isinstance(content, str):
+            content = content.encode()
+
+        h = hashlib.sha256(content)
+        for source in sorted(set(sources)):
+            fingerprint = self.fingerprint(source)
+            if fingerprint is None:
+                return None
+            h.update(f"\n{source}={fingerprint}".encode())
+        return h.hexdigest()
+
+    def is_unchanged(self, name: str, digest: str | None) -> bool:
+        """
+        Returns True if `name` was last built from the same `digest`, and the objects built from it still exist.
+        """
+        if self.force or digest is None:
+            return False
+        objects_built = (
+            BuildManifest.objects.filter(key=self.key(name), digest=digest)
+            .values_list("objects_built", flat=True)
+            .first()
+        )
+        if objects_built is None:
+            return False
+        return all(
+            self.objects_exist(label, built) for label, built in objects_built.items()
+        )
+
+    @staticmethod
+    def objects_exist(label: str, built: dict) -> bool:
+        try:
+            model = apps.get_model(label)
+        except LookupError:
+            return False
+        if "oid" in built:
+            return built["oid"] is not None and table_oid(model) == built["oid"]
+        if "pks" in built:
+            queryset = model.objects.filter(pk__in=built["pks"])
+        else:
+            queryset = model.objects.filter(
+                pk__gte=built["min_pk"], pk__lte=built["max_pk"]
+            )
+        return queryset.count() == built["count"]
+
+    def record(
+        self,
+        name: str,
+        digest: str | None,
+        objects_built: list = [],
+        tables: list = [],
+    ):
+        """
+        Records the `digest` of `name` and what was built from it:
+        - the model objects, as their pks by model, or their count and pk range above `MAX_TRACKED_PKS` objects
+        - the models whose table was rebuilt or updated as a whole, as the oid of their table
+        """
+        if digest is None:
+            self.forget(name)
+            return
+        pks = {}
+        for obj in objects_built:
+            pks.setdefault(type(obj), []).append(obj.pk)
+        built = {}
+        for model, p in pks.items():
+            if len(p) <= MAX_TRACKED_PKS:
+                built[model._meta.label_lower] = {"count": len(p), "pks": p}
+            else:
+                # in the database's ordering of the pks (e.g. the collation of text pks)
+                built[model._meta.label_lower] = {
+                    "count": len(p),
+                    **model.objects.filter(pk__in=p).aggregate(
+                        min_pk=Min("pk"), max_pk=Max("pk")
+                    ),
+                }
+        for model in tables:
+            built[model._meta.label_lower] = {"oid": table_oid(model)}
+        BuildManifest.objects.update_or_create(
+            key=self.key(name),
+            defaults={"digest": digest, "objects_built": built},
+        )
+
+    def forget(self, name: str):
+        BuildManifest.objects.filter(key=self.key(name)).delete()
+
+    def forget_prefix(self, prefix: str):
+        BuildManifest.objects.filter(key__startswith=self.key(prefix)).delete()
+
+    def objects_built(self, names: list[str], model) -> list | None:
+        """
+        Returns the pks of all `model` objects last built from the given inputs,
+        or None if any of them did not record the pks of its objects (e.g. it rebuilt the whole table).
+        """
+        pks = []
+        label = model._meta.label_lower
+        for objects_built in BuildManifest.objects.filter(
+            key__in=[self.key(name) for name in names]
+        ).values_list("objects_built", flat=True):
+            built = objects_built.get(label)
+            if built is None:
+                continue
+            if "pks" not in built:
+                return None
+            pks.extend(built["pks"])
+        return pks
@@ -4,9 +4,13 @@ from abc import ABC, abstractmethod
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from django.utils.text import slugify
 from pydantic import BaseModel
 
+from data_gov_my.utils.chart_groups import SortedGroups
+from data_gov_my.utils.parquet_cache import local_path
 from data_gov_my.utils.variable_structures import *
 
 STATE_ABBR = {
@@ -30,6 +34,23 @@ STATE_ABBR = {
     "Malaysia": "mys",
 }
 
+# columns whose values are transformed in `ChartBuilder.pre_process()`, so filters on them cannot be pushed down
+PRE_PROCESSED_COLUMNS = {"state", "district", "date"}
+
+
+def read_chart_source(
+    file_name: str, columns: set[str] | None = None, filters: list = None
+) -> pd.DataFrame:
+    """
+    Reads the chart source parquet, projected to the given `columns` (those missing from the parquet are ignored),
+    and only the rows matching the pyarrow `filters`. If `columns` is None or empty, every column is read.
+    """
+    path = local_path(file_name)
+    if columns:
+        schema_names = pq.read_schema(path).names
+        columns = [col for col in schema_names if col in columns] or None
+    return pd.read_parquet(path, columns=columns or None, filters=filters or None)
+
 
 class ChartBuilder(ABC):
     """
@@ -71,6 +92,52 @@ class ChartBuilder(ABC):
         """
         pass
 
+    def read_source(
+        self, file_name: str, variables: GeneralChartVariables, df: pd.DataFrame = None
+    ) -> pd.DataFrame:
+        """
+        Reads only the columns required by `variables` from the chart source parquet, and pushes `variables.filter` down where possible.
+        If the source has already been read into `df` (shared between the charts of a dashboard), returns a copy of its required columns instead,
+        so that pre-processing never modifies the shared frame.
+        """
+        if df is not None:
+            columns = variables.required_columns()
+            if columns is not None and columns <= set(df.columns):
+                df = df[[col for col in df.columns if col in columns]]
+            return df.copy()
+        path = local_path(file_name)
+        schema = pq.read_schema(path)
+        return read_chart_source(
+            path, variables.required_columns(), self.source_filters(variables, schema)
+        )
+
+    def source_filters(
+        self, variables: GeneralChartVariables, schema: pa.Schema
+    ) -> list:
+        """
+        Returns `variables.filter` as pyarrow row filters on the source columns.
+        Only filters on string columns whose values are left untouched by pre-processing are pushed down,
+        the full filter is still applied in `pre_process()`.
+        """
+        if variables.replace_vals:
+            return []
+
+        source_names = {v: k for k, v in variables.rename_cols.items()}
+        filters = []
+        for col, wanted in variables.filter.items():
+            source_col = source_names.get(col, col)
+            if (
+                source_col in PRE_PROCESSED_COLUMNS
+                or source_col not in schema.names
+                or variables.rename_cols.get(source_col, col) != col
+                or variables.null_vals in wanted
+            ):
+                continue
+            field_type = schema.field(source_col).type
+            if pa.types.is_string(field_type) or pa.types.is_large_string(field_type):
+                filters.append((source_col, "in", wanted))
+        return filters
+
     def format_date(self, df: pd.DataFrame, column="date", format="%Y-%m-%d"):
         """
         Formats the date column and returns the whole dataframe. The default column name is "date".
@@ -88,7 +155,7 @@ class ChartBuilder(ABC):
         """
         # pre-process column values (column names are considered reserve names)
         if "state" in df.columns:
-            df["state"].replace(STATE_ABBR, inplace=True)
+            df["state"] = df["state"].replace(STATE_ABBR)
 
         if (
             "district" in df.columns and "district" in variables.keys
@@ -125,16 +192,20 @@ class ChartBuilder(ABC):
         """
         return result
 
-    def build_chart(self, file_name: str, variables: GeneralChartVariables) -> str:
+    def build_chart(
+        self, file_name: str, variables: GeneralChartVariables, df: pd.DataFrame = None
+    ) -> str:
         """
         General chart building procedure based on common variable keys.
+        `df` is the already read source (shared between charts), if any.
         1. Validate variables and pre-process dataframe.
-        2. Get groupby sub-dataframes if there are defined `keys` in variables, else pass the full dataframe to `group_to_data()`.
+        2. Get groups if there are defined `keys` in variables (see `SortedGroups`), else pass the full dataframe to `group_to_data()`.
         3. Children class will have to define abstract method `group_to_data()`, which will process how each groups are formatted for the final result output.
+           Each group is passed through `slice_to_data()`, which children classes may override to slice whole-column lists instead.
         4. Result is passed through additional post-processing and will be transformed where necessary, as defined in children builer classes.
         """
         variables = self.VARIABLE_MODEL(**variables)
-        df = pd.read_parquet(file_name)
+        df = self.read_source(file_name, variables, df)
 
         df = self.pre_process(df, variables)
 
@@ -143,35 +214,29 @@ class ChartBuilder(ABC):
 
         else:
             result = {}
-            # value_cols = (
-            #     variables.value_columns  # if value columns are defined, take as it is
-            #     if variables.value_columns
-            #     else list(
-            #         set(df.columns) ^ set(variables.keys)
-            #     )  # else, take all possible columns excluding key columns
-            # )
-            df_groupby = df.groupby(variables.keys)
-            for name, group in df_groupby:
-                if isinstance(name, str):
-                    name = (name,)
-
-                name = [str(n) for n in name]
-
-                if len(variables.keys) > 1:
-                    current_level = result
-                    for i in range(len(name) - 1):
-                        current_level = current_level.setdefault(name[i], {})
-                    current_level[name[-1]] = self.group_to_data(
-                        variables, group
-                    )  ### children class must define how to handle each groups
-                else:
-                    assert len(name) == 1
-                    result[name[0]] = self.group_to_data(variables, group)
+            groups = SortedGroups(df, variables.keys)
+            for name, rows in groups:
+                data = self.slice_to_data(
+                    variables, groups, rows
+                )  ### children class must define how to handle each groups
+                current_level = result
+                for n in name[:-1]:
+                    current_level = current_level.setdefault(n, {})
+                current_level[name[-1]] = data
 
         result = self.additional_postprocessing(variables, df, result)
 
         return result
 
+    def slice_to_data(
+        self, variables: GeneralChartVariables, groups: SortedGroups, rows: slice
+    ) -> dict:
+        """
+        Processes the group at `rows` of the sorted groups into its dict result.
+        Defaults to `group_to_data()` on the group's sub-dataframe.
+        """
+        return self.group_to_data(variables, groups.frame(rows))
+
     @abstractmethod
     def group_to_data(
         self, variables: GeneralChartVariables, group: pd.DataFrame
@@ -199,6 +264,15 @@ class BarChartBuilder(ChartBuilder):
             res[col] = group[col].tolist()
         return res
 
+    def slice_to_data(
+        self, variables: BarChartVariables, groups: SortedGroups, rows: slice
+    ) -> dict:
+        res = {}
+        res[variables.x] = groups.column(variables.x)[rows]
+        for col in variables.y:
+            res[col] = groups.column(col)[rows]
+        return res
+
 
 class HeatMapBuilder(ChartBuilder):
     CHART_TYPE = "heatmap_chart"
@@ -235,6 +309,14 @@ class TimeseriesBuilder(ChartBuilder):
             res[col] = group[col].tolist()
         return res
 
+    def slice_to_data(
+        self, variables: TimeseriesChartVariables, groups: SortedGroups, rows: slice
+    ):
+        res = {}
+        for col in variables.value_columns:
+            res[col] = groups.column(col)[rows]
+        return res
+
 
 class LineBuilder(ChartBuilder):
     CHART_TYPE = "line_chart"
@@ -247,6 +329,15 @@ class LineBuilder(ChartBuilder):
             res[col] = group[col].tolist()
         return res
 
+    def slice_to_data(
+        self, variables: LineChartVariables, groups: SortedGroups, rows: slice
+    ):
+        res = {}
+        res[variables.x] = groups.column(variables.x)[rows]
+        for col in variables.y:
+            res[col] = groups.column(col)[rows]
+        return res
+
 
 class BarmeterBuilder(ChartBuilder):
     CHART_TYPE = "bar_meter"
@@ -345,6 +436,16 @@ class ChoroplethBuilder(ChartBuilder):
             res["y"][col] = group[col].tolist()
         return res
 
+    def slice_to_data(
+        self, variables: ChoroplethChartVariables, groups: SortedGroups, rows: slice
+    ):
+        res = {}
+        res["x"] = groups.column(variables.x)[rows]
+        res["y"] = {}
+        for col in variables.y:
+            res["y"][col] = groups.column(col)[rows]
+        return res
+
 
 class JitterBuilder(ChartBuilder):
     CHART_TYPE = "jitter_chart"
@@ -353,9 +454,11 @@ class JitterBuilder(ChartBuilder):
     def group_to_data(self, variables: GeneralChartVariables, group: pd.DataFrame):
         pass
 
-    def build_chart(self, file_name: str, variables: JitterChartVariables) -> str:
-        df: pd.DataFrame = pd.read_parquet(file_name)
+    def build_chart(
+        self, file_name: str, variables: JitterChartVariables, df: pd.DataFrame = None
+    ) -> str:
         variables = self.VARIABLE_MODEL(**variables)
+        df: pd.DataFrame = self.read_source(file_name, variables, df)
         df = df.fillna(np.nan).replace({np.nan: variables.null_vals})
         res = {}
 
@@ -403,6 +506,15 @@ class PyramidBuilder(ChartBuilder):
         res[variables.y2] = group[variables.y2].to_list()
         return res
 
+    def slice_to_data(
+        self, variables: PyramidChartVariables, groups: SortedGroups, rows: slice
+    ):
+        res = {}
+        res["x"] = groups.column(variables.label_column)[rows]
+        res[variables.y1] = groups.column(variables.y1)[rows]
+        res[variables.y2] = groups.column(variables.y2)[rows]
+        return res
+
 
 class MetricsTableBuilder(ChartBuilder):
     CHART_TYPE = "metrics_table"
@@ -422,9 +534,11 @@ class QueryValuesBuilder(ChartBuilder):
     def group_to_data(self):
         pass
 
-    def build_chart(self, file_name: str, variables: QueryValuesVariables) -> str:
-        df = pd.read_parquet(file_name)
+    def build_chart(
+        self, file_name: str, variables: QueryValuesVariables, df: pd.DataFrame = None
+    ) -> str:
         variables: QueryValuesVariables = self.VARIABLE_MODEL(**variables)
+        df = self.read_source(file_name, variables, df)
 
         if variables.sort_values:
             sort_cols, ascending = (
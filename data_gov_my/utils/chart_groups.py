@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+
+class SortedGroups:
+    """
+    Vectorised replacement of `df.groupby(keys)` iteration for the chart builders.
+    The dataframe is sorted once by its key columns, and groups are contiguous row slices of the sorted frame,
+    so builders can slice whole-column arrays instead of materialising a sub-dataframe per group.
+
+    Iterating yields `(name, rows)`, where `name` is the list of stringified key values and `rows` a slice,
+    in the same order (sorted keys, original row order within a group) as `df.groupby(keys)`.
+    Rows with a null key are dropped, as with `groupby(dropna=True)`.
+    """
+
+    def __init__(self, df: pd.DataFrame, keys: list):
+        codes, levels = [], []
+        for key in keys:
+            key_codes, uniques = pd.factorize(df[key], sort=True)
+            codes.append(key_codes)
+            levels.append(uniques)
+
+        codes = np.vstack(codes)
+        order = np.lexsort(codes[::-1])  # stable, first key is the primary sort key
+        order = order[(codes[:, order] >= 0).all(axis=0)]
+        sorted_codes = codes[:, order]
+
+        if len(order):
+            changed = (sorted_codes[:, 1:] != sorted_codes[:, :-1]).any(axis=0)
+            starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+        else:
+            starts = np.empty(0, dtype=np.intp)
+        ends = np.append(starts[1:], len(order))
+
+        self.df = df.take(order)
+        self.keys = keys
+        self._levels = levels
+        self._first_codes = sorted_codes[:, starts]
+        self._bounds = list(zip(starts.tolist(), ends.tolist()))
+        self._columns = {}
+
+    def __len__(self):
+        return len(self._bounds)
+
+    def __iter__(self):
+        for i, (start, end) in enumerate(self._bounds):
+            name = [
+                str(level[code])
+                for level, code in zip(self._levels, self._first_codes[:, i])
+            ]
+            yield name, slice(start, end)
+
+    def column(self, col: str) -> list:
+        """
+        Returns the sorted column as a list (converted once), to be sliced by group rows.
+        """
+        if col not in self._columns:
+            self._columns[col] = self.df[col].tolist()
+        return self._columns[col]
+
+    def frame(self, rows: slice) -> pd.DataFrame:
+        """
+        Returns a copy of the sub-dataframe of a group, which builders may modify (as with `groupby().get_group()`).
+        """
+        return self.df.iloc[rows].copy()
@@ -0,0 +1,106 @@
+import hashlib
+import json
+
+import numpy as np
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+from data_gov_my.utils.local_cache import local_cache
+
+
+class PayloadJSONEncoder(DjangoJSONEncoder):
+    """
+    `DjangoJSONEncoder`, also encoding numpy scalars (e.g. in object columns of a DataFrame) as python values.
+    """
+
+    def default(self, o):
+        if isinstance(o, np.generic):
+            return o.item()
+        return super().default(o)
+
+
+def serialize(data) -> bytes:
+    """
+    Encodes `data` as `JsonResponse` would (with numpy scalars as python values).
+    """
+    return json.dumps(data, cls=PayloadJSONEncoder).encode()
+
+
+def payload_key(dbd_name: str, chart_name: str, path: list = ()) -> str:
+    digest = hashlib.sha1(json.dumps(list(path)).encode()).hexdigest()
+    return f"PAYLOAD_{dbd_name}_{chart_name}_{digest}"
+
+
+def payload_index_key(dbd_name: str, chart_name: str) -> str:
+    return f"PAYLOAD_INDEX_{dbd_name}_{chart_name}"
+
+
+def store_chart_payloads(dbd_name: str, chart_name: str, chart_meta: dict, res: dict):
+    """
+    Pre-serializes a built chart for the DASHBOARD and CHART endpoints.
+    Dynamic charts are split at every `api_params` level, and one payload is stored per leaf (static charts are stored whole).
+    Each payload is the encoded `{"data_as_of": ..., "data": leaf}` object, as returned per chart by the DASHBOARD endpoint.
+    Payloads of leaves which no longer exist in the chart are deleted.
+    """
+    depth = len(chart_meta["api_params"]) if chart_meta["api_type"] == "dynamic" else 0
+    data_as_of = res.get("data_as_of")
+    payloads = {}
+
+    def split(data, path):
+        if len(path) == depth:
+            leaf = {"data_as_of": data_as_of, "data": data} if data_as_of else {"data": data}
+            payloads[payload_key(dbd_name, chart_name, path)] = serialize(leaf)
+        elif isinstance(data, dict):
+            for key, value in data.items():
+                split(value, path + [key])
+
+    split(res["data"], [])
+
+    index_key = payload_index_key(dbd_name, chart_name)
+    stale = set(local_cache.get(index_key) or []) - set(payloads)
+    if stale:
+        local_cache.delete_many(list(stale))
+    local_cache.set_many(payloads, timeout=None)
+    local_cache.set(index_key, list(payloads), timeout=None)
+
+
+def delete_chart_payloads(dbd_name: str, chart_name: str):
+    """
+    Deletes the stored payloads of a chart, e.g. once the chart or its dashboard is deleted.
+    """
+    index_key = payload_index_key(dbd_name, chart_name)
+    local_cache.delete_many([*(local_cache.get(index_key) or []), index_key])
+
+
+def get_chart_payload(dbd_name: str, chart_name: str, path: list = ()) -> bytes | None:
+    """
+    Returns the pre-serialized payload of the chart leaf at `path`, or None if it has not been stored.
+    """
+    return local_cache.get(payload_key(dbd_name, chart_name, path))
+
+
+def get_chart_payloads(dbd_name: str, paths: dict) -> dict:
+    """
+    Batched `get_chart_payload()`, for `paths` of {chart_name: path}. Returns the stored payloads by chart name.
+    """
+    keys = {payload_key(dbd_name, k, path): k for k, path in paths.items()}
+    return {keys[key]: payload for key, payload in local_cache.get_many(list(keys)).items()}
+
+
+def is_empty_payload(payload: bytes) -> bool:
+    return payload.endswith((b'"data": {}}', b'"data": []}'))
+
+
+def render_json(res: dict) -> bytes:
+    """
+    Encodes a response dict whose values may be pre-serialized payloads (bytes), without re-encoding them.
+    """
+    items = [
+        serialize(k) + b": " + (v if isinstance(v, bytes) else serialize(v))
+        for k, v in res.items()
+    ]
+    return b"{" + b", ".join(items) + b"}"
+
+
+def json_payload_response(body: bytes, status=200) -> HttpResponse:
+    return HttpResponse(body, content_type="application/json", status=status)
@@ -0,0 +1,142 @@
+import csv
+import io
+from typing import Callable
+
+import pandas as pd
+from django.db import connection, models, transaction
+
+from data_gov_my.utils.parquet_cache import iter_parquet
+from data_gov_my.utils.table_swap import rebuild_table
+
+"""
+Fast path for loading parquet files into model tables, used by the explorers.
+The parquet is streamed in batches with Postgres `COPY`, either into a shadow table swapped in place of the model's table
+(see `data_gov_my.utils.table_swap`), or into a temporary staging table moved into the model's table with a single
+`INSERT ... SELECT`. Either way, readers only ever see the table before or after the load.
+"""
+
+BATCH_SIZE = 100_000
+NULL = r"\N"
+
+INTEGER_FIELDS = {
+    "IntegerField",
+    "BigIntegerField",
+    "SmallIntegerField",
+    "PositiveIntegerField",
+    "PositiveBigIntegerField",
+    "PositiveSmallIntegerField",
+}
+
+
+def prepare_for_copy(model, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Casts `df` (columns named after model fields) to what the ORM would have saved:
+    missing fields with a default get their default, and integer fields read as floats (due to nulls) are made integers again.
+    """
+    for field in model._meta.concrete_fields:
+        if field.name in df.columns:
+            is_int = field.get_internal_type() in INTEGER_FIELDS
+            if is_int and df[field.name].dtype.kind == "f":
+                df[field.name] = df[field.name].astype("Int64")
+        elif not isinstance(field, models.AutoField) and field.has_default():
+            df[field.name] = field.get_default()
+    return df
+
+
+def frame_to_csv(df: pd.DataFrame) -> io.StringIO:
+    buffer = io.StringIO()
+    df.to_csv(
+        buffer, index=False, header=False, na_rep=NULL, quoting=csv.QUOTE_MINIMAL
+    )
+    buffer.seek(0)
+    return buffer
+
+
+def copy_batches(cursor, model, target: str, batches, staging=False) -> list[str]:
+    """
+    Copies every DataFrame of `batches` into the `target` table, creating it first as an empty copy
+    of the model's columns if `staging`. Returns the quoted columns loaded.
+    """
+    qn = connection.ops.quote_name
+    columns = None
+    for df in batches:
+        df = prepare_for_copy(model, df)
+        if columns is None:
+            columns = [qn(model._meta.get_field(c).column) for c in df.columns]
+            if staging:
+                cursor.execute(f"DROP TABLE IF EXISTS {target}")
+                cursor.execute(
+                    f"CREATE TEMPORARY TABLE {target} ON COMMIT DROP AS "
+                    f"SELECT {', '.join(columns)} FROM {qn(model._meta.db_table)} "
+                    f"WITH NO DATA"
+                )
+        cursor.copy_expert(
+            f"COPY {target} ({', '.join(columns)}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '{NULL}')",
+            frame_to_csv(df),
+        )
+    return columns or []
+
+
+def copy_parquet(
+    model,
+    source,
+    transform: Callable[[pd.DataFrame], pd.DataFrame] = None,
+    replace: bool = False,
+    unique_keys: list[str] = None,
+    batch_size: int = BATCH_SIZE,
+    progress: Callable[[int], None] = None,
+) -> int:
+    """
+    Loads the parquet at `source` into the table of `model`, and returns the number of rows written.
+    Each batch of rows is passed through `transform()`, which must return columns named after the model's fields.
+
+    With `replace`, the table is rebuilt from the parquet only, and swapped in place of the existing one.
+    With `unique_keys`, rows conflicting on those fields are updated (as `bulk_create(update_conflicts=True)` would).
+    Otherwise, rows are appended.
+
+    `progress()` is called with the number of rows copied so far, after every batch.
+    """
+    qn = connection.ops.quote_name
+    opts = model._meta
+    unique_keys = unique_keys or []
+    loaded = []  # columns of the parquet, without the defaults added for the load
+
+    def batches():
+        copied = 0
+        for df in iter_parquet(source, batch_size):
+            df = transform(df) if transform else df
+            if not loaded:
+                loaded.extend(df.columns)
+            yield df
+            copied += len(df)
+            if progress:
+                progress(copied)
+
+    if replace:
+        with rebuild_table(model) as shadow, connection.cursor() as cursor:
+            copy_batches(cursor, model, qn(shadow), batches())
+            cursor.execute(f"SELECT COUNT(*) FROM {qn(shadow)}")
+            return cursor.fetchone()[0]
+
+    table = qn(opts.db_table)
+    staging = f'pg_temp.{qn(f"{opts.db_table}_staging")}'  # never a model table
+    with transaction.atomic(), connection.cursor() as cursor:
+        columns = copy_batches(cursor, model, staging, batches(), staging=True)
+        columns = ", ".join(columns)
+        if not columns:
+            return 0  # empty parquet
+
+        insert = f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging}"
+        if unique_keys:
+            conflict = ", ".join(qn(opts.get_field(k).column) for k in unique_keys)
+            update_columns = [
+                qn(opts.get_field(c).column) for c in loaded if c not in unique_keys
+            ]
+            updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in update_columns)
+            if updates:
+                insert += f" ON CONFLICT ({conflict}) DO UPDATE SET {updates}"
+            else:
+                insert += f" ON CONFLICT ({conflict}) DO NOTHING"
+        cursor.execute(insert)
+        return cursor.rowcount
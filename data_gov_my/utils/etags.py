@@ -0,0 +1,69 @@
+import hashlib
+import uuid
+from functools import wraps
+
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+from data_gov_my.utils.local_cache import local_cache
+
+
+def build_version_key(scope: str) -> str:
+    return f"BUILD_VERSION_{scope}"
+
+
+def bump_build_version(scope: str) -> str:
+    """
+    Marks everything served under `scope` (e.g. a dashboard's meta and charts) as rebuilt.
+    Called by the builders whenever they write data that changes a response, e.g. a new `data_last_updated` or chart `data_as_of`.
+    """
+    version = uuid.uuid4().hex
+    local_cache.set(build_version_key(scope), version, timeout=None)
+    return version
+
+
+def build_version(scope: str) -> str:
+    """
+    Returns the current build version of `scope`. If it is unknown (e.g. the cache was flushed), a new version is started.
+    """
+    version = local_cache.get(build_version_key(scope))
+    if version is None:
+        version = bump_build_version(scope)
+    return version
+
+
+def make_etag(scope: str, request) -> str:
+    h = hashlib.sha1(f"{build_version(scope)}\n{request.get_full_path()}".encode())
+    return f'"{h.hexdigest()}"'
+
+
+def conditional_get(scope_func):
+    """
+    Decorates an API view's `get()` with a strong ETag, derived from the build version of the scope returned by
+    `scope_func(request, *args, **kwargs)` and the requested URL. Requests with a matching `If-None-Match` get a 304,
+    without calling the view. Responses must be revalidated by clients before being reused.
+    """
+
+    def decorator(get):
+        @wraps(get)
+        def wrapper(view, request, *args, **kwargs):
+            scope = scope_func(request, *args, **kwargs)
+            if scope is None:
+                return get(view, request, *args, **kwargs)
+
+            etag = make_etag(scope, request)
+            if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+                response = HttpResponseNotModified()
+            else:
+                response = get(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response["ETag"] = etag
+            patch_cache_control(response, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,35 @@
+import threading
+from typing import Callable
+
+from data_gov_my.utils.etags import build_version
+
+
+class IndexRegistry:
+    """
+    Per-process registry of in-memory indexes built from the database (e.g. by the explorers).
+    An index is rebuilt on its next use once the build version of its scope is bumped, e.g. when the explorer's tables are rebuilt.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = {}  # {key: (build version, index)}
+
+    def get(self, key: str, scope: str, build: Callable):
+        version = build_version(scope)
+        entry = self._indexes.get(key)
+        if entry and entry[0] == version:
+            return entry[1]
+        with self._lock:
+            entry = self._indexes.get(key)
+            if entry and entry[0] == version:
+                return entry[1]
+            index = build()
+            self._indexes[key] = (version, index)
+            return index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+index_registry = IndexRegistry()
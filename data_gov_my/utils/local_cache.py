@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+logger = logging.getLogger("django")
+
+INVALIDATION_CHANNEL = "LOCAL_CACHE_INVALIDATE"
+
+
+def value_size(value) -> int:
+    if isinstance(value, bytes):
+        return len(value)
+    return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+class TwoTierCache:
+    """
+    Bounded in-process LRU cache in front of the shared (redis) cache, for hot values such as dashboard meta and chart data.
+    Local entries expire after `timeout` seconds, and are evicted least recently used first once they exceed `max_bytes`.
+
+    Writes go through to the shared cache, and are published on a redis channel,
+    so that every other process drops its local copy of the written keys.
+    """
+
+    def __init__(self, max_bytes: int, timeout: int):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # {key: (value, size, expiry)}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._id = uuid.uuid4().hex
+        self._listener_pid = None
+
+    def get(self, key: str, default=None):
+        self._listen()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[2] > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        value = cache.get(key)
+        if value is None:
+            return default
+        self._store(key, value)
+        return value
+
+    def get_many(self, keys: list) -> dict:
+        """
+        Returns the found keys, reading the keys missing from the local tier with a single shared cache round trip.
+        """
+        self._listen()
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry and entry[2] > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[0]
+            self._hits += len(found)
+            self._misses += len(keys) - len(found)
+
+        missing = [key for key in keys if key not in found]
+        if missing:
+            fetched = cache.get_many(missing)
+            for key, value in fetched.items():
+                self._store(key, value)
+            found.update(fetched)
+        return found
+
+    def set(self, key: str, value, timeout=DEFAULT_TIMEOUT):
+        cache.set(key, value, timeout)
+        self._store(key, value)
+        self._publish([key])
+
+    def set_many(self, data: dict, timeout=DEFAULT_TIMEOUT):
+        cache.set_many(data, timeout)
+        for key, value in data.items():
+            self._store(key, value)
+        self._publish(list(data))
+
+    def delete_many(self, keys: list):
+        cache.delete_many(keys)
+        self.invalidate(keys)
+        self._publish(keys)
+
+    def invalidate(self, keys: list = None):
+        """
+        Drops the given keys (or every key, if None) from the local tier only.
+        """
+        with self._lock:
+            if keys is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry:
+                    self._bytes -= entry[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / requests if requests else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _store(self, key: str, value):
+        size = value_size(value)
+        if size > self.max_bytes:
+            return
+        expiry = time.monotonic() + self.timeout
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size, expiry)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def _sender(self) -> str:
+        # forked workers share the id created on import, so the pid is included
+        return f"{self._id}:{os.getpid()}"
+
+    def _redis(self):
+        try:
+            from django_redis import get_redis_connection
+
+            return get_redis_connection("default")
+        except (ImportError, NotImplementedError):
+            return None  # not a redis cache, local entries only expire
+
+    def _publish(self, keys: list):
+        conn = self._redis()
+        if conn is None:
+            return
+        try:
+            conn.publish(
+                INVALIDATION_CHANNEL,
+                json.dumps({"sender": self._sender(), "keys": keys}),
+            )
+        except Exception as e:
+            logger.warning(f"Unable to publish local cache invalidation: {e}")
+
+    def _listen(self):
+        """
+        Starts the invalidation listener thread of the current process (once per process, as threads do not survive forks).
+        """
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            if self._listener_pid is not None:
+                # forked from a process whose entries are no longer invalidated
+                self._entries.clear()
+                self._bytes = 0
+            self._listener_pid = pid
+        conn = self._redis()
+        if conn is not None:
+            threading.Thread(
+                target=self._listen_forever, args=(conn,), daemon=True
+            ).start()
+
+    def _listen_forever(self, conn):
+        while True:
+            try:
+                pubsub = conn.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                for message in pubsub.listen():
+                    payload = json.loads(message["data"])
+                    if payload["sender"] != self._sender():
+                        self.invalidate(payload["keys"])
+            except Exception as e:
+                # invalidations may have been missed while disconnected
+                logger.warning(f"Local cache invalidation listener failed: {e}")
+                self.invalidate()
+                time.sleep(5)
+
+
+local_cache = TwoTierCache(
+    max_bytes=settings.LOCAL_CACHE_MAX_BYTES, timeout=settings.LOCAL_CACHE_TIMEOUT
+)
@@ -5,30 +5,38 @@ import logging
 import os, time
 import traceback
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from os.path import isfile
 from pathlib import Path
 from typing import List
 from urllib.request import urlopen
 
-import numpy as np
 import pandas as pd
-from django.core.cache import cache
+from django.apps import apps
 from django.core.exceptions import FieldDoesNotExist
+from django.db import connection, transaction
 from post_office import mail
 from pydantic import BaseModel
-from slugify import slugify
 
 from data_catalogue.metajson_structure import DataCatalogueValidateModel
 from data_catalogue.models import (
     DataCatalogue,
     DataCatalogueMeta,
+    DataCatalogueParquet,
     Dataviz,
     Field,
     RelatedDataset,
     SiteCategory,
 )
 from data_catalogue.utils import translation
+from data_catalogue.utils.ingest import (
+    copy_catalogue_rows,
+    iter_catalogue_batches,
+    prepare_catalogue_frame,
+)
+from data_catalogue.utils.slices import CatalogueSlices, build_catalogue_slices
+from data_catalogue.utils.storage import save_catalogue_parquet
 from data_gov_my.explorers import class_list as exp_class
 from data_gov_my.models import (
     DashboardJson,
@@ -45,7 +53,12 @@ from data_gov_my.models import (
     Subscription, PublicationType, PublicationSubtype
 )
 from data_gov_my.utils import triggers
-from data_gov_my.utils.chart_builders import ChartBuilder
+from data_gov_my.utils.build_manifest import BuildTracker
+from data_gov_my.utils.chart_builders import ChartBuilder, read_chart_source
+from data_gov_my.utils.chart_payloads import (
+    delete_chart_payloads,
+    store_chart_payloads,
+)
 from data_gov_my.utils.common import LANGUAGE_CHOICES
 from data_gov_my.utils.cron_utils import (
     create_directory,
@@ -57,6 +70,8 @@ from data_gov_my.utils.cron_utils import (
     upload_s3,
     write_as_binary,
 )
+from data_gov_my.utils.etags import bump_build_version
+from data_gov_my.utils.local_cache import local_cache
 from data_gov_my.utils.metajson_structures import (
     DashboardValidateModel,
     ExplorerValidateModel,
@@ -66,6 +81,7 @@ from data_gov_my.utils.metajson_structures import (
     PublicationValidateModel,
     i18nValidateModel, PublicationTypeValidateModel,
 )
+from data_gov_my.utils.parquet_cache import parquet_cache, read_parquet
 from data_gov_my.utils.publication_helpers import craft_title, craft_template_en
 from data_gov_my.utils.subscription_email_helper import SubscriptionEmail
 
@@ -78,6 +94,9 @@ class GeneralMetaBuilder(ABC):
     subclasses_by_category = {}
     subclasses_by_github_dir = {}
 
+    # skip meta files whose content (and data sources) are unchanged since the last build
+    SKIP_UNCHANGED_FILES = True
+
     def __init_subclass__(cls, **kwargs) -> None:
         """
         Keep a dictionary of concrete children builders based on the CATEGORY and GITHUB_DIR properties
@@ -241,6 +260,12 @@ class GeneralMetaBuilder(ABC):
     def additional_handling(self, rebuild: bool, meta_files, created_objects):
         return created_objects
 
+    def get_meta_sources(self, metadata) -> list[str]:
+        """
+        Returns the data sources (e.g. parquet links) that the built objects depend on, used to detect unchanged meta files.
+        """
+        return []
+
     @abstractmethod
     def update_or_create_meta(self, filename: str, metadata: dict):
         """
@@ -322,7 +347,9 @@ class GeneralMetaBuilder(ABC):
 
     def delete_operation(self, meta_files=[]):
         deleted = []
+        manifest = BuildTracker(self.CATEGORY)
         for file in meta_files:
+            manifest.forget(os.path.relpath(file["filename"], self.GITHUB_DIR))
             # read the deleted content
             deleted_json = urlopen(file["raw_url"])
             deleted_content = json.loads(deleted_json.read())
@@ -337,7 +364,15 @@ class GeneralMetaBuilder(ABC):
             + triggers.format_files_with_status_emoji(deleted, "🗑️")
         )
 
-    def build_operation(self, manual=True, rebuild=True, meta_files=[], refresh=True):
+    def build_operation(
+        self,
+        manual=True,
+        rebuild=True,
+        meta_files=[],
+        refresh=True,
+        workers=1,
+        force=False,
+    ):
         """
         General build operation for all data builder classes.
         Inherited classes should override `update_or_create_meta()` to control how each meta file is used to update or create model objects.
@@ -347,76 +382,169 @@ class GeneralMetaBuilder(ABC):
         3. Calls `update_or_create_meta()` to save metadata into database as model instances.
         4. Calls `additional_handling()`, e.g. each dashboard metadata has multiple charts, these charts are individually updated through `additional_handling()`.
         5. Revalidates routes if the model instances have `route` field.
-        """
-        if refresh:
-            self.refresh_meta_repo()
 
-        # get meta files (prioritise input files)
-        meta_files = (
-            [f + ".json" for f in meta_files] if meta_files else self.get_meta_files()
-        )
+        If `workers` > 1, meta files are built concurrently by a pool of `workers` threads.
+        Meta files that are unchanged since their last build (including their data sources) are skipped, unless `force` is True.
+        A rebuild only clears the whole table with `force`. Without it, only objects that no longer belong to any meta file are deleted.
+        """
+        self.workers = max(int(workers), 1)
+        self.manifest = BuildTracker(self.CATEGORY, force=force)
+        self.skipped = []
+        parquet_cache.start_build()
+        try:
+            if refresh:
+                self.refresh_meta_repo()
+
+            # get meta files (prioritise input files)
+            meta_files = (
+                [f + ".json" for f in meta_files]
+                if meta_files
+                else self.get_meta_files()
+            )
 
-        # send telegram message
-        operation_type = "REBUILD" if rebuild else "UPDATE"
-        trigger_type = "MANUAL" if manual else "SELECTIVE"
-        operation_files = triggers.format_files_with_status_emoji(meta_files, "🔄")
-        triggers.send_telegram(
-            triggers.format_header(
-                f"PERFORMING {self.CATEGORY} {operation_type} ({trigger_type})"
+            # send telegram message
+            operation_type = "REBUILD" if rebuild else "UPDATE"
+            trigger_type = "MANUAL" if manual else "SELECTIVE"
+            operation_files = triggers.format_files_with_status_emoji(
+                meta_files, "🔄"
+            )
+            triggers.send_telegram(
+                triggers.format_header(
+                    f"PERFORMING {self.CATEGORY} {operation_type} ({trigger_type})"
+                )
+                + "\n"
+                + operation_files
             )
-            + "\n"
-            + operation_files
-        )
 
-        if rebuild:
-            self.MODEL.objects.all().delete()
+            if rebuild and force:
+                self.MODEL.objects.all().delete()
 
-        failed = []
-        meta_objects = []
-        for meta in meta_files:
-            try:
-                f_meta = os.path.join(self.get_github_directory(), meta)
-                f = open(f_meta)
-                data = json.load(f)
-                validated_metadata = self.VALIDATOR.model_validate(data)
-                created_object = self.update_or_create_meta(meta, validated_metadata)
-                if isinstance(created_object, list):
-                    for object in created_object:
-                        object.save()
-                    meta_objects.extend(created_object)
+            failed = []
+            meta_objects = []
+            timings = {}
+            for meta, created_objects, error, elapsed in self.run_concurrently(
+                self.build_meta_file, meta_files
+            ):
+                timings[meta] = elapsed
+                if error:
+                    failed.append({"FILE": meta, "ERROR": error})
                 else:
-                    created_object.save()
-                    meta_objects.append(created_object)
-                f.close()
-            except Exception as e:
-                logger.error(traceback.format_exc())
-                failed.append({"FILE": meta, "ERROR": e})
+                    meta_objects.extend(created_objects)
 
-        if len(meta_objects) >= MAX_SUCCESSFUL_BUILD_LOGS_OBJECT_LENGTH:
-            successful_log = (
-                f"✅︎ <b>{len(meta_objects)}</b> objects have been successfully built!\n"
-            )
-        else:
-            successful_log = triggers.format_files_with_status_emoji(meta_objects, "✅︎")
-        telegram_msg = [
-            triggers.format_header(f"Meta Built Status ({self.MODEL.__name__})"),
-            successful_log + "\n",
-            triggers.format_files_with_status_emoji(
-                [obj["FILE"] for obj in failed], "❌"
-            ),
-        ]
+            if rebuild and not force:
+                self.delete_stale_objects(meta_files)
+
+            if len(meta_objects) >= MAX_SUCCESSFUL_BUILD_LOGS_OBJECT_LENGTH:
+                successful_log = (
+                    f"✅︎ <b>{len(meta_objects)}</b> objects have been successfully built!\n"
+                )
+            else:
+                successful_log = triggers.format_files_with_status_emoji(
+                    meta_objects, "✅︎"
+                )
+            telegram_msg = [
+                triggers.format_header(f"Meta Built Status ({self.MODEL.__name__})"),
+                successful_log + "\n",
+                triggers.format_files_with_status_emoji(
+                    [obj["FILE"] for obj in failed], "❌"
+                ),
+            ]
+
+            if failed:
+                telegram_msg.append(
+                    "\n"
+                    + triggers.format_multi_line(failed, "Failed Meta - Error logs")
+                )
+
+            if self.skipped:
+                telegram_msg.append(
+                    f"\n⏭️ <b>{len(self.skipped)}</b> unchanged files have been skipped."
+                )
 
-        if failed:
             telegram_msg.append(
-                "\n" + triggers.format_multi_line(failed, "Failed Meta - Error logs")
+                "\n"
+                + triggers.format_timings(
+                    timings, f"Build Wall Time ({self.workers} worker(s))"
+                )
+            )
+
+            triggers.send_telegram("\n".join(telegram_msg))
+
+            meta_objects = self.additional_handling(rebuild, meta_files, meta_objects)
+
+            if self.model_has_field("route"):
+                self.revalidate_route(meta_objects)
+        finally:
+            cache_stats = parquet_cache.end_build()
+        if any(cache_stats.values()):
+            triggers.send_telegram(
+                triggers.format_cache_stats(cache_stats, "Parquet Cache")
             )
 
-        triggers.send_telegram("\n".join(telegram_msg))
+    def build_meta_file(self, meta: str) -> list:
+        """
+        Validates a single meta file and saves the model object(s) returned by `update_or_create_meta()`.
+        """
+        f_meta = os.path.join(self.get_github_directory(), meta)
+        with open(f_meta, "rb") as f:
+            content = f.read()
+        data = json.loads(content)
+        validated_metadata = self.VALIDATOR.model_validate(data)
+
+        digest = self.manifest.digest(
+            content, self.get_meta_sources(validated_metadata)
+        )
+        if self.SKIP_UNCHANGED_FILES and self.manifest.is_unchanged(meta, digest):
+            self.skipped.append(meta)
+            return []
+
+        created_object = self.update_or_create_meta(meta, validated_metadata)
+        created_objects = (
+            created_object if isinstance(created_object, list) else [created_object]
+        )
+        for object in created_objects:
+            object.save()
 
-        meta_objects = self.additional_handling(rebuild, meta_files, meta_objects)
+        self.manifest.record(meta, digest, created_objects)
+        return created_objects
 
-        if self.model_has_field("route"):
-            self.revalidate_route(meta_objects)
+    def delete_stale_objects(self, meta_files: list[str]):
+        """
+        Deletes model objects that were not built from any of the meta files (e.g. leftovers of removed files).
+        Nothing is deleted if a meta file built too many objects to track them (i.e. it rebuilds the whole table).
+        """
+        pks = self.manifest.objects_built(meta_files, self.MODEL)
+        if pks is not None:
+            self.MODEL.objects.exclude(pk__in=pks).delete()
+
+    def run_concurrently(self, func, items: list):
+        """
+        Calls `func` on every item, using a pool of `self.workers` threads if more than 1 worker is set.
+        Failures are isolated per item. Returns a list of (item, result, error, elapsed seconds) in input order.
+        """
+        workers = getattr(self, "workers", 1)
+
+        def run(item):
+            start = time.perf_counter()
+            result, error = None, None
+            try:
+                result = func(item)
+            except Exception as e:
+                logger.error(traceback.format_exc())
+                error = e
+            finally:
+                # worker threads open their own db connections, which are not closed by django
+                if workers > 1:
+                    connection.close()
+            elapsed = time.perf_counter() - start
+            logger.info(f"{self.CATEGORY} built {item} in {elapsed:.2f}s")
+            return item, result, error, elapsed
+
+        if workers <= 1 or len(items) <= 1:
+            return [run(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run, items))
 
     def model_has_field(self, field: str) -> bool:
         """
@@ -435,14 +563,19 @@ class DashboardBuilder(GeneralMetaBuilder):
     GITHUB_DIR = "dashboards"
     VALIDATOR = DashboardValidateModel
 
+    # unchanged charts are skipped individually in `additional_handling()`
+    SKIP_UNCHANGED_FILES = False
+
     def delete_file(self, filename: str, data: dict):
+        BuildTracker(self.CATEGORY).forget_prefix(f'{data.get("dashboard_name")}/')
         meta_count, meta_deleted = MetaJson.objects.filter(
             dashboard_name=data.get("dashboard_name")
         ).delete()
-        dashboard_count, dashboard_deleted = DashboardJson.objects.filter(
-            dashboard_name=data.get("dashboard_name")
-        ).delete()
+        dashboard_count, dashboard_deleted = self.delete_charts(
+            DashboardJson.objects.filter(dashboard_name=data.get("dashboard_name"))
+        )
         meta_deleted.update(dashboard_deleted)
+        bump_build_version(f'DASHBOARD_{data.get("dashboard_name")}')
         return meta_count + dashboard_count, meta_deleted
 
     def update_or_create_meta(self, filename: str, metadata: DashboardValidateModel):
@@ -457,7 +590,8 @@ class DashboardBuilder(GeneralMetaBuilder):
             defaults=updated_values,
         )
 
-        cache.set("META_" + metadata.dashboard_name, dashboard_meta)
+        local_cache.set("META_" + metadata.dashboard_name, dashboard_meta)
+        bump_build_version(f"DASHBOARD_{metadata.dashboard_name}")
         return obj
 
     def additional_handling(
@@ -466,30 +600,147 @@ class DashboardBuilder(GeneralMetaBuilder):
         """
         Update or create new DashboardJson instances (unique chart data) based on each created MetaJson instance.
         """
-        if rebuild:
-            DashboardJson.objects.all().delete()
+        if rebuild and self.manifest.force:
+            self.delete_charts(DashboardJson.objects.all())
+        elif rebuild:
+            self.delete_stale_charts(created_objects)
 
         successful_meta = set()
 
-        for meta in created_objects:
-            failed = []
-            created_charts = []
-            dbd_meta: dict = meta.dashboard_meta
+        for meta, result, error, elapsed in self.run_concurrently(
+            self.build_dashboard_charts, list(created_objects)
+        ):
             dbd_name = meta.dashboard_name
-            chart_list = dbd_meta["charts"]
+            if error:
+                created_charts, skipped_charts = [], []
+                failed = [
+                    {"DASHBOARD": dbd_name, "CHART_NAME": "-", "ERROR": str(error)}
+                ]
+            else:
+                created_charts, skipped_charts, failed = result
+            if created_charts:
+                successful_meta.add(meta)
+
+            # For a single dashboard, send status on all its charts
+            telegram_msg = [
+                triggers.format_header(
+                    f"<code>{dbd_name.upper()}</code> Charts Built Status (DashboardJson)"
+                ),
+                triggers.format_files_with_status_emoji(created_charts, "✅︎") + "\n",
+                triggers.format_files_with_status_emoji(
+                    [f'{obj["DASHBOARD"]} ({obj["CHART_NAME"]})' for obj in failed],
+                    "❌",
+                ),
+            ]
+
+            if failed:
+                telegram_msg.append(
+                    "\n"
+                    + triggers.format_multi_line(failed, "Failed Meta - Error logs")
+                )
+
+            if skipped_charts:
+                telegram_msg.append(
+                    f"\n⏭️ <b>{len(skipped_charts)}</b> unchanged charts have been skipped."
+                )
+
+            telegram_msg.append(f"\n⏱️ Built in {elapsed:.2f}s")
+            triggers.send_telegram("\n".join(telegram_msg))
+
+        return successful_meta
+
+    def delete_stale_charts(self, created_objects: List[MetaJson]):
+        """
+        Deletes DashboardJson instances of dashboards or charts which no longer exist in the meta files.
+        """
+        self.delete_charts(
+            DashboardJson.objects.exclude(
+                dashboard_name__in=MetaJson.objects.values("dashboard_name")
+            )
+        )
+        for meta in created_objects:
+            self.delete_charts(
+                DashboardJson.objects.filter(
+                    dashboard_name=meta.dashboard_name
+                ).exclude(chart_name__in=list(meta.dashboard_meta["charts"]))
+            )
+
+    def delete_charts(self, charts) -> tuple:
+        """
+        Deletes the DashboardJson instances of the `charts` queryset, and their pre-serialized payloads
+        (which are stored without expiry).
+        """
+        for dbd_name, chart_name in charts.values_list("dashboard_name", "chart_name"):
+            delete_chart_payloads(dbd_name, chart_name)
+        return charts.delete()
+
+    def required_columns(self, chart_list: dict, chart_names: list) -> set | None:
+        """
+        Returns the union of source columns required by the given charts, or None if any of them may need every column.
+        """
+        columns = set()
+        for k in chart_names:
+            try:
+                builder = ChartBuilder.create(chart_list[k]["chart_type"])
+                required = builder.VARIABLE_MODEL(
+                    **chart_list[k]["variables"]
+                ).required_columns()
+            except Exception:
+                required = None  # invalid charts are reported when they are built
+            if required is None:
+                return None
+            columns |= required
+        return columns
+
+    def build_dashboard_charts(self, meta: MetaJson):
+        """
+        Builds every chart of a single dashboard, returns the DashboardJson objects created, the unchanged charts skipped and the failed charts.
+        Charts are grouped by `chart_source`, so that each source parquet is only read once (projected to the columns its charts need) and shared between its charts.
+        """
+        failed = []
+        created_charts = []
+        skipped_charts = []
+        dbd_meta: dict = meta.dashboard_meta
+        dbd_name = meta.dashboard_name
+        chart_list = dbd_meta["charts"]
+
+        def chart_failed(chart_name, e):
+            logger.error(traceback.format_exc())
+            failed.append(
+                {"DASHBOARD": dbd_name, "CHART_NAME": chart_name, "ERROR": str(e)}
+            )
+
+        charts_by_source = {}
+        digests = {}
+        for k in chart_list.keys():
+            try:
+                chart_source = chart_list[k]["chart_source"]
+                digests[k] = self.manifest.digest(chart_list[k], [chart_source])
+                if self.manifest.is_unchanged(f"{dbd_name}/{k}", digests[k]):
+                    skipped_charts.append(k)
+                    continue
+                charts_by_source.setdefault(chart_source, []).append(k)
+            except Exception as e:
+                chart_failed(k, e)
 
-            for k in chart_list.keys():
-                chart_name = k
+        for chart_source, chart_names in charts_by_source.items():
+            try:
+                df = read_chart_source(
+                    chart_source, self.required_columns(chart_list, chart_names)
+                )
+            except Exception as e:
+                for chart_name in chart_names:
+                    chart_failed(chart_name, e)
+                continue
+
+            for k in chart_names:
                 chart_type = chart_list[k]["chart_type"]
-                c_data = {}
-                c_data["variables"] = chart_list[k]["variables"]
-                c_data["input"] = chart_list[k]["chart_source"]
                 api_type = chart_list[k]["api_type"]
                 try:
                     res = {}
                     builder = ChartBuilder.create(chart_type)
                     chart_data = builder.build_chart(
-                        c_data["input"], c_data["variables"]
+                        chart_source, chart_list[k]["variables"], df=df
                     )
                     res["data"] = chart_data
                     if len(res["data"]) > 0:  # If the dict isnt empty
@@ -508,38 +759,16 @@ class DashboardBuilder(GeneralMetaBuilder):
                         )
                         obj.save()
                         created_charts.append(obj)
-                        successful_meta.add(meta)
-                        cache.set(dbd_name + "_" + k, res)
+                        local_cache.set(dbd_name + "_" + k, res)
+                        store_chart_payloads(dbd_name, k, chart_list[k], res)
+                        self.manifest.record(f"{dbd_name}/{k}", digests[k], [obj])
 
                 except Exception as e:
-                    failed_obj = {}
-                    failed_obj["DASHBOARD"] = dbd_name
-                    failed_obj["CHART_NAME"] = chart_name
-                    failed_obj["ERROR"] = str(e)
-                    logger.error(traceback.format_exc())
-                    failed.append(failed_obj)
-
-            # For a single dashboard, send status on all its charts
-            telegram_msg = [
-                triggers.format_header(
-                    f"<code>{dbd_name.upper()}</code> Charts Built Status (DashboardJson)"
-                ),
-                triggers.format_files_with_status_emoji(created_charts, "✅︎") + "\n",
-                triggers.format_files_with_status_emoji(
-                    [f'{obj["DASHBOARD"]} ({obj["CHART_NAME"]})' for obj in failed],
-                    "❌",
-                ),
-            ]
-
-            if failed:
-                telegram_msg.append(
-                    "\n"
-                    + triggers.format_multi_line(failed, "Failed Meta - Error logs")
-                )
+                    chart_failed(k, e)
 
-            triggers.send_telegram("\n".join(telegram_msg))
-
-        return successful_meta
+        if created_charts:
+            bump_build_version(f"DASHBOARD_{dbd_name}")
+        return created_charts, skipped_charts, failed
 
 
 class i18nBuilder(GeneralMetaBuilder):
@@ -617,8 +846,12 @@ class DataCatalogueBuilder(GeneralMetaBuilder):
 
     def delete_file(self, filename: str, data: dict):
         filename = Path(filename).stem
+        bump_build_version(f"CATALOGUE_{filename}")
         return DataCatalogueMeta.objects.filter(id=filename).delete()
 
+    def get_meta_sources(self, metadata: DataCatalogueValidateModel) -> list[str]:
+        return [str(metadata.link_preview or metadata.link_parquet)]
+
     def update_or_create_meta(
             self, filename: str, metadata: DataCatalogueValidateModel
     ):
@@ -665,6 +898,7 @@ class DataCatalogueBuilder(GeneralMetaBuilder):
                 data_source=metadata.data_source,
                 translations_en=metadata.translations_en,
                 translations_ms=metadata.translations_ms,
+                storage=metadata.storage,
             ),
         )
 
@@ -717,14 +951,8 @@ class DataCatalogueBuilder(GeneralMetaBuilder):
         dc_meta.site_category.set(site_categories)
         dc_meta.fields.set(fields)
 
-        # populate the table data
+        # populate the table data, streamed in batches of rows
         parquet_link = metadata.link_preview or metadata.link_parquet
-        df = pd.read_parquet(str(parquet_link))
-        if "date" in df.columns:
-            df["date"] = df["date"].astype(str)
-
-        df = df.replace({np.nan: None})
-        data = df.to_dict(orient="records")
 
         # take all slug fields
         dataviz = metadata.dataviz
@@ -732,40 +960,66 @@ class DataCatalogueBuilder(GeneralMetaBuilder):
         for dv in dataviz:
             filter_columns = dv.config.get("filter_columns", [])
             slug_fields.update(filter_columns)
+        slug_fields = sorted(slug_fields)
 
-        slug_df = df[list(slug_fields)].copy()
-        for col in slug_df.columns:
-            slug_df[col] = slug_df[col].apply(slugify)
-
-        if slug_fields:
-            slug_data = slug_df.to_dict("records")
-            catalogue_data = [
-                DataCatalogue(
-                    index=i, catalogue_meta=dc_meta, data=row, slug=slug_data[i]
-                )
-                for i, row in enumerate(data)
-            ]
-        else:
-            catalogue_data = [
-                DataCatalogue(index=i, catalogue_meta=dc_meta, data=row)
-                for i, row in enumerate(data)
-            ]
+        filter_column_sets = {
+            tuple(dv.config.get("filter_columns", [])) for dv in dataviz
+        }
+        slices = CatalogueSlices([list(cols) for cols in filter_column_sets])
+        dropdowns = {dv.dataviz_id: {} for dv in dataviz}  # ordered distinct slugs
 
-        # side quest: handle the dataviz "dropdown" building
-        for dv in dataviz:
-            filter_columns = dv.config.get("filter_columns", [])
-            dropdown: pd.DataFrame = (
-                slug_df[filter_columns].drop_duplicates().to_dict("records")
-            )
-            Dataviz.objects.filter(
-                catalogue_meta=dc_meta, dataviz_id=dv.dataviz_id
-            ).update(dropdown=dropdown)
+        try:
+            with transaction.atomic():
+                _, deleted_dc_data = DataCatalogue.objects.filter(
+                    catalogue_meta=dc_meta
+                ).delete()
+
+                start = 0
+                for data, slug_df in iter_catalogue_batches(parquet_link, slug_fields):
+                    # side quest: handle the dataviz "dropdown" building
+                    for dv in dataviz:
+                        filter_columns = dv.config.get("filter_columns", [])
+                        if not filter_columns:
+                            continue
+                        dropdowns[dv.dataviz_id].update(
+                            dict.fromkeys(
+                                slug_df[filter_columns]
+                                .drop_duplicates()
+                                .itertuples(index=False, name=None)
+                            )
+                        )
+                    slices.add(data, slug_df)
+                    if metadata.storage == "rows":
+                        copy_catalogue_rows(dc_meta, start, data, slug_df)
+                    start += len(data)
+
+                # written with the rows, so that readers never see slices of other rows
+                for dv in dataviz:
+                    filter_columns = dv.config.get("filter_columns", [])
+                    Dataviz.objects.filter(
+                        catalogue_meta=dc_meta, dataviz_id=dv.dataviz_id
+                    ).update(
+                        dropdown=[
+                            dict(zip(filter_columns, slugs))
+                            for slugs in dropdowns[dv.dataviz_id]
+                        ]
+                    )
 
-        _, deleted_dc_data = DataCatalogue.objects.filter(
-            catalogue_meta=dc_meta
-        ).delete()
-        DataCatalogue.objects.bulk_create(catalogue_data)
+                build_catalogue_slices(dc_meta, slices.payloads())
+        finally:
+            slices.close()
+
+        if metadata.storage == "parquet":
+            # the parquet engine stores the whole catalogue as one blob
+            raw_df = read_parquet(parquet_link)
+            if "date" in raw_df.columns:
+                raw_df["date"] = raw_df["date"].astype(str)
+            _, slug_df = prepare_catalogue_frame(raw_df.copy(), slug_fields, {})
+            save_catalogue_parquet(dc_meta, raw_df, slug_df)
+        else:
+            DataCatalogueParquet.objects.filter(catalogue_meta=dc_meta).delete()
 
+        bump_build_version(f"CATALOGUE_{dc_meta.id}")
         return dc_meta
 
 
@@ -775,7 +1029,19 @@ class ExplorerBuilder(GeneralMetaBuilder):
     GITHUB_DIR = "explorers"
     VALIDATOR = ExplorerValidateModel
 
+    # unchanged tables are skipped individually in `additional_handling()`
+    SKIP_UNCHANGED_FILES = False
+
+    def delete_stale_objects(self, meta_files: list[str]):
+        """
+        ExplorersUpdate objects are created per table in `additional_handling()`, keyed by the explorer name.
+        """
+        explorers = self.manifest.objects_built(meta_files, ExplorersMetaJson)
+        if explorers is not None:
+            ExplorersUpdate.objects.exclude(explorer__in=explorers).delete()
+
     def delete_file(self, filename: str, data: dict):
+        BuildTracker(self.CATEGORY).forget_prefix(f'{data.get("explorer_name")}/')
         meta_count, meta_deleted = ExplorersMetaJson.objects.filter(
             dashboard_name=data.get("explorer_name")
         ).delete()
@@ -783,6 +1049,7 @@ class ExplorerBuilder(GeneralMetaBuilder):
             explorer=data.get("explorer_name")
         ).delete()
         meta_deleted.update(explorer_deleted)
+        bump_build_version(f'EXPLORER_{data.get("explorer_name")}')
         return meta_count + explorer_count, meta_deleted
 
     def update_or_create_meta(self, filename: str, metadata: ExplorerValidateModel):
@@ -796,6 +1063,7 @@ class ExplorerBuilder(GeneralMetaBuilder):
             defaults=updated_values,
         )
 
+        bump_build_version(f"EXPLORER_{metadata.explorer_name}")
         return obj
 
     def additional_handling(
@@ -804,7 +1072,7 @@ class ExplorerBuilder(GeneralMetaBuilder):
         """
         Update or create new ExplorersUpdate instances (Entire Table) based on each created MetaJson instance.
         """
-        if rebuild:
+        if rebuild and self.manifest.force:
             ExplorersUpdate.objects.all().delete()
 
         successful_meta = set()
@@ -812,6 +1080,7 @@ class ExplorerBuilder(GeneralMetaBuilder):
         for meta in created_objects:
             failed = []
             tables_updated = []
+            tables_skipped = []
             exp_meta: dict = meta.dashboard_meta
             exp_name = meta.dashboard_name
             table_list = exp_meta["tables"]
@@ -822,20 +1091,45 @@ class ExplorerBuilder(GeneralMetaBuilder):
                 try:
                     obj = exp_class.EXPLORERS_CLASS_LIST[exp_meta["explorer_name"]]()
                     source = table_list[k].get("source")
+                    previous_update = (
+                        ExplorersUpdate.objects.filter(explorer=exp_name, file_name=k)
+                        .values_list("last_update", flat=True)
+                        .first()
+                    )
                     upd, create = ExplorersUpdate.objects.update_or_create(
                         explorer=exp_name,
                         file_name=k,
                         defaults={"last_update": last_update},
                     )
+                    if previous_update != str(last_update):
+                        # served as `data_as_of`, even if the table is not rebuilt
+                        bump_build_version(f"EXPLORER_{exp_name}")
 
                     if table_operation == "SLEEP":
                         continue
-                    elif table_operation == "REBUILD":
+
+                    table_source = source or obj.data_populate.get(table_name)
+                    digest = (
+                        self.manifest.digest(table_list[k], [table_source])
+                        if table_source
+                        else None
+                    )
+                    if self.manifest.is_unchanged(f"{exp_name}/{table_name}", digest):
+                        tables_skipped.append(table_name)
+                        continue
+
+                    if table_operation == "REBUILD":
                         obj.populate_db(table=table_name, source=source, rebuild=True)
                     elif table_operation == "UPDATE":
                         unique_keys = exp_meta["tables"][k]["unique_keys"]
                         obj.update(table_name=table_name, unique_keys=unique_keys)
 
+                    self.manifest.record(
+                        f"{exp_name}/{table_name}",
+                        digest,
+                        tables=[apps.get_model("data_gov_my", table_name)],
+                    )
+                    bump_build_version(f"EXPLORER_{exp_name}")
                     successful_meta.add(meta)
                     tables_updated.append(table_name)
                 except Exception as e:
@@ -864,6 +1158,12 @@ class ExplorerBuilder(GeneralMetaBuilder):
                     + triggers.format_multi_line(failed, "Failed Meta - Error logs")
                 )
 
+            if tables_skipped:
+                telegram_msg.append(
+                    "\n"
+                    + triggers.format_files_with_status_emoji(tables_skipped, "⏭️")
+                )
+
             triggers.send_telegram("\n".join(telegram_msg))
 
         # need to revalidate the MetaJsons separately, since routes/sites info are stored in MetaJson, not ExplorersUpdate
@@ -878,6 +1178,9 @@ class PublicationBuilder(GeneralMetaBuilder):
     GITHUB_DIR = "pub-dosm/publications"
     VALIDATOR = PublicationValidateModel
 
+    # subscriber emails are sent when a publication is built on its release date
+    SKIP_UNCHANGED_FILES = False
+
     def delete_file(self, filename: str, data: dict):
         """
         This will also delete the download counts for relevant publication resource!
@@ -1114,10 +1417,13 @@ class PublicationUpcomingBuilder(GeneralMetaBuilder):
         """
         return PublicationUpcoming.objects.all().delete()
 
+    def get_meta_sources(self, metadata: PublicationUpcomingValidateModel) -> list[str]:
+        return [metadata.parquet_link]
+
     def update_or_create_meta(
             self, filename: str, metadata: PublicationUpcomingValidateModel
     ):
-        df = pd.read_parquet(metadata.parquet_link)
+        df = read_parquet(metadata.parquet_link)
 
         # Check for duplicate publication_id before saving all metadata
         column_name = 'publication_id'
@@ -1216,11 +1522,14 @@ class PublicationTypeBuilder(GeneralMetaBuilder):
         pub_subtype = PublicationSubtype.objects.all().delete()
         return pub_type + pub_subtype
 
+    def get_meta_sources(self, metadata: PublicationTypeValidateModel) -> list[str]:
+        return [metadata.parquet_link]
+
     def update_or_create_meta(
             self, filename: str, metadata: PublicationTypeValidateModel
     ):
-        df_type = pd.read_parquet(metadata.parquet_link)
-        df_subtype = pd.read_parquet(metadata.parquet_link)
+        df_type = read_parquet(metadata.parquet_link)
+        df_subtype = df_type.copy()
 
         PublicationType.objects.all().delete()
         PublicationSubtype.objects.all().delete()
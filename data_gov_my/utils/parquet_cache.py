@@ -0,0 +1,202 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import defaultdict
+
+import pandas as pd
+import pyarrow.parquet as pq
+import requests
+from django.conf import settings
+
+logger = logging.getLogger("django")
+
+
+class ParquetCache:
+    """
+    On-disk, size-bounded LRU cache of remote parquet files, keyed by URL.
+    Cached files are revalidated against the server's ETag / Last-Modified with a conditional GET,
+    and are only downloaded again if they have changed.
+
+    During a build (between `start_build()` and `end_build()`), every URL is revalidated at most once,
+    so dashboards with many charts on one parquet only hit the network once.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._url_locks = defaultdict(threading.Lock)
+        self._memo = None  # {url: local path}, only set during a build
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats():
+        return {"memo_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def start_build(self):
+        with self._lock:
+            self._memo = {}
+            self._stats = self._empty_stats()
+
+    def end_build(self) -> dict:
+        """
+        Ends the build memo, returns the cache stats of the build.
+        """
+        with self._lock:
+            self._memo = None
+            return dict(self._stats)
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _paths(self, url: str):
+        name = hashlib.sha256(url.encode()).hexdigest()
+        path = os.path.join(self.directory, f"{name}.parquet")
+        return path, f"{path}.json"
+
+    def get(self, url: str) -> str:
+        """
+        Returns the local path of an up-to-date copy of the parquet at `url`.
+        """
+        with self._url_locks[url]:
+            memo = self._memo
+            if memo is not None and url in memo:
+                self._count("memo_hits")
+                return memo[url]
+
+            path = self._fetch(url)
+            if memo is not None:
+                memo[url] = path
+            return path
+
+    def _fetch(self, url: str, revalidate: bool = True) -> str:
+        """
+        Downloads `url` unless the cached copy is still valid (with `revalidate`), returns its local path.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path, meta_path = self._paths(url)
+
+        headers = {}
+        validators = {}
+        cached = revalidate and os.path.isfile(path)
+        if cached:
+            try:
+                with open(meta_path) as f:
+                    validators = json.load(f)
+            except FileNotFoundError:  # evicted by another worker process
+                cached = False
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        try:
+            res = requests.get(url, headers=headers, stream=True, timeout=60)
+        except requests.exceptions.RequestException as e:
+            if not cached:
+                raise
+            logger.warning(f"Unable to revalidate {url}, using cached copy: {e}")
+            res = None
+
+        if res is None or res.status_code == 304:
+            try:
+                os.utime(path)  # mark as recently used
+            except FileNotFoundError:
+                # evicted by another worker process since it was revalidated
+                return self._fetch(url, revalidate=False)
+            self._count("disk_hits")
+            return path
+
+        res.raise_for_status()
+        # unique across threads and worker processes sharing the directory
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, prefix=os.path.basename(path), suffix=".tmp", delete=False
+        ) as f:
+            for chunk in res.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+        os.replace(f.name, path)
+        with open(meta_path, "w") as f:
+            json.dump(
+                {
+                    "url": url,
+                    "etag": res.headers.get("ETag"),
+                    "last_modified": res.headers.get("Last-Modified"),
+                },
+                f,
+            )
+        self._count("misses")
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: str = None):
+        """
+        Deletes the least recently used files until the cache fits within `max_bytes`.
+        Files read during the current build, and `keep` (the file about to be returned), are never evicted.
+        """
+        with self._lock:
+            in_use = set((self._memo or {}).values()) | {keep}
+            files = []
+            total = 0
+            for f in os.listdir(self.directory):
+                path = os.path.join(self.directory, f)
+                if f.endswith(".parquet"):
+                    stat = os.stat(path)
+                    total += stat.st_size
+                    if path not in in_use:
+                        files.append((stat.st_mtime, stat.st_size, path))
+
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                for p in (path, f"{path}.json"):
+                    if os.path.exists(p):
+                        os.remove(p)
+                total -= size
+
+
+parquet_cache = ParquetCache(
+    directory=settings.PARQUET_CACHE_DIR, max_bytes=settings.PARQUET_CACHE_MAX_BYTES
+)
+
+
+def local_path(source) -> str:
+    """
+    Returns the local path of `source`, downloading remote files through the parquet cache.
+    """
+    source = str(source)
+    if source.startswith(("http://", "https://")):
+        return parquet_cache.get(source)
+    return source
+
+
+def read_parquet(source, **kwargs) -> pd.DataFrame:
+    """
+    Drop-in replacement for `pd.read_parquet()` which reads remote files through the parquet cache.
+    """
+    return pd.read_parquet(local_path(source), **kwargs)
+
+
+def count_parquet_rows(source) -> int:
+    """
+    Returns the number of rows of the parquet at `source`, from its footer.
+    """
+    return pq.ParquetFile(local_path(source)).metadata.num_rows
+
+
+def iter_parquet(source, batch_size: int):
+    """
+    Yields the parquet at `source` as DataFrames of at most `batch_size` rows, in file order.
+    Pandas index columns are left out, as the rows of `read_parquet(source).to_dict("records")` would.
+    """
+    parquet_file = pq.ParquetFile(local_path(source))
+    pandas_meta = parquet_file.schema_arrow.pandas_metadata or {}
+    index_columns = {
+        c for c in pandas_meta.get("index_columns", []) if isinstance(c, str)
+    }
+    columns = [c for c in parquet_file.schema_arrow.names if c not in index_columns]
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        yield batch.to_pandas()
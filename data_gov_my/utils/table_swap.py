@@ -0,0 +1,220 @@
+import hashlib
+import re
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+
+"""
+Zero-downtime rebuilds of a model's table: the rows are loaded into a shadow table (`<table>_new`),
+which gets the live table's indexes and constraints, and is then renamed into place within the same transaction.
+Readers keep using the live table until the swap, and never see a half-built table.
+
+The replaced table is dropped once swapped out. With `KEEP_REPLACED_TABLES`, it is kept as `<table>_old` until the next rebuild,
+and can be swapped back with `restore_table()`.
+Tables referenced by foreign keys cannot be swapped, as the references would follow the replaced table.
+"""
+
+NEW_SUFFIX = "_new"
+OLD_SUFFIX = "_old"
+MAX_NAME_LENGTH = 63  # postgres identifiers
+
+INDEX_DEF = re.compile(r"^CREATE (UNIQUE )?INDEX \S+ ON \S+ (USING .*)$")
+
+
+def qn(name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def suffixed(name: str, suffix: str) -> str:
+    """
+    Returns `name` + `suffix`, shortened (with a hash of `name`) to fit a postgres identifier.
+    """
+    if len(name) + len(suffix) <= MAX_NAME_LENGTH:
+        return name + suffix
+    digest = hashlib.sha1(name.encode()).hexdigest()[:8]
+    return f"{name[:MAX_NAME_LENGTH - len(suffix) - 9]}_{digest}{suffix}"
+
+
+def table_objects(cursor, table: str) -> tuple[list, list, list]:
+    """
+    Returns the (name, definition) of the index-backed constraints (primary key, unique), foreign keys,
+    and other indexes of `table`.
+    """
+    cursor.execute(
+        """
+        SELECT conname, contype, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f')
+        """,
+        [qn(table)],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT i.relname, pg_get_indexdef(i.oid)
+        FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = %s::regclass AND NOT EXISTS (
+            SELECT 1 FROM pg_constraint c
+            WHERE c.conindid = i.oid AND c.contype IN ('p', 'u', 'x')
+        )
+        """,
+        [qn(table)],
+    )
+    indexes = cursor.fetchall()
+    keys = [(name, sql) for name, kind, sql in constraints if kind != "f"]
+    foreign_keys = [(name, sql) for name, kind, sql in constraints if kind == "f"]
+    return keys, foreign_keys, indexes
+
+
+def create_shadow_table(cursor, table: str) -> str:
+    """
+    Creates an empty `<table>_new` with the columns, defaults and check constraints of `table`, and returns its name.
+    Indexes are only built by `swap_shadow_table()`, once the rows are loaded.
+    """
+    cursor.execute(
+        "SELECT 1 FROM pg_constraint WHERE confrelid = %s::regclass", [qn(table)]
+    )
+    if cursor.fetchone():
+        raise ValueError(f"{table} is referenced by foreign keys, it cannot be swapped")
+
+    shadow = suffixed(table, NEW_SUFFIX)
+    cursor.execute(f"DROP TABLE IF EXISTS {qn(shadow)}")
+    cursor.execute(
+        f"CREATE TABLE {qn(shadow)} (LIKE {qn(table)} INCLUDING DEFAULTS "
+        f"INCLUDING IDENTITY INCLUDING CONSTRAINTS INCLUDING GENERATED)"
+    )
+    return shadow
+
+
+def swap_shadow_table(cursor, table: str):
+    """
+    Builds the indexes and constraints of `table` on `<table>_new` and analyzes it,
+    then swaps it in, keeping `table` as `<table>_old`.
+    """
+    shadow = qn(suffixed(table, NEW_SUFFIX))
+    keys, foreign_keys, indexes = table_objects(cursor, table)
+
+    for name, sql in keys:
+        name = qn(suffixed(name, NEW_SUFFIX))
+        cursor.execute(f"ALTER TABLE {shadow} ADD CONSTRAINT {name} {sql}")
+    for name, sql in foreign_keys:
+        # foreign key names are per table, they are not renamed
+        cursor.execute(f"ALTER TABLE {shadow} ADD CONSTRAINT {qn(name)} {sql}")
+    for name, sql in indexes:
+        unique, rest = INDEX_DEF.match(sql).groups()
+        name = qn(suffixed(name, NEW_SUFFIX))
+        cursor.execute(f"CREATE {unique or ''}INDEX {name} ON {shadow} {rest}")
+
+    # planner statistics of the loaded rows, rather than waiting for autovacuum once swapped in
+    cursor.execute(f"ANALYZE {shadow}")
+
+    cursor.execute(f"DROP TABLE IF EXISTS {qn(suffixed(table, OLD_SUFFIX))}")
+    exchange(cursor, table, NEW_SUFFIX, OLD_SUFFIX, keys, indexes)
+
+
+def exchange(cursor, table: str, from_suffix: str, to_suffix: str, keys, indexes):
+    """
+    Renames `table` (and its indexes) with `to_suffix`, then renames `<table><from_suffix>` (and its indexes) into place.
+    """
+    retired = suffixed(table, to_suffix)
+    replacement = suffixed(table, from_suffix)
+
+    cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(retired)}")
+    for name, _ in keys:
+        old_name = qn(suffixed(name, to_suffix))
+        cursor.execute(
+            f"ALTER TABLE {qn(retired)} RENAME CONSTRAINT {qn(name)} TO {old_name}"
+        )
+    for name, _ in indexes:
+        cursor.execute(
+            f"ALTER INDEX {qn(name)} RENAME TO {qn(suffixed(name, to_suffix))}"
+        )
+
+    cursor.execute(f"ALTER TABLE {qn(replacement)} RENAME TO {qn(table)}")
+    for name, _ in keys:
+        new_name = qn(suffixed(name, from_suffix))
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} RENAME CONSTRAINT {new_name} TO {qn(name)}"
+        )
+    for name, _ in indexes:
+        cursor.execute(
+            f"ALTER INDEX {qn(suffixed(name, from_suffix))} RENAME TO {qn(name)}"
+        )
+
+    # serial (not identity) sequences are shared by both tables, and must not be dropped with the retired one
+    cursor.execute(
+        """
+        SELECT pg_get_serial_sequence(%s, column_name), column_name
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s
+        AND is_identity = 'NO' AND pg_get_serial_sequence(%s, column_name) IS NOT NULL
+        """,
+        [qn(retired), retired, qn(retired)],
+    )
+    for sequence, column in cursor.fetchall():
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {qn(table)}.{qn(column)}")
+
+
+def table_oid(model) -> int | None:
+    """
+    Returns the oid of the model's table, which changes whenever another table is swapped into place.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)::oid", [qn(model._meta.db_table)])
+        return cursor.fetchone()[0]
+
+
+def table_columns(cursor, table: str) -> list:
+    """
+    Returns the sorted (name, type) of the columns of `table`.
+    """
+    cursor.execute(
+        """
+        SELECT attname, format_type(atttypid, atttypmod)
+        FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+        ORDER BY attname
+        """,
+        [qn(table)],
+    )
+    return cursor.fetchall()
+
+
+@contextmanager
+def rebuild_table(model, keep_replaced: bool = None):
+    """
+    Yields the name of an empty shadow table of `model`, to be filled by the caller,
+    and swaps it in place of the model's table on exit. Nothing is swapped if the block raises.
+    The replaced table is dropped, unless `keep_replaced` (defaults to `settings.KEEP_REPLACED_TABLES`).
+    """
+    if keep_replaced is None:
+        keep_replaced = settings.KEEP_REPLACED_TABLES
+    table = model._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        shadow = create_shadow_table(cursor, table)
+        yield shadow
+        swap_shadow_table(cursor, table)
+        if not keep_replaced:
+            cursor.execute(f"DROP TABLE {qn(suffixed(table, OLD_SUFFIX))}")
+
+
+def restore_table(model):
+    """
+    Swaps the table replaced by the last rebuild of `model` (`<table>_old`) back into place.
+    The rebuilt table is kept as `<table>_new`, until the next rebuild.
+    Raises a ValueError if there is no replaced table, or if its columns differ from the model's table (e.g. after a migration).
+    """
+    table = model._meta.db_table
+    replaced = suffixed(table, OLD_SUFFIX)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [qn(replaced)])
+        if cursor.fetchone()[0] is None:
+            raise ValueError(f"{table} has no replaced table to restore")
+        if table_columns(cursor, replaced) != table_columns(cursor, table):
+            raise ValueError(
+                f"The columns of {replaced} differ from {table}, it cannot be restored"
+            )
+        keys, _, indexes = table_objects(cursor, table)
+        cursor.execute(f"DROP TABLE IF EXISTS {qn(suffixed(table, NEW_SUFFIX))}")
+        exchange(cursor, table, OLD_SUFFIX, NEW_SUFFIX, keys, indexes)
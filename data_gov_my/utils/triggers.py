@@ -72,6 +72,19 @@ def format_multi_line(arr: List[dict], header: str, pad_length=10):
     return f"{header}\n{message}"
 
 
+def format_timings(timings: dict, header: str):
+    """
+    Formats a {name: seconds} mapping, slowest first.
+    """
+    header = format_header(header)
+    total = sum(timings.values())
+    lines = [
+        f"<code>{name}</code>: {seconds:.2f}s"
+        for name, seconds in sorted(timings.items(), key=lambda x: -x[1])
+    ]
+    return f"{header}\n" + "\n".join(lines) + f"\n\n<b>Total</b>: {total:.2f}s"
+
+
 def format_status_message(arr, header):
     str = header + "\n\n"
 
@@ -80,3 +93,16 @@ def format_status_message(arr, header):
         str += cur_str
 
     return str
+
+
+def format_cache_stats(stats: dict, header: str):
+    """
+    Formats a {stat: count} mapping of cache hits / misses, with the overall hit ratio.
+    """
+    header = format_header(header)
+    lines = [f"<code>{k}</code>: {v}" for k, v in stats.items()]
+    hits = sum(v for k, v in stats.items() if k.endswith("hits"))
+    total = sum(stats.values())
+    if total:
+        lines.append(f"\n<b>Hit Ratio</b>: {hits / total:.0%}")
+    return f"{header}\n" + "\n".join(lines)
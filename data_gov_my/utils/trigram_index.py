@@ -0,0 +1,60 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+
+"""
+In-memory trigram search over a small vocabulary (e.g. car makers and models), with the semantics of `pg_trgm`:
+words are the runs of alphanumeric characters of the lowercased text, padded with two spaces in front and one behind,
+and the similarity of two texts is the number of trigrams they share over the number of trigrams of either.
+"""
+
+WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> set[str]:
+    grams = set()
+    for word in WORD.findall(text.lower()):
+        word = f"  {word} "
+        grams.update(word[i : i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    Inverted index of the trigrams of `terms`: the terms sharing trigrams with a query are counted with a single `np.bincount()`,
+    instead of computing the similarity of every term.
+    """
+
+    def __init__(self, terms: list[str]):
+        self.terms = terms
+        self.sizes = np.zeros(len(terms), dtype=np.int64)
+        postings = defaultdict(list)
+        for i, term in enumerate(terms):
+            grams = trigrams(term)
+            self.sizes[i] = len(grams)
+            for gram in grams:
+                postings[gram].append(i)
+        self.postings = {
+            gram: np.array(rows, dtype=np.int64) for gram, rows in postings.items()
+        }
+
+    def __len__(self):
+        return len(self.terms)
+
+    def search(self, query: str, limit: int = 10) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the rows of the (at most `limit`) terms most similar to `query`, and their similarity.
+        Terms sharing no trigram with `query` are never returned; ties are in the order of `terms`.
+        """
+        grams = trigrams(query)
+        matches = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not matches:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+        shared = np.bincount(np.concatenate(matches), minlength=len(self.terms))
+        rows = np.flatnonzero(shared)
+        shared = shared[rows]
+        similarity = shared / (len(grams) + self.sizes[rows] - shared)
+        order = np.lexsort((rows, -similarity))[:limit]
+        return rows[order], similarity[order]
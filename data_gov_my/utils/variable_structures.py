@@ -20,20 +20,42 @@ class GeneralChartVariables(BaseModel):
     replace_vals: dict[str, str | int] = {}
     filter: dict[str, list[str]] = {}
 
+    def referenced_columns(self) -> set[str]:
+        """
+        Columns (after renaming) that the chart reads, extended in children variable classes.
+        """
+        return {*self.keys, *self.value_columns, *self.filter}
+
+    def required_columns(self) -> set[str] | None:
+        """
+        Source parquet columns needed to build the chart, or None if every column may be needed.
+        """
+        source_names = {v: k for k, v in self.rename_cols.items()}
+        return {source_names.get(col, col) for col in self.referenced_columns()}
+
 
 class TimeseriesChartVariables(GeneralChartVariables):
     constants: list[str] = []
 
+    def referenced_columns(self) -> set[str]:
+        return super().referenced_columns() | set(self.constants)
+
 
 class BarChartVariables(GeneralChartVariables):
     x: str
     y: list[str]
 
+    def referenced_columns(self) -> set[str]:
+        return super().referenced_columns() | {self.x, *self.y}
+
 
 class LineChartVariables(GeneralChartVariables):
     x: str
     y: list[str]
 
+    def referenced_columns(self) -> set[str]:
+        return super().referenced_columns() | {self.x, *self.y}
+
 
 class BarMeterVariables(GeneralChartVariables):
     axis_values: list[dict[str, str]]
@@ -48,12 +70,24 @@ class BarMeterVariables(GeneralChartVariables):
                 )
         return v
 
+    def referenced_columns(self) -> set[str]:
+        columns = super().referenced_columns()
+        for pair in self.axis_values:
+            columns.update(pair.keys(), pair.values())
+        return columns
+
 
 class SnapshotChartVariables(GeneralChartVariables):
     main_key: str
     replace_word: str
     data: Dict[str, list[str]]
 
+    def referenced_columns(self) -> set[str]:
+        columns = super().referenced_columns() | {self.main_key}
+        for cols in self.data.values():
+            columns.update(cols)
+        return columns
+
 
 class CustomChartVariables(GeneralChartVariables):
     pass
@@ -63,6 +97,9 @@ class ChoroplethChartVariables(GeneralChartVariables):
     x: str
     y: list[str]  # alow multiple y columns
 
+    def referenced_columns(self) -> set[str]:
+        return super().referenced_columns() | {self.x, *self.y}
+
 
 class MetricsTableVariables(GeneralChartVariables):
     pass
@@ -73,6 +110,9 @@ class PyramidChartVariables(GeneralChartVariables):
     y1: str = "female"
     y2: str = "male"
 
+    def referenced_columns(self) -> set[str]:
+        return super().referenced_columns() | {self.label_column, self.y1, self.y2}
+
 
 class JitterChartVariables(GeneralChartVariables):
     id: str
@@ -80,12 +120,22 @@ class JitterChartVariables(GeneralChartVariables):
     keys: str
     tooltip: bool
 
+    def required_columns(self) -> set[str] | None:
+        suffixes = ["_x", "_y", "_t"] if self.tooltip else ["_x", "_y"]
+        columns = {self.keys, "area"}
+        for cols in self.columns.values():
+            columns.update(col + suffix for col in cols for suffix in suffixes)
+        return columns
+
 
 class HeatmapChartVariables(GeneralChartVariables):
     x: str
     y: str
     z: str
 
+    def referenced_columns(self) -> set[str]:
+        return super().referenced_columns() | {self.x, self.y, self.z}
+
 
 class WaffleChartVariables(GeneralChartVariables):
     dict_keys: list[str]
@@ -99,6 +149,13 @@ class WaffleChartVariables(GeneralChartVariables):
             )
         return v
 
+    def referenced_columns(self) -> set[str]:
+        columns = super().referenced_columns() | set(self.dict_keys)
+        for k, v in self.data_arr.items():
+            columns.add(k)
+            columns.update([v] if isinstance(v, str) else v.keys())
+        return columns
+
 
 class LatLonVariables(TypedDict):
     keys: List[str]
@@ -122,3 +179,8 @@ class QueryValuesVariables(GeneralChartVariables):
     flat: bool = False
     columns: list[str] = []  # similar to keys
     sort_values: _SortValues = {}
+
+    def required_columns(self) -> set[str] | None:
+        # query values are read without pre-processing, so columns are never renamed
+        sort_cols = self.sort_values.by if self.sort_values else []
+        return {*self.columns, *sort_cols}
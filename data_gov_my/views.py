@@ -9,7 +9,6 @@ from threading import Thread
 import environ
 import requests
 from django.conf import settings
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from django.db.models import F, Q, Sum
@@ -54,7 +53,17 @@ from data_gov_my.serializers import (
     i18nSerializer,
 )
 from data_gov_my.utils import triggers
+from data_gov_my.utils.chart_payloads import (
+    get_chart_payload,
+    get_chart_payloads,
+    is_empty_payload,
+    json_payload_response,
+    render_json,
+    serialize,
+)
 from data_gov_my.utils.email_normalization import normalize_email
+from data_gov_my.utils.etags import conditional_get
+from data_gov_my.utils.local_cache import local_cache
 from data_gov_my.utils.meta_builder import GeneralMetaBuilder
 from data_gov_my.utils.publication_helpers import create_token_message
 from data_gov_my.utils.throttling import FormRateThrottle
@@ -81,7 +90,7 @@ class AUTH_TOKEN(APIView):
             cur_time = datetime.now(tz=get_current_timezone())
             defaults = {"value": auth_token, "timestamp": cur_time}
             AuthTable.objects.update_or_create(key="AUTH_TOKEN", defaults=defaults)
-            cache.set("AUTH_KEY", auth_token)
+            local_cache.set("AUTH_KEY", auth_token)
         except Exception as e:
             return JsonResponse({"status": 400, "message": str(e)}, status=400)
 
@@ -90,7 +99,13 @@ class AUTH_TOKEN(APIView):
         )
 
 
+def dashboard_scope(request, *args, **kwargs):
+    if "dashboard" in request.GET:
+        return f"DASHBOARD_{request.GET['dashboard']}"
+
+
 class CHART(APIView):
+    @conditional_get(dashboard_scope)
     def get(self, request, format=None):
         param_list = dict(request.GET)
         params_req = ["dashboard", "chart_name"]
@@ -98,28 +113,46 @@ class CHART(APIView):
         if all(p in param_list for p in params_req):
             dbd_name = param_list["dashboard"][0]
             chart_name = param_list["chart_name"][0]
-            meta = cache.get(f"META_{dbd_name}")
+            meta = local_cache.get(f"META_{dbd_name}")
 
             if not meta:
                 meta = MetaJson.objects.filter(dashboard_name=dbd_name).values(
                     "dashboard_meta"
                 )[0]["dashboard_meta"]
-                cache.set(f"META_{dbd_name}", meta)
+                local_cache.set(f"META_{dbd_name}", meta)
 
             api_params = meta["charts"][chart_name]["api_params"]
             chart_type = meta["charts"][chart_name]["chart_type"]
             api_type = meta["charts"][chart_name]["api_type"]
             chart_variables = meta["charts"][chart_name]["variables"]
+            data_last_updated = meta.get("data_last_updated", None)
 
-            chart_data = cache.get(f"{dbd_name}_{chart_name}")
+            # serve the pre-serialized leaf if stored (constants are merged into the leaf below, so are not pre-serialized)
+            has_constants = (
+                chart_type == "timeseries_chart" and "constants" in chart_variables
+            )
+            if not has_constants and (api_type == "dynamic" or not api_params):
+                if not all(api in param_list for api in api_params):
+                    return JsonResponse({}, safe=False)
+                path = [param_list[api][0] for api in api_params]
+                payload = get_chart_payload(dbd_name, chart_name, path)
+                # payloads only include `data_as_of` if set, which this endpoint always returns
+                if payload and payload.startswith(b'{"data_as_of": '):
+                    return json_payload_response(
+                        payload[:-1]
+                        + b', "data_last_updated": '
+                        + serialize(data_last_updated)
+                        + b"}"
+                    )
+
+            chart_data = local_cache.get(f"{dbd_name}_{chart_name}")
 
             if not chart_data:
                 chart_data = DashboardJson.objects.filter(
                     dashboard_name=dbd_name, chart_name=chart_name
                 ).values("chart_data")[0]["chart_data"]
-                cache.set(f"{dbd_name}_{chart_name}", chart_data)
+                local_cache.set(f"{dbd_name}_{chart_name}", chart_data)
 
-            data_last_updated = meta.get("data_last_updated", None)
             data_as_of = chart_data["data_as_of"]
             chart_data = chart_data["data"]
 
@@ -137,7 +170,7 @@ class CHART(APIView):
                     return JsonResponse({}, safe=False)
 
             if temp:
-                chart_data.update(temp)
+                chart_data = {**chart_data, **temp}  # the cached leaf is shared
 
             overall_data = {}
             overall_data["data"] = chart_data
@@ -164,13 +197,14 @@ class UPDATE(APIView):
 
 
 class DASHBOARD(APIView):
+    @conditional_get(dashboard_scope)
     def get(self, request: request.Request, format=None):
         param_list = request.query_params
 
         if "dashboard" in param_list:
-            res = handle_request(param_list)
+            res = handle_request(param_list, serialized=True)
             res = handle.dashboard_additional_handling(param_list, res)
-            return JsonResponse(res, safe=False, status=200)
+            return json_payload_response(render_json(res))
         else:
             return JsonResponse(
                 {
@@ -181,7 +215,14 @@ class DASHBOARD(APIView):
             )
 
 
+def explorer_scope(request, *args, **kwargs):
+    explorer = exp_class.EXPLORERS_CLASS_LIST.get(request.GET.get("explorer"))
+    if explorer is not None:
+        return explorer.build_scope()
+
+
 class EXPLORER(APIView):
+    @conditional_get(explorer_scope)
     def get(self, request, format=None):
         params = dict(request.GET)
         if (
@@ -675,12 +716,13 @@ class PUBLICATION_UPCOMING_DROPDOWN(APIView):
         )
 
 
-def handle_request(param_list: QueryDict, isDashboard=True):
+def handle_request(param_list: QueryDict, isDashboard=True, serialized=False):
     """
-    Handles request for dashboards
+    Handles request for dashboards.
+    If `serialized` is True, charts with a pre-serialized payload are returned as bytes, to be encoded with `render_json()`.
     """
     dbd_name = param_list["dashboard"]
-    dbd_info = cache.get("META_" + dbd_name)
+    dbd_info = local_cache.get("META_" + dbd_name)
 
     if not dbd_info:
         dbd_info = MetaJson.objects.filter(dashboard_name=dbd_name).values(
@@ -691,10 +733,9 @@ def handle_request(param_list: QueryDict, isDashboard=True):
     data_last_updated = None
 
     if len(dbd_info) > 0:
-        dbd_info = (
-            dbd_info if isinstance(dbd_info, dict) else dbd_info[0]["dashboard_meta"]
-        )
-        cache.set(f"META_{dbd_name}", dbd_info)
+        if not isinstance(dbd_info, dict):
+            dbd_info = dbd_info[0]["dashboard_meta"]
+            local_cache.set(f"META_{dbd_name}", dbd_info)
         params_req = dbd_info["required_params"]
         params_opt = dbd_info.get("optional_params", [])
         data_last_updated = dbd_info.get("data_last_updated", None)
@@ -711,46 +752,103 @@ def handle_request(param_list: QueryDict, isDashboard=True):
     ):
         data = dbd_info["charts"]
 
-        if len(data) > 0:
-            for k, v in data.items():
-                api_type = v["api_type"]
-                api_params = v["api_params"]
-                cur_chart_data = cache.get(dbd_name + "_" + k)
-
-                # dashboard endpoint should ignore this unless the chart name is query_values
-                if (isDashboard and k == "query_values") or (
-                        not isDashboard and k != "query_values"
-                ):
-                    continue
-
-                if not cur_chart_data:
-                    cur_chart_data = DashboardJson.objects.filter(
-                        dashboard_name=dbd_name, chart_name=k
-                    ).values("chart_data")[0]["chart_data"]
-                    cache.set(dbd_name + "_" + k, cur_chart_data)
-
-                data_as_of = cur_chart_data.get("data_as_of", None)
+        # dashboard endpoint should ignore this unless the chart name is query_values
+        charts = {
+            k: v
+            for k, v in data.items()
+            if (k == "query_values") != isDashboard
+            and v["api_type"] in ("static", "dynamic")
+        }
+
+        # slice paths of the charts, None if parameters are missing (leaving the chart empty)
+        paths = {
+            k: []
+            if v["api_type"] == "static"
+            else get_nested_path(v["api_params"], param_list)
+            for k, v in charts.items()
+        }
+        payloads = (
+            get_chart_payloads(
+                dbd_name, {k: path for k, path in paths.items() if path is not None}
+            )
+            if serialized
+            else {}
+        )
+        chart_data = get_dashboard_charts(
+            dbd_name,
+            [
+                k
+                for k in charts
+                if k not in payloads and (not serialized or paths[k] is not None)
+            ],
+        )
 
-                if api_type == "static":
+        for k, v in charts.items():
+            api_type = v["api_type"]
+            api_params = v["api_params"]
+
+            if k in payloads:
+                if api_type == "static" or not is_empty_payload(payloads[k]):
+                    res[k] = payloads[k]
+                continue
+            if k not in chart_data:
+                continue
+
+            cur_chart_data = chart_data[k]
+            data_as_of = cur_chart_data.get("data_as_of", None)
+
+            if api_type == "static":
+                res[k] = {}
+                if data_as_of:
+                    res[k]["data_as_of"] = data_as_of
+                res[k]["data"] = cur_chart_data["data"]
+            elif api_type == "dynamic":
+                if len(api_params) > 0:
+                    cur_chart_data = get_nested_data(
+                        dbd_info, api_params, param_list, cur_chart_data["data"]
+                    )
+
+                if len(cur_chart_data) > 0:
                     res[k] = {}
                     if data_as_of:
                         res[k]["data_as_of"] = data_as_of
-                    res[k]["data"] = cur_chart_data["data"]
-                elif api_type == "dynamic":
-                    if len(api_params) > 0:
-                        cur_chart_data = get_nested_data(
-                            dbd_info, api_params, param_list, cur_chart_data["data"]
-                        )
-
-                    if len(cur_chart_data) > 0:
-                        res[k] = {}
-                        if data_as_of:
-                            res[k]["data_as_of"] = data_as_of
-                        res[k]["data"] = cur_chart_data
+                    res[k]["data"] = cur_chart_data
 
     return res
 
 
+def get_dashboard_charts(dbd_name: str, chart_names: list[str]) -> dict:
+    """
+    Returns the chart data of the given charts, by chart name.
+    Cached charts are read in one round trip, and the rest with one query (and cached).
+    """
+    keys = {f"{dbd_name}_{k}": k for k in chart_names}
+    charts = {keys[key]: v for key, v in local_cache.get_many(list(keys)).items()}
+
+    missing = [k for k in chart_names if k not in charts]
+    if missing:
+        fetched = dict(
+            DashboardJson.objects.filter(
+                dashboard_name=dbd_name, chart_name__in=missing
+            ).values_list("chart_name", "chart_data")
+        )
+        local_cache.set_many({f"{dbd_name}_{k}": v for k, v in fetched.items()})
+        charts.update(fetched)
+    return charts
+
+
+def get_nested_path(api_params: list[str], param_list: QueryDict) -> list | None:
+    """
+    Returns the keys used by `get_nested_data()` to slice the chart data, or None if a parameter is missing.
+    """
+    if not all(a in param_list for a in api_params):
+        return None
+    return [
+        param_list[a] if "__FIXED__" not in a else a.replace("__FIXED__", "")
+        for a in api_params
+    ]
+
+
 def get_nested_data(
         dbd_info: dict,
         api_params: list[str],